@@ -0,0 +1,141 @@
+﻿from collections import namedtuple
+from typing import Iterable
+import numpy as np
+from core.VarnaVargikarana import VARNA_VARGA, DEVANAGARI_START, DEVANAGARI_END, ANYA, SVARA, VYANJANA, MATRA, VIRAMA, VISARGA, ANUSVARA, ANKA
+
+# Per-line metric arrays, each of length len(lines)
+AksharaMana = namedtuple("AksharaMana", ["syllables", "guru", "laghu", "samyoga", "samyoga_density"])
+
+# Lookup tables over every UTF-16 code unit, so classifying is a single take
+LUT_SIZE = 0x10000
+
+VARGA_LUT = np.zeros(LUT_SIZE, dtype=np.uint8)
+VARGA_LUT[DEVANAGARI_START:DEVANAGARI_END] = np.frombuffer(VARNA_VARGA, dtype=np.uint8)
+
+# Long vowels, both independent and as matras
+DIRGHA = "आईऊॠॡएऐओऔाीूॄॣेैोौ"
+DIRGHA_LUT = np.zeros(LUT_SIZE, dtype=bool)
+DIRGHA_LUT[[ord(char) for char in DIRGHA]] = True
+
+def encode(text: str) -> np.ndarray:
+    """
+    Encode text as an array of UTF-16 code units.
+
+    Devanagari is in the Basic Multilingual Plane, so every Devanagari
+    character is exactly one uint16; characters outside it become surrogate
+    pairs, which classify as ANYA.
+
+    Args:
+        text: The text to encode.
+
+    Returns:
+        A uint16 array of code units.
+    """
+    return np.frombuffer(text.encode("utf-16-le"), dtype=np.uint16)
+
+def classify(codes: np.ndarray) -> np.ndarray:
+    """
+    Classify every code point with one vectorized table lookup.
+
+    Args:
+        codes: An array of uint16 code units, or of uint32 code points.
+
+    Returns:
+        A uint8 array of classes (SVARA, VYANJANA, ... or ANYA outside the block).
+    """
+    if codes.dtype != np.uint16:
+        codes = np.minimum(codes, LUT_SIZE - 1)
+    return VARGA_LUT[codes]
+
+def compute_metrics(lines: Iterable[str]) -> AksharaMana:
+    """
+    Compute syllable counts, guru/laghu weights and conjunct density for many lines at once.
+
+    Every line is encoded into one code-point array and classified with the
+    lookup table. A syllable nucleus is an independent vowel or a consonant not
+    followed by a virama; a syllable is guru (heavy) if its vowel is long, if an
+    anusvara or visarga follows it, or if two or more consonants follow before
+    the next nucleus (one suffices at the end of a line). All of this is done
+    with array operations, so there is no per-character Python loop.
+
+    Args:
+        lines: The lines of Devanagari text, e.g. an open file; line terminators are ignored.
+
+    Returns:
+        An AksharaMana of per-line arrays: syllables, guru, laghu, samyoga
+        (number of virama-joined consonant pairs) and samyoga_density
+        (samyoga per syllable).
+    """
+    lines = list(lines)
+    line_count = len(lines)
+    codes = encode("".join(lines))
+    # Line ids come from the line lengths, so terminators or newlines inside a line (as from open(corpus)) do not shift them;
+    # a line's length in code units is its len() unless it has characters outside the Basic Multilingual Plane
+    lengths = np.fromiter((len(line) for line in lines), dtype=np.int64, count=line_count)
+    if lengths.sum() != len(codes):
+        lengths = np.fromiter((len(line.encode("utf-16-le")) // 2 for line in lines), dtype=np.int64, count=line_count)
+    line_id = np.repeat(np.arange(line_count, dtype=np.int32), lengths)
+    varga = classify(codes)
+
+    # Spaces, punctuation, digits and other scripts do not affect syllables
+    keep = (varga != ANYA) & (varga != ANKA)
+    codes, varga, line_id = codes[keep], varga[keep], line_id[keep]
+    size = len(varga)
+
+    next_varga = np.full(size, ANYA, dtype=np.uint8)
+    if size:
+        same_line = line_id[1:] == line_id[:-1]
+        next_varga[:-1] = np.where(same_line, varga[1:], ANYA)
+    is_vyanjana = varga == VYANJANA
+
+    nucleus = (varga == SVARA) | (is_vyanjana & (next_varga != VIRAMA))
+    position = np.flatnonzero(nucleus)
+    syllable_line = line_id[position]
+    syllables = np.bincount(syllable_line, minlength=line_count)
+
+    # The vowel of a consonant nucleus is its matra, or the short inherent a
+    vowel_position = position + (is_vyanjana[position] & (next_varga[position] == MATRA))
+    dirgha = DIRGHA_LUT[codes[vowel_position]] & (varga[vowel_position] != VYANJANA)
+
+    # Consonants and nasal/visarga marks between each nucleus and the next one in its line
+    last_in_line = np.ones(len(position), dtype=bool)
+    last_in_line[:-1] = syllable_line[1:] != syllable_line[:-1]
+    next_position = np.empty_like(position)
+    next_position[:-1] = position[1:]
+    line_end = np.cumsum(np.bincount(line_id, minlength=line_count))[syllable_line]
+    end = np.where(last_in_line, line_end, next_position + 1)
+    consonants = np.concatenate(([0], np.cumsum(is_vyanjana, dtype=np.int32)))
+    marks = np.concatenate(([0], np.cumsum((varga == ANUSVARA) | (varga == VISARGA), dtype=np.int32)))
+    following = consonants[end] - consonants[position + 1]
+    marked = marks[end] > marks[position + 1]
+
+    guru = dirgha | marked | (following >= 2) | (last_in_line & (following >= 1))
+    guru_count = np.bincount(syllable_line, weights=guru, minlength=line_count).astype(np.int64)
+
+    joins = (varga == VIRAMA) & (next_varga == VYANJANA)
+    samyoga = np.bincount(line_id[joins], minlength=line_count)
+
+    return AksharaMana(
+        syllables=syllables,
+        guru=guru_count,
+        laghu=syllables - guru_count,
+        samyoga=samyoga,
+        samyoga_density=samyoga / np.maximum(syllables, 1),
+    )
+
+# Example usage
+if __name__ == "__main__":
+    lines = ["धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः", "मामकाः पाण्डवाश्चैव किमकुर्वत सञ्जय"]
+    print(compute_metrics(lines))
+
+    # Benchmark against the scalar segmenters
+    import timeit
+    from core.AksharaVibhajaka import iter_aksharas
+    from core.ShabdaSamyojaka import parse_sanskrit_string
+    corpus = lines * 100000
+    elapsed_vector = timeit.timeit(lambda: compute_metrics(corpus), number=1)
+    print(f"Vectorized: {len(corpus) / elapsed_vector:,.0f} lines/sec")
+    elapsed = timeit.timeit(lambda: [sum(1 for _ in iter_aksharas(line)) for line in corpus], number=1)
+    print(f"iter_aksharas: {len(corpus) / elapsed:,.0f} lines/sec ({elapsed / elapsed_vector:.1f}x slower)")
+    elapsed = timeit.timeit(lambda: [parse_sanskrit_string(line) for line in corpus], number=1)
+    print(f"parse_sanskrit_string: {len(corpus) / elapsed:,.0f} lines/sec ({elapsed / elapsed_vector:.1f}x slower)")
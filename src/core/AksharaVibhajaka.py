@@ -0,0 +1,105 @@
+﻿import re
+from collections import namedtuple
+from typing import Iterable, Iterator, Union
+from core.VarnaVargikarana import VARNA_VARGA, DEVANAGARI_START, SVARA, VYANJANA, MATRA, VIRAMA, VISARGA, ANUSVARA, ANKA
+from core.Lipyantarana import SLP1_SVARA, SLP1_VYANJANA
+
+# One orthographic syllable and its character offset in the input
+Akshara = namedtuple("Akshara", ["akshara", "offset"])
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+NUKTA = "\u093c"
+ZWNJ_ZWJ = "\u200c\u200d"
+UDATTA_ANUDATTA = "\u0951-\u0954"
+
+def _char_class(*vargas) -> str:
+    return "".join(re.escape(chr(DEVANAGARI_START + index)) for index, varga in enumerate(VARNA_VARGA) if varga in vargas)
+
+# consonant (+ nukta) joined by viramas, then an optional matra or final virama, then nasal/visarga/accent marks;
+# or an independent vowel with its marks; or a single digit
+AKSHARA_PATTERN = re.compile(
+    "(?:[{c}]{n}?{v}[{z}]?)*[{c}]{n}?(?:[{m}]|{v}[{z}]?)?[{a}{u}]*|[{s}][{a}{u}]*|[{d}]".format(
+        c=_char_class(VYANJANA), n=NUKTA, v=_char_class(VIRAMA), z=ZWNJ_ZWJ, m=_char_class(MATRA),
+        a=_char_class(ANUSVARA, VISARGA), u=UDATTA_ANUDATTA, s=_char_class(SVARA), d=_char_class(ANKA)))
+
+# The same segmentation over SLP1, where every phoneme is one character: a consonant
+# cluster and its vowel with any nasal/visarga marks, a final cluster with no vowel, or a digit
+SLP1_AKSHARA_PATTERN = re.compile(
+    "[{c}]*[{s}][MH~]*|[{c}]+(?![{s}])|[0-9]".format(
+        c="".join(sorted(SLP1_VYANJANA)), s="".join(sorted(SLP1_SVARA))))
+
+def _read_chunks(source, chunk_size: int) -> Iterator[str]:
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+def iter_aksharas(source: Union[str, Iterable[str]], chunk_size: int = DEFAULT_CHUNK_SIZE, pattern: re.Pattern = AKSHARA_PATTERN) -> Iterator[Akshara]:
+    """
+    Lazily segment Devanagari text into aksharas (orthographic syllables).
+
+    The input is consumed chunk by chunk. A syllable that touches the end of a
+    chunk may continue in the next one (e.g. "क्" followed by "ष"), so it is
+    held back and re-matched together with the next chunk; memory therefore
+    stays bounded by the chunk size however long the input is.
+
+    Args:
+        source: A string, a text file object, or an iterable of text chunks.
+        chunk_size: The number of characters read at a time from strings and files.
+        pattern: The syllable pattern; SLP1_AKSHARA_PATTERN segments SLP1 text.
+
+    Yields:
+        Akshara records (akshara, offset). Whitespace, punctuation and other
+        scripts separate aksharas and are not yielded.
+    """
+    carry = ""
+    base = 0
+    for chunk in _read_chunks(source, chunk_size):
+        text = carry + chunk
+        carry_start = len(text)
+        for match in pattern.finditer(text):
+            if match.end() == len(text):
+                carry_start = match.start()
+                break
+            yield Akshara(match.group(), base + match.start())
+        carry = text[carry_start:]
+        base += carry_start
+    for match in pattern.finditer(carry):
+        yield Akshara(match.group(), base + match.start())
+
+def iter_aksharas_from_file(filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8-sig") -> Iterator[Akshara]:
+    """
+    Lazily segment a Devanagari text file into aksharas.
+
+    Args:
+        filepath: Path to the text file.
+        chunk_size: The number of characters read at a time.
+        encoding: The file encoding.
+
+    Yields:
+        Akshara records (akshara, offset).
+    """
+    with open(filepath, 'r', encoding=encoding) as file:
+        yield from iter_aksharas(file, chunk_size)
+
+# Example usage
+if __name__ == "__main__":
+    for akshara in iter_aksharas("धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः"):
+        print(akshara)
+
+    # Chunking never splits a syllable
+    verse = "धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः " * 1000
+    assert list(iter_aksharas(verse, chunk_size=7)) == list(iter_aksharas(verse))
+
+    # SLP1 text segments into the same syllables
+    from core.Lipyantarana import to_slp1
+    aksharas = [to_slp1(akshara) for akshara, _ in iter_aksharas(verse)]
+    assert [akshara for akshara, _ in iter_aksharas(to_slp1(verse), pattern=SLP1_AKSHARA_PATTERN)] == aksharas
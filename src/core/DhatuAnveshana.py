@@ -0,0 +1,287 @@
+﻿import re
+import logging
+from bisect import bisect_left
+from collections import namedtuple
+from collections.abc import Mapping
+from typing import Iterable, Optional
+from core.Smriti import Smriti, get_smriti, ABHAVA
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A compiled search pattern: as given, and with "^" and "$" matching at every line of a search text; with the
+# literal text every match starts with, and whether matches start at the beginning of the value
+SankalitaPrarupa = namedtuple("SankalitaPrarupa", ["regex", "line_regex", "literal", "anchored"])
+
+# Compiled patterns shared by every search; interactive search recompiles the same few patterns on each keystroke
+PrarupaSmriti = get_smriti("search_patterns", maxsize=512)
+
+# Separates the verbs in a field's search text, so "^" and "$" anchor at the ends of each value
+VIBHAJAKA = "\n"
+_SPECIAL = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*+?{")
+# Constructs that see past the ends of a value, and so read the neighbouring verbs in a search text
+_CONTEXT = re.compile(r"\(\?<?[=!]|\\[AZ]")
+
+def _literal_run(pattern: str, flags: int) -> tuple:
+    # The literal text a pattern starts with, after an optional "^", e.g. (True, "गम") for "^गम्?.*";
+    # empty when the pattern has alternatives or is verbose, since then no single run can be relied on
+    anchored = pattern.startswith("^") and not flags & re.MULTILINE
+    if "|" in pattern or flags & re.VERBOSE:
+        return anchored, ""
+    chars = []
+    idx = 1 if pattern.startswith("^") else 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if char == "\\":
+            if idx + 1 >= len(pattern) or pattern[idx + 1].isalnum():
+                break
+            char = pattern[idx + 1]
+            idx += 2
+        elif char in _SPECIAL:
+            break
+        else:
+            idx += 1
+        if idx < len(pattern) and pattern[idx] in _QUANTIFIERS:
+            # The character is optional or repeated, so it is not part of the run
+            break
+        chars.append(char)
+    return anchored, "".join(chars)
+
+def get_pattern(pattern: str, flags: int = 0) -> SankalitaPrarupa:
+    """
+    Compile a search pattern, reusing the result of earlier calls.
+
+    Args:
+        pattern: The regular expression.
+        flags: re flags, e.g. re.IGNORECASE.
+
+    Returns:
+        A SankalitaPrarupa with the compiled regexes and the pattern's literal start.
+    """
+    key = (pattern, flags)
+    compiled = PrarupaSmriti.get(key)
+    if compiled is ABHAVA:
+        anchored, literal = _literal_run(pattern, flags)
+        compiled = SankalitaPrarupa(re.compile(pattern, flags), re.compile(pattern, flags | re.MULTILINE), literal, anchored)
+        PrarupaSmriti.put(key, compiled)
+    return compiled
+
+def _field_value(verb_info, field: str) -> str:
+    value = verb_info.get(field) if isinstance(verb_info, Mapping) else getattr(verb_info, field)
+    return "" if value is None else str(value)
+
+class DhatuAnveshana:
+    """
+    Precomputed regex search over the fields of a root list.
+
+    For each field the values of all the verbs are concatenated into one
+    search text, a line per verb, with the line starts recorded, so a
+    pattern is run over the whole list in one pass instead of once per
+    verb and field; after a hit the scan resumes at the next verb. A pattern
+    starting with literal text is scanned for that text with str.find, and
+    only the verbs containing it are tested against the full pattern; if
+    the pattern is also anchored at "^", the verbs are instead taken from
+    the range of a sorted copy of the field that starts with the text.
+    Results are cached per pattern, so typing a query back to an earlier
+    one costs a lookup.
+    """
+
+    def __init__(self, verb_info_list: Iterable, version=None):
+        self.verbs = list(verb_info_list)
+        self.version = version
+        self.columns = {}
+        self.texts = {}
+        self.starts = {}
+        self.alphabets = {}
+        self.variants = {}
+        self.sorted_values = {}
+        self.results = Smriti(maxsize=256)
+
+    def _column(self, field: str) -> list:
+        # Field values are extracted the first time a field is searched
+        column = self.columns.get(field)
+        if column is None:
+            column = self.columns[field] = [_field_value(verb_info, field) for verb_info in self.verbs]
+            text = VIBHAJAKA.join(column)
+            self.alphabets[field] = set(text)
+            if text.count(VIBHAJAKA) == max(len(column) - 1, 0):
+                starts = []
+                position = 0
+                for value in column:
+                    starts.append(position)
+                    position += len(value) + 1
+                self.texts[field] = text
+                self.starts[field] = starts
+        return column
+
+    def _field_literal(self, field: str, literal: str, ignorecase: bool) -> Optional[str]:
+        # The literal as spelt in this field: under IGNORECASE each character is replaced by the one character
+        # of the field it matches, stopping at a character matching several; None if one matches none
+        if not ignorecase:
+            return literal
+        chars = []
+        for char in literal:
+            key = (field, char)
+            variants = self.variants.get(key)
+            if variants is None:
+                matcher = re.compile(re.escape(char), re.IGNORECASE)
+                variants = self.variants[key] = "".join(sorted(other for other in self.alphabets[field] if matcher.fullmatch(other)))
+            if not variants:
+                return None
+            if len(variants) > 1:
+                break
+            chars.append(variants)
+        return "".join(chars)
+
+    def _scan_range(self, regex, field: str, column: list, prefix: str) -> set:
+        # Only the values starting with the prefix can match
+        sorted_values = self.sorted_values.get(field)
+        if sorted_values is None:
+            sorted_values = self.sorted_values[field] = sorted((value, idx) for idx, value in enumerate(column))
+        lo = bisect_left(sorted_values, (prefix,))
+        hi = bisect_left(sorted_values, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), lo)
+        search = regex.search
+        return {idx for value, idx in sorted_values[lo:hi] if search(value)}
+
+    def _scan_literal(self, regex, field: str, column: list, literal: str) -> set:
+        # Only the values containing the literal can match; each is tested once, on its own
+        text = self.texts[field]
+        starts = self.starts[field]
+        find = text.find
+        search = regex.search
+        matches = set()
+        position = find(literal)
+        while position >= 0:
+            idx = bisect_left(starts, position + 1) - 1
+            if search(column[idx]):
+                matches.add(idx)
+            position = find(literal, starts[idx] + len(column[idx]) + 1)
+        return matches
+
+    def _scan_text(self, compiled: SankalitaPrarupa, field: str, column: list) -> set:
+        regex = compiled.regex
+        text = self.texts.get(field)
+        if text is None or _CONTEXT.search(regex.pattern):
+            # Values span lines, or the pattern has lookarounds or anchors at the ends of the whole text,
+            # which would read across the separator: test each value on its own
+            return {idx for idx, value in enumerate(column) if regex.search(value)}
+        starts = self.starts[field]
+        search = compiled.line_regex.search
+        matches = set()
+        position = 0
+        while position <= len(text):
+            match = search(text, position)
+            if match is None:
+                break
+            idx = bisect_left(starts, match.start() + 1) - 1
+            # The search text only finds candidates; a verb is a hit if its value matches on its own
+            if regex.search(column[idx]):
+                matches.add(idx)
+            position = starts[idx] + len(column[idx]) + 1
+        return matches
+
+    def search(self, pattern: str, search_fields: list, flags: int = 0) -> list:
+        """
+        Find the verbs with a field matching a pattern.
+
+        Args:
+            pattern: The regular expression, searched for anywhere in a field as with re.search.
+            search_fields: The fields to search, e.g. ["root", "dhatupatha"].
+            flags: re flags, e.g. re.IGNORECASE.
+
+        Returns:
+            The matching verbs, in list order.
+        """
+        key = (pattern, flags, tuple(search_fields))
+        matches = self.results.get(key)
+        if matches is ABHAVA:
+            compiled = get_pattern(pattern, flags)
+            regex = compiled.regex
+            indices = set()
+            for field in search_fields:
+                column = self._column(field)
+                literal = self._field_literal(field, compiled.literal, bool(flags & re.IGNORECASE))
+                if literal is None:
+                    continue
+                if literal and compiled.anchored:
+                    indices |= self._scan_range(regex, field, column, literal)
+                elif literal and field in self.texts:
+                    indices |= self._scan_literal(regex, field, column, literal)
+                else:
+                    indices |= self._scan_text(compiled, field, column)
+            matches = [self.verbs[idx] for idx in sorted(indices)]
+            self.results.put(key, matches)
+        return list(matches)
+
+def build_search_index(verb_info_list: Iterable, version=None) -> DhatuAnveshana:
+    """
+    Precompute the search index of a root list.
+
+    Args:
+        verb_info_list: DhātuInfo objects, or dict entries.
+        version: (Optional) The version of the data, e.g. DhatuKosha.version, to tell when the index is stale.
+
+    Returns:
+        A DhatuAnveshana.
+    """
+    anveshana = DhatuAnveshana(verb_info_list, version)
+    logger.debug(f"Indexed {len(anveshana.verbs)} verbs for search")
+    return anveshana
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    import timeit
+    from core.DhatuSmritiKosha import DhātuInfo
+
+    verbs = [DhātuInfo("गम्", "1", "", "", "gamḷ gatau", "parasmaipada", ""),
+             DhātuInfo("पठ्", "1", "", "", "paṭha vyaktāyāṃ vāci", "parasmaipada", ""),
+             DhātuInfo("पत्", "1", "", "", "patḷ gatau", "parasmaipada", "")]
+    anveshana = build_search_index(verbs)
+    print([verb.root for verb in anveshana.search("pat", ["root", "dhatupatha"], re.IGNORECASE)])
+    print([verb.root for verb in anveshana.search("^प", ["root"])])
+    print([verb.root for verb in anveshana.search("gatau$", ["dhatupatha"])])
+
+    # The index agrees with re.search on each value, including patterns that could read across values
+    adversarial = ["", "^", "$", "^$", "x*", r"(?<=\s)x", r"(?<!\s)g", r"u(?=\s)", r"u(?!\s)", r"\Ag", r"u\Z", r"\s", r"\S$",
+                   r"u\s*p", r"[^a]+", r"\bp", r"\Bu", "gatau$", "^pa", r"(?i)^PA", "ā", r"a.*\n.*p"]
+    verbs.append(DhātuInfo("xyz", "", "", "", "xyz", "", ""))
+    anveshana = build_search_index(verbs)
+    for pattern in adversarial:
+        for flags in (0, re.IGNORECASE):
+            regex = re.compile(pattern, flags)
+            expected = [verb for verb in verbs if any(regex.search(getattr(verb, field)) for field in ("root", "dhatupatha"))]
+            assert anveshana.search(pattern, ["root", "dhatupatha"], flags) == expected, (pattern, flags)
+    print(f"{len(adversarial)} adversarial patterns agree with a per-verb re.search")
+
+    # Benchmark: the keystrokes of a query over a 50,000-root list, against a per-verb scan
+    random.seed(0)
+    consonants = [chr(code) for code in range(0x915, 0x939)]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    verbs = [DhātuInfo("".join(random.choice(consonants) for _ in range(random.randint(2, 4))) + "्", str(random.randint(1, 10)), "", "",
+                       " ".join("".join(random.choice(letters) for _ in range(random.randint(3, 8))) for _ in range(3)), "parasmaipada", "")
+             for _ in range(50000)]
+    anveshana = build_search_index(verbs)
+    query = "ga.*tau"
+    keystrokes = [query[:end] for end in range(1, len(query) + 1) if not query[:end].endswith(".")]
+
+    def per_verb():
+        for pattern in keystrokes:
+            regex = re.compile(pattern, re.IGNORECASE)
+            [verb for verb in verbs if any(regex.search(getattr(verb, field)) for field in ("root", "dhatupatha"))]
+
+    def indexed():
+        anveshana.results.clear()
+        for pattern in keystrokes:
+            anveshana.search(pattern, ["root", "dhatupatha"], re.IGNORECASE)
+
+    anveshana.search("", ["root", "dhatupatha"])
+    for name, run in (("per-verb scan", per_verb), ("search index", indexed)):
+        elapsed = timeit.timeit(run, number=5) / (5 * len(keystrokes))
+        print(f"{name}: {elapsed * 1e3:,.2f} ms/keystroke over {len(verbs):,} verbs")
+    prefix_query = "^" + verbs[0].root[:2]
+    anveshana.search(prefix_query, ["root"])
+    elapsed = timeit.timeit(lambda: (anveshana.results.clear(), anveshana.search(prefix_query, ["root"])), number=100) / 100
+    print(f"prefix range scan: {elapsed * 1e6:,.1f} us/query")
@@ -0,0 +1,281 @@
+﻿import os
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+from core.DhatuSmritiKosha import LAKARA_VIDHI, PERSONS, NUMBERS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARASMAIPADA = "parasmaipada"
+ATMANEPADA = "atmanepada"
+PADAS = (PARASMAIPADA, ATMANEPADA)
+
+# One paradigm cell per row, in this column order
+COLUMNS = ("root", "lakara", "pada", "person", "number", "form")
+ROW_GROUP_SIZE = 65536
+COLUMNAR = "columnar"
+JSONL = "jsonl"
+
+# Per-worker state: the grammar library built by the pool initializer, and its endings per (tense, mood, pada)
+_grammar_library = None
+_endings = {}
+
+def _padas_of(verb_info, padas: tuple) -> tuple:
+    # A root declared parasmaipada or atmanepada is conjugated in that pada only; ubhayapada or undeclared roots in both
+    pada = getattr(verb_info, "pada", None)
+    if pada in PADAS and pada in padas:
+        return (pada,)
+    return padas
+
+def generate_paradigm(verb_info, grammar_library, lakaras: Optional[dict] = None, padas: tuple = PADAS, endings: Optional[dict] = None) -> list:
+    """
+    Generate the complete conjugation table of one root.
+
+    If the grammar library provides get_stem(root, tense, mood, pada) and
+    get_endings(tense, mood, pada), the stem is computed once per lakara and
+    pada and shared by its nine cells, the endings are computed once per
+    lakara and pada and kept in the endings cache, and each form is the
+    stem joined to an ending (with the library's join_stem(stem, ending) if
+    it has one, else by concatenation).
+    Otherwise every cell falls back to grammar_library.conjugate_verb, which
+    has no pada argument, so only the root's first pada is generated.
+
+    Args:
+        verb_info: A DhātuInfo (or anything with .root and .pada), or a bare root.
+        grammar_library: The grammar library.
+        lakaras: (Optional) Lakara -> (tense, mood); defaults to LAKARA_VIDHI.
+        padas: The padas to generate, where the root takes them.
+        endings: (Optional) A cache of this grammar library's endings, shared across calls with the same library.
+
+    Returns:
+        Rows of (root, lakara, pada, person, number, form), in COLUMNS order.
+    """
+    root = getattr(verb_info, "root", verb_info)
+    lakaras = lakaras or LAKARA_VIDHI
+    padas = _padas_of(verb_info, padas)
+    rows = []
+    if not (hasattr(grammar_library, "get_stem") and hasattr(grammar_library, "get_endings")):
+        for lakara, (tense, mood) in lakaras.items():
+            for person in PERSONS:
+                for number in NUMBERS:
+                    form = grammar_library.conjugate_verb(root, tense, mood, person, number)
+                    if form:
+                        rows.append((root, lakara, padas[0], person, number, form))
+        return rows
+
+    join_stem = getattr(grammar_library, "join_stem", None)
+    endings_cache = {} if endings is None else endings
+    for lakara, (tense, mood) in lakaras.items():
+        for pada in padas:
+            stem = grammar_library.get_stem(root, tense, mood, pada)
+            if not stem:
+                continue
+            key = (tense, mood, pada)
+            lakara_endings = endings_cache.get(key)
+            if lakara_endings is None:
+                lakara_endings = endings_cache[key] = tuple(grammar_library.get_endings(tense, mood, pada))
+            cells = ((person, number) for person in PERSONS for number in NUMBERS)
+            for (person, number), ending in zip(cells, lakara_endings):
+                if ending is not None:
+                    rows.append((root, lakara, pada, person, number, join_stem(stem, ending) if join_stem else stem + ending))
+    return rows
+
+def _init_worker(grammar_library_factory: Callable):
+    global _grammar_library, _endings
+    _grammar_library = grammar_library_factory()
+    _endings = {}
+
+def _generate_chunk(verb_infos: list, lakaras: Optional[dict], padas: tuple) -> list:
+    rows = []
+    for verb_info in verb_infos:
+        rows.extend(generate_paradigm(verb_info, _grammar_library, lakaras, padas, _endings))
+    return rows
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def generate_paradigms(verb_info_list: Iterable, grammar_library_factory: Callable, processes: Optional[int] = None,
+                       lakaras: Optional[dict] = None, padas: tuple = PADAS, chunksize: int = 64) -> Iterator[tuple]:
+    """
+    Generate the conjugation tables of many roots across a process pool.
+
+    Each worker builds its own grammar library once, with the factory, and
+    conjugates chunks of roots; rows are streamed back in root order as the
+    chunks finish, so the tables never have to fit in memory at once. At most
+    two chunks per worker are in flight, so the roots are read from
+    verb_info_list only as fast as the rows are consumed.
+
+    Args:
+        verb_info_list: The roots, e.g. DhātuInfo objects.
+        grammar_library_factory: A picklable callable returning a grammar library, e.g. the SanskritLibrary class.
+        processes: (Optional) The number of worker processes; 1 runs in this process. Defaults to the CPU count.
+        lakaras: (Optional) Lakara -> (tense, mood); defaults to LAKARA_VIDHI.
+        padas: The padas to generate.
+        chunksize: Roots per task sent to a worker.
+
+    Yields:
+        Rows of (root, lakara, pada, person, number, form).
+    """
+    if processes == 1:
+        grammar_library = grammar_library_factory()
+        endings = {}
+        for verb_info in verb_info_list:
+            yield from generate_paradigm(verb_info, grammar_library, lakaras, padas, endings)
+        return
+    window = 2 * (processes or os.cpu_count() or 1)
+    generate_chunk = partial(_generate_chunk, lakaras=lakaras, padas=padas)
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(grammar_library_factory,)) as executor:
+        pending = deque()
+        try:
+            for chunk in _chunks(verb_info_list, chunksize):
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(generate_chunk, chunk))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # A consumer that stops early leaves queued chunks behind; only those already running are waited for
+            for future in pending:
+                future.cancel()
+
+def write_paradigms_jsonl(rows: Iterable[tuple], filepath: str) -> int:
+    """
+    Stream paradigm rows to a JSON-lines file, one cell per line.
+
+    Args:
+        rows: Rows from generate_paradigms().
+        filepath: The file to write.
+
+    Returns:
+        The number of rows written.
+    """
+    count = 0
+    with open(filepath, 'w', encoding='utf-8') as file:
+        for count, row in enumerate(rows, 1):
+            file.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+    return count
+
+def write_paradigms_columnar(rows: Iterable[tuple], filepath: str, row_group_size: int = ROW_GROUP_SIZE) -> int:
+    """
+    Stream paradigm rows to a columnar file.
+
+    The layout follows Parquet's: after a header line, every row group of up
+    to row_group_size rows is one JSON line holding a list per column, so a
+    reader can load just the columns it needs and the repetitive root,
+    lakara and pada columns compress well.
+
+    Args:
+        rows: Rows from generate_paradigms().
+        filepath: The file to write.
+        row_group_size: The number of rows per row group.
+
+    Returns:
+        The number of rows written.
+    """
+    count = 0
+    with open(filepath, 'w', encoding='utf-8') as file:
+        file.write(json.dumps({"format": COLUMNAR, "columns": COLUMNS}) + "\n")
+        for group in _chunks(rows, row_group_size):
+            file.write(json.dumps({"rows": len(group), "columns": [list(column) for column in zip(*group)]}, ensure_ascii=False) + "\n")
+            count += len(group)
+    return count
+
+def iter_paradigm_rows(filepath: str) -> Iterator[dict]:
+    """
+    Read paradigm rows back from a JSON-lines or columnar file.
+
+    Args:
+        filepath: A file written by write_paradigms_jsonl() or write_paradigms_columnar().
+
+    Yields:
+        One dict per cell, keyed by COLUMNS.
+    """
+    with open(filepath, 'r', encoding='utf-8') as file:
+        first = file.readline()
+        if not first:
+            return
+        header = json.loads(first)
+        if header.get("format") != COLUMNAR:
+            yield header
+            for line in file:
+                yield json.loads(line)
+            return
+        columns = header["columns"]
+        for line in file:
+            for row in zip(*json.loads(line)["columns"]):
+                yield dict(zip(columns, row))
+
+def export_paradigms(verb_info_list: Iterable, grammar_library_factory: Callable, filepath: str, output_format: str = JSONL,
+                     processes: Optional[int] = None, lakaras: Optional[dict] = None, padas: tuple = PADAS) -> int:
+    """
+    Generate the conjugation tables of many roots straight into a file.
+
+    Args:
+        verb_info_list: The roots, e.g. DhātuInfo objects.
+        grammar_library_factory: A picklable callable returning a grammar library.
+        filepath: The file to write.
+        output_format: "jsonl" or "columnar".
+        processes: (Optional) The number of worker processes.
+        lakaras: (Optional) Lakara -> (tense, mood); defaults to LAKARA_VIDHI.
+        padas: The padas to generate.
+
+    Returns:
+        The number of cells written.
+    """
+    if output_format not in (JSONL, COLUMNAR):
+        logger.error(f"Unknown output format: {output_format}")
+        raise ValueError(f"Unknown output format: {output_format}")
+    rows = generate_paradigms(verb_info_list, grammar_library_factory, processes, lakaras, padas)
+    write = write_paradigms_jsonl if output_format == JSONL else write_paradigms_columnar
+    count = write(rows, filepath)
+    logger.info(f"Wrote {count} paradigm cells to {filepath}")
+    return count
+
+# A toy grammar library for the example; defined at module level so spawned worker processes can unpickle it
+class UdaharanaVyakarana:
+    """
+    A toy grammar library for the example: thematic लट् stems with their endings.
+    """
+
+    ENDINGS = {
+        PARASMAIPADA: ("ामि", "ावः", "ामः", "सि", "थः", "थ", "ति", "तः", "न्ति"),
+        ATMANEPADA: ("े", "ावहे", "ामहे", "से", "ेथे", "ध्वे", "ते", "ेते", "न्ते"),
+    }
+
+    def get_stem(self, root, tense, mood, pada):
+        if (tense, mood) != ("present", "indicative"):
+            return None
+        return root[:-1] if root.endswith("्") else root
+
+    def get_endings(self, tense, mood, pada):
+        return self.ENDINGS[pada]
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from core.DhatuSmritiKosha import DhātuInfo
+
+    print([row[-1] for row in generate_paradigm(DhātuInfo("पठ्", "1", "", "", "", PARASMAIPADA, ""), UdaharanaVyakarana())])
+
+    # Benchmark: a 2,000-root Dhatupatha, every lakara and both padas, one process vs a pool
+    consonants = [chr(code) for code in range(0x915, 0x939)]
+    roots = [DhātuInfo(consonants[idx % 36] + consonants[idx // 36 % 36] + "्", "1", "", "", "", "ubhayapada", "") for idx in range(2000)]
+    lakaras = {lakara: ("present", "indicative") for lakara in LAKARA_VIDHI}
+    with tempfile.TemporaryDirectory() as directory:
+        for processes, output_format in ((1, JSONL), (None, JSONL), (None, COLUMNAR)):
+            filepath = os.path.join(directory, f"paradigms.{output_format}")
+            started = time.perf_counter()
+            count = export_paradigms(roots, UdaharanaVyakarana, filepath, output_format, processes, lakaras)
+            elapsed = time.perf_counter() - started
+            print(f"{output_format}, {processes or os.cpu_count()} process(es): {count:,} cells in {elapsed:.2f} s "
+                  f"({count / elapsed:,.0f} cells/s, {os.path.getsize(filepath) / 1e6:.1f} MB)")
+        print("Read back:", next(iter_paradigm_rows(filepath)))
@@ -4,12 +4,33 @@ import re
 from collections import namedtuple
 from dependency.SanskritLibrary import SanskritLibrary
 from modules.kosha.VibhaktiKosha import VibhaktiKosha
-from ShabdaSamyojaka import ShabdaSamyojaka
+from modules.kosha.KoshaPratibimba import KoshaPratibimba, export_snapshot
+from modules.kosha.KoshaSankshepa import intern_value
+from core.Smriti import get_smriti, ABHAVA
+from core.DhatuAnveshana import DhatuAnveshana, build_search_index, get_pattern
 
 # Define Data Structures
 DhātuInfo = namedtuple('DhātuInfo', ['root', 'gana', 'shai', 'lachhana', 'dhatupatha', 'pada', 'padapada'])
-TaddhitaOptions = {}
-LakaraOptions = {}
+DhatuRupaVishleshana = namedtuple('DhatuRupaVishleshana', ['root', 'lakara', 'person', 'number', 'pada'])
+# Bounded, thread-safe caches shared through core.Smriti; entries are stamped with the dhatu data version
+TaddhitaOptions = get_smriti("taddhita_options", maxsize=4096)
+LakaraOptions = get_smriti("lakara_options", maxsize=4096)
+
+# The lakaras enumerated for the verb form index, with the (tense, mood) the grammar library conjugates them by
+LAKARA_VIDHI = {
+    "लट्": ("present", "indicative"),
+    "लिट्": ("perfect", "indicative"),
+    "लुट्": ("periphrastic_future", "indicative"),
+    "लृट्": ("future", "indicative"),
+    "लोट्": ("present", "imperative"),
+    "लङ्": ("imperfect", "indicative"),
+    "विधिलिङ्": ("present", "optative"),
+    "आशीर्लिङ्": ("present", "benedictive"),
+    "लुङ्": ("aorist", "indicative"),
+    "लृङ्": ("future", "conditional"),
+}
+PERSONS = (1, 2, 3)
+NUMBERS = ("singular", "dual", "plural")
 
 # Define Functions
 
@@ -18,11 +39,14 @@ def load_dhatu_data(filepath, validation_schema):
         with open(filepath, 'r', encoding='utf-8') as file:
             data = json.load(file)
             
-            # Validate and create DhātuInfo objects
-            dhātu_info_objects = [DhātuInfo(**{key: validation_schema[key](verb.get(key, '')) for key in validation_schema}) for verb in data.get('verbs', [])]
+            # Validate and create DhātuInfo objects; repeated values such as gana and pada are interned, so each is stored once
+            dhātu_info_objects = [DhātuInfo(**{key: intern_value(validation_schema[key](verb.get(key, ''))) for key in validation_schema}) for verb in data.get('verbs', [])]
             
             # Populate TaddhitaOptions and LakaraOptions based on your data structure
             
+            # Results cached for the previous data no longer apply
+            TaddhitaOptions.invalidate()
+            LakaraOptions.invalidate()
             return dhātu_info_objects
     except FileNotFoundError:
         print(f"Error: File not found at {filepath}")
@@ -32,35 +56,107 @@ def load_dhatu_data(filepath, validation_schema):
         print(f"Error loading data from {filepath}: {e}")
     return None
 
+def index_verbs(verb_info_list):
+    # Map each root to its first DhātuInfo, for get_verb_info
+    verb_index = {}
+    for verb_info in verb_info_list:
+        verb_index.setdefault(verb_info.root, verb_info)
+    return verb_index
+
 def get_verb_info(root, verb_info_list):
+    # A dict from index_verbs() answers with one lookup; a plain list is scanned
+    if isinstance(verb_info_list, dict):
+        return verb_info_list.get(root)
     return next((verb_info for verb_info in verb_info_list if verb_info.root == root), None)
 
 def get_all_verbs(verb_info_list):
     return iter(verb_info_list)
 
-def get_lakaras(verb_info, tense, mood, grammar_library):
+def get_lakaras(verb_info, tense, mood, grammar_library, version=None):
+    # version is that of the dhatu data, e.g. DhatuKosha.version; results cached for an older version are recomputed
     key = (verb_info, tense, mood)
-    if key not in LakaraOptions:
+    valid_lakaras = LakaraOptions.get(key, version)
+    if valid_lakaras is ABHAVA:
         # Example logic to get valid lakaras using the SanskritLibrary
         valid_lakaras = grammar_library.get_valid_lakaras(verb_info, tense, mood)
-        LakaraOptions[key] = valid_lakaras
-    return LakaraOptions.get(key, set())
+        LakaraOptions.put(key, valid_lakaras, version)
+    return valid_lakaras
 
-def get_taddhita_options(stem):
-    return TaddhitaOptions.get(stem, set())
+def get_taddhita_options(stem, version=None):
+    taddhita_options = TaddhitaOptions.get(stem, version)
+    return set() if taddhita_options is ABHAVA else taddhita_options
 
 def conjugate_verb(verb_info, tense, mood, person, number, grammar_library):
     # Use grammar library to conjugate the verb
     conjugated_verb = grammar_library.conjugate_verb(verb_info.root, tense, mood, person, number)
     return conjugated_verb
 
-def analyze_conjugated_verb(conjugated_verb, grammar_library):
-    # Use grammar library to analyze the conjugated verb
+def analyze_conjugated_verb(conjugated_verb, grammar_library, form_index=None):
+    # A precomputed verb form index answers with one lookup; the grammar library covers forms it lacks.
+    # Either way the result is a list of analyses, empty if the form is not recognised
+    if form_index is not None:
+        analyses = get_verb_form_analyses(conjugated_verb, form_index)
+        if analyses:
+            return list(analyses)
     analysis = grammar_library.analyze_conjugated_verb(conjugated_verb)
-    return analysis
+    if analysis is None:
+        return []
+    return list(analysis) if isinstance(analysis, list) else [analysis]
+
+def build_verb_form_index(verb_info_list, grammar_library, lakaras=None):
+    # Enumerate every finite form once: form -> [DhatuRupaVishleshana]
+    form_index = {}
+    for verb_info in verb_info_list:
+        for lakara, (tense, mood) in (lakaras or LAKARA_VIDHI).items():
+            for person in PERSONS:
+                for number in NUMBERS:
+                    form = conjugate_verb(verb_info, tense, mood, person, number, grammar_library)
+                    if form:
+                        form_index.setdefault(form, []).append(DhatuRupaVishleshana(verb_info.root, lakara, person, number, verb_info.pada))
+    return form_index
+
+def save_verb_form_index(form_index, filepath):
+    # One snapshot record per form; each analysis is a row of [root, lakara, person, number, pada] with the
+    # lakara, number and pada as positions in tables kept once in the snapshot's metadata
+    tables = {"lakaras": {}, "numbers": {}, "padas": {}}
+    def code(table, value):
+        return tables[table].setdefault(value, len(tables[table]))
+    records = [{"form": form,
+                "roots": sorted({analysis.root for analysis in analyses}),
+                "analyses": [[analysis.root, code("lakaras", analysis.lakara), analysis.person, code("numbers", analysis.number), code("padas", analysis.pada)]
+                             for analysis in analyses]}
+               for form, analyses in form_index.items()]
+    data = {"forms": records}
+    data.update((table, list(values)) for table, values in tables.items())
+    return export_snapshot(data, filepath, "forms", "form", ("roots",))
+
+def load_verb_form_index(filepath):
+    # Memory-mapped, so worker processes share one copy of the index
+    return KoshaPratibimba(filepath)
+
+def get_verb_form_analyses(form, form_index):
+    # form_index is either the dict from build_verb_form_index() or a loaded snapshot
+    if isinstance(form_index, dict):
+        return form_index.get(form, [])
+    record = form_index.get(form)
+    if record is None:
+        return []
+    lakaras, numbers, padas = form_index.metadata["lakaras"], form_index.metadata["numbers"], form_index.metadata["padas"]
+    return [DhatuRupaVishleshana(root, lakaras[lakara], person, numbers[number], padas[pada]) for root, lakara, person, number, pada in record["analyses"]]
+
+def get_verb_forms(root, form_index):
+    # Every indexed form of a root, from a loaded snapshot
+    return [record["form"] for record in form_index.search(roots=root)]
+
+def index_verbs_for_search(verb_info_list, version=None):
+    # Precompute the search texts of the verbs once, for repeated search_verbs calls
+    return build_search_index(verb_info_list, version)
 
 def search_verbs(pattern, search_fields, verb_info_list):
-    pattern = re.compile(pattern, re.IGNORECASE)  # Case insensitive search
+    # A DhatuAnveshana from index_verbs_for_search() scans its precomputed search texts; a plain list is scanned verb by verb
+    if isinstance(verb_info_list, DhatuAnveshana):
+        return verb_info_list.search(pattern, search_fields, re.IGNORECASE)  # Case insensitive search
+    pattern = get_pattern(pattern, re.IGNORECASE).regex  # Case insensitive search
     return [verb_info for verb_info in verb_info_list if any(pattern.search(getattr(verb_info, field)) for field in search_fields)]
 
 def inflect_verb_case(conjugated_verb, case, grammar_library):
@@ -83,7 +179,7 @@ if __name__ == "__main__":
         verb_info_list = dhātu_smriti_data
 
         # Get information for verb "gam"
-        verb_info = get_verb_info("gam", verb_info_list)
+        verb_info = get_verb_info("gam", index_verbs(verb_info_list))
 
         if verb_info:
             # Check valid lakaras for present tense, indicative mood
@@ -92,11 +188,15 @@ if __name__ == "__main__":
             # Conjugate verb in present tense, indicative mood, 3rd person singular
             conjugated_verb = conjugate_verb(verb_info, "present", "indicative", 3, "singular", SanskritLibrary())
 
+            # Build the verb form index once and store it; analysis is then one lookup
+            save_verb_form_index(build_verb_form_index(verb_info_list, SanskritLibrary()), "path/to/verb_forms.snapshot")
+            form_index = load_verb_form_index("path/to/verb_forms.snapshot")
+
             # Analyze conjugated verb for details
-            analysis = analyze_conjugated_verb(conjugated_verb, SanskritLibrary())
+            analysis = analyze_conjugated_verb(conjugated_verb, SanskritLibrary(), form_index)
 
             # Search verbs containing "pat" in their root or dhatupatha
-            verbs_with_pat = search_verbs("pat", ["root", "dhatupatha"], verb_info_list)
+            verbs_with_pat = search_verbs("pat", ["root", "dhatupatha"], index_verbs_for_search(verb_info_list))
 
             # Inflect the conjugated verb in accusative case
             inflected_verb = inflect_verb_case(conjugated_verb, "accusative", SanskritLibrary())
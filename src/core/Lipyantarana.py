@@ -0,0 +1,339 @@
+﻿import logging
+from typing import Iterable, Iterator
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Phoneme kinds
+SVARA = "svara"
+VYANJANA = "vyanjana"
+ANYA = "anya"
+
+DEVANAGARI = "devanagari"
+VIRAMA = "्"
+
+# Phonemes are identified by their SLP1 letter, which is one ASCII character each.
+# Devanagari: id -> (independent form, vowel sign); "a" has no vowel sign.
+DEVANAGARI_SVARA = {
+    "a": ("अ", ""), "A": ("आ", "ा"), "i": ("इ", "ि"), "I": ("ई", "ी"), "u": ("उ", "ु"), "U": ("ऊ", "ू"),
+    "f": ("ऋ", "ृ"), "F": ("ॠ", "ॄ"), "x": ("ऌ", "ॢ"), "X": ("ॡ", "ॣ"),
+    "e": ("ए", "े"), "E": ("ऐ", "ै"), "o": ("ओ", "ो"), "O": ("औ", "ौ"),
+}
+DEVANAGARI_VYANJANA = {
+    "k": "क", "K": "ख", "g": "ग", "G": "घ", "N": "ङ",
+    "c": "च", "C": "छ", "j": "ज", "J": "झ", "Y": "ञ",
+    "w": "ट", "W": "ठ", "q": "ड", "Q": "ढ", "R": "ण",
+    "t": "त", "T": "थ", "d": "द", "D": "ध", "n": "न",
+    "p": "प", "P": "फ", "b": "ब", "B": "भ", "m": "म",
+    "y": "य", "r": "र", "l": "ल", "v": "व", "S": "श", "z": "ष", "s": "स", "h": "ह",
+}
+DEVANAGARI_ANYA = {
+    "M": "ं", "H": "ः", "~": "ँ", "'": "ऽ", ".": "।", "..": "॥",
+    "0": "०", "1": "१", "2": "२", "3": "३", "4": "४", "5": "५", "6": "६", "7": "७", "8": "८", "9": "९",
+}
+
+PHONEME_KINDS = {}
+PHONEME_KINDS.update((phoneme, SVARA) for phoneme in DEVANAGARI_SVARA)
+PHONEME_KINDS.update((phoneme, VYANJANA) for phoneme in DEVANAGARI_VYANJANA)
+PHONEME_KINDS.update((phoneme, ANYA) for phoneme in DEVANAGARI_ANYA)
+
+# SLP1 spells every phoneme with one ASCII character, so engines can index phonemes directly
+SLP1_SVARA = frozenset(DEVANAGARI_SVARA)
+SLP1_VYANJANA = frozenset(DEVANAGARI_VYANJANA)
+
+_DIGITS = {digit: [digit] for digit in "0123456789"}
+
+# Roman schemes: id -> spellings; the first spelling is used for output, all are accepted on input
+ROMAN_SCHEMES = {
+    "slp1": dict({phoneme: [phoneme] for phoneme in PHONEME_KINDS}),
+    "iast": dict({
+        "a": ["a"], "A": ["ā"], "i": ["i"], "I": ["ī"], "u": ["u"], "U": ["ū"],
+        "f": ["ṛ"], "F": ["ṝ"], "x": ["ḷ"], "X": ["ḹ"], "e": ["e"], "E": ["ai"], "o": ["o"], "O": ["au"],
+        "k": ["k"], "K": ["kh"], "g": ["g"], "G": ["gh"], "N": ["ṅ"],
+        "c": ["c"], "C": ["ch"], "j": ["j"], "J": ["jh"], "Y": ["ñ"],
+        "w": ["ṭ"], "W": ["ṭh"], "q": ["ḍ"], "Q": ["ḍh"], "R": ["ṇ"],
+        "t": ["t"], "T": ["th"], "d": ["d"], "D": ["dh"], "n": ["n"],
+        "p": ["p"], "P": ["ph"], "b": ["b"], "B": ["bh"], "m": ["m"],
+        "y": ["y"], "r": ["r"], "l": ["l"], "v": ["v"], "S": ["ś"], "z": ["ṣ"], "s": ["s"], "h": ["h"],
+        "M": ["ṃ", "ṁ"], "H": ["ḥ"], "~": ["m̐"], "'": ["'"], ".": ["|"], "..": ["||"],
+    }, **_DIGITS),
+    "hk": dict({
+        "a": ["a"], "A": ["A"], "i": ["i"], "I": ["I"], "u": ["u"], "U": ["U"],
+        "f": ["R"], "F": ["RR"], "x": ["lR"], "X": ["lRR"], "e": ["e"], "E": ["ai"], "o": ["o"], "O": ["au"],
+        "k": ["k"], "K": ["kh"], "g": ["g"], "G": ["gh"], "N": ["G"],
+        "c": ["c"], "C": ["ch"], "j": ["j"], "J": ["jh"], "Y": ["J"],
+        "w": ["T"], "W": ["Th"], "q": ["D"], "Q": ["Dh"], "R": ["N"],
+        "t": ["t"], "T": ["th"], "d": ["d"], "D": ["dh"], "n": ["n"],
+        "p": ["p"], "P": ["ph"], "b": ["b"], "B": ["bh"], "m": ["m"],
+        "y": ["y"], "r": ["r"], "l": ["l"], "v": ["v"], "S": ["z"], "z": ["S"], "s": ["s"], "h": ["h"],
+        "M": ["M"], "H": ["H"], "~": ["~"], "'": ["'"], ".": ["|"], "..": ["||"],
+    }, **_DIGITS),
+    "itrans": dict({
+        "a": ["a"], "A": ["A", "aa"], "i": ["i"], "I": ["I", "ii"], "u": ["u"], "U": ["U", "uu"],
+        "f": ["RRi", "R^i"], "F": ["RRI", "R^I"], "x": ["LLi", "L^i"], "X": ["LLI", "L^I"],
+        "e": ["e"], "E": ["ai"], "o": ["o"], "O": ["au"],
+        "k": ["k"], "K": ["kh"], "g": ["g"], "G": ["gh"], "N": ["~N"],
+        "c": ["ch", "c"], "C": ["Ch", "chh"], "j": ["j"], "J": ["jh"], "Y": ["~n"],
+        "w": ["T"], "W": ["Th"], "q": ["D"], "Q": ["Dh"], "R": ["N"],
+        "t": ["t"], "T": ["th"], "d": ["d"], "D": ["dh"], "n": ["n"],
+        "p": ["p"], "P": ["ph"], "b": ["b"], "B": ["bh"], "m": ["m"],
+        "y": ["y"], "r": ["r"], "l": ["l"], "v": ["v", "w"], "S": ["sh"], "z": ["Sh", "shh"], "s": ["s"], "h": ["h"],
+        "M": ["M", ".n", ".m"], "H": ["H"], "~": [".N"], "'": [".a"], ".": ["|"], "..": ["||"],
+    }, **_DIGITS),
+}
+
+SCHEMES = (DEVANAGARI,) + tuple(ROMAN_SCHEMES)
+
+# Trie key marking the end of a spelling; its value is the phoneme id
+TRIE_ANTA = None
+
+def _build_trie(spellings: dict) -> dict:
+    trie = {}
+    for phoneme, forms in spellings.items():
+        for form in forms:
+            node = trie
+            for char in form:
+                node = node.setdefault(char, {})
+            node.setdefault(TRIE_ANTA, phoneme)
+    return trie
+
+def _longest_match(trie: dict, text: str, start: int) -> tuple:
+    node = trie
+    match, end = None, start
+    for position in range(start, len(text)):
+        node = node.get(text[position])
+        if node is None:
+            break
+        if TRIE_ANTA in node:
+            match, end = node[TRIE_ANTA], position + 1
+    return match, end
+
+class Lipyantaraka:
+    """
+    Table-driven transliterator between Devanagari and the common romanizations.
+
+    Input is read with a longest-match trie over the source scheme's spellings
+    into a stream of phonemes, which is then spelled out in the target scheme.
+    Devanagari needs context on both sides: an unmarked consonant carries an
+    inherent "a", and a consonant followed by another consonant takes a virama.
+    """
+
+    def __init__(self, source: str, target: str):
+        if source not in SCHEMES or target not in SCHEMES:
+            logger.error(f"Unknown scheme: {source if source not in SCHEMES else target}")
+            raise ValueError(f"Unknown scheme: {source if source not in SCHEMES else target}")
+        self.source = source
+        self.target = target
+        if source == DEVANAGARI:
+            spellings = {phoneme: [letter] for phoneme, letter in DEVANAGARI_VYANJANA.items()}
+            spellings.update((phoneme, [independent]) for phoneme, (independent, _) in DEVANAGARI_SVARA.items())
+            spellings.update((phoneme, [sign]) for phoneme, sign in DEVANAGARI_ANYA.items())
+            self.matra = {sign: phoneme for phoneme, (_, sign) in DEVANAGARI_SVARA.items() if sign}
+        else:
+            spellings = ROMAN_SCHEMES[source]
+        self.trie = _build_trie(spellings)
+        # Characters a stream may not be cut after: one a longer spelling can continue past, or one that ends
+        # a consonant, whose vowel or virama is decided by what follows
+        self.no_cut = frozenset(char for forms in spellings.values() for form in forms for char in form[:-1])
+        self.no_cut |= {form[-1] for phoneme, forms in spellings.items() if PHONEME_KINDS[phoneme] == VYANJANA for form in forms}
+        self.no_cut |= {VIRAMA}
+        if target != DEVANAGARI:
+            self.spelling = {phoneme: forms[0] for phoneme, forms in ROMAN_SCHEMES[target].items()}
+
+    def read(self, text: str) -> Iterator[tuple]:
+        """
+        Read text in the source scheme as a stream of phonemes.
+
+        Args:
+            text: The source text.
+
+        Yields:
+            (kind, phoneme) tuples; characters outside the scheme come through
+            as (None, char).
+        """
+        trie = self.trie
+        kinds = PHONEME_KINDS
+        devanagari = self.source == DEVANAGARI
+        position, size = 0, len(text)
+        while position < size:
+            phoneme, end = _longest_match(trie, text, position)
+            if phoneme is None:
+                yield None, text[position]
+                position += 1
+                continue
+            kind = kinds[phoneme]
+            yield kind, phoneme
+            position = end
+            if devanagari and kind == VYANJANA:
+                # The vowel of a Devanagari consonant is its sign, none after a virama, or the inherent a
+                next_char = text[position] if position < size else ""
+                if next_char in self.matra:
+                    yield SVARA, self.matra[next_char]
+                    position += 1
+                elif next_char == VIRAMA:
+                    position += 1
+                else:
+                    yield SVARA, "a"
+
+    def write(self, phonemes: Iterable[tuple]) -> str:
+        """
+        Spell a stream of phonemes in the target scheme.
+
+        Args:
+            phonemes: (kind, phoneme) tuples as produced by read().
+
+        Returns:
+            The text in the target scheme.
+        """
+        output = []
+        if self.target != DEVANAGARI:
+            spelling = self.spelling
+            for kind, phoneme in phonemes:
+                output.append(phoneme if kind is None else spelling[phoneme])
+            return "".join(output)
+
+        pending = False  # the last consonant has no vowel yet
+        for kind, phoneme in phonemes:
+            if kind == SVARA:
+                independent, sign = DEVANAGARI_SVARA[phoneme]
+                output.append(sign if pending else independent)
+                pending = False
+                continue
+            if pending:
+                output.append(VIRAMA)
+            if kind == VYANJANA:
+                output.append(DEVANAGARI_VYANJANA[phoneme])
+                pending = True
+            else:
+                output.append(phoneme if kind is None else DEVANAGARI_ANYA[phoneme])
+                pending = False
+        if pending:
+            output.append(VIRAMA)
+        return "".join(output)
+
+    def transliterate(self, text: str) -> str:
+        """
+        Transliterate text from the source scheme to the target scheme.
+
+        Args:
+            text: The source text.
+
+        Returns:
+            The transliterated text.
+        """
+        return self.write(self.read(text))
+
+    def iter_transliterate(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Transliterate a stream of text chunks.
+
+        Each chunk is cut after its last character that no spelling
+        continues past and that leaves no consonant waiting for its vowel,
+        such as whitespace, a danda or a vowel, and the remainder is carried
+        into the next one; the carry stays short even in text without spaces.
+
+        Args:
+            chunks: An iterable of text chunks, e.g. a file object.
+
+        Yields:
+            Transliterated chunks.
+        """
+        no_cut = self.no_cut
+        carry = ""
+        for chunk in chunks:
+            text = carry + chunk
+            cut = len(text)
+            while cut and text[cut - 1] in no_cut:
+                cut -= 1
+            if cut:
+                yield self.transliterate(text[:cut])
+            carry = text[cut:]
+        if carry:
+            yield self.transliterate(carry)
+
+    def transliterate_file(self, input_path: str, output_path: str, chunk_size: int = 1 << 16):
+        """
+        Transliterate a file, streaming it in chunks so memory stays flat.
+
+        Args:
+            input_path: Path to the source file.
+            output_path: Path to write the transliterated file to.
+            chunk_size: The number of characters read at a time.
+        """
+        with open(input_path, 'r', encoding='utf-8-sig') as source_file, open(output_path, 'w', encoding='utf-8') as target_file:
+            chunks = iter(lambda: source_file.read(chunk_size), "")
+            for chunk in self.iter_transliterate(chunks):
+                target_file.write(chunk)
+
+_LIPYANTARAKAS = {}
+
+def get_lipyantaraka(source: str, target: str) -> Lipyantaraka:
+    """
+    Get the compiled transliterator for a pair of schemes, building it once.
+
+    Args:
+        source: The source scheme, one of SCHEMES.
+        target: The target scheme, one of SCHEMES.
+
+    Returns:
+        The shared Lipyantaraka for that pair.
+    """
+    key = (source, target)
+    if key not in _LIPYANTARAKAS:
+        _LIPYANTARAKAS[key] = Lipyantaraka(source, target)
+    return _LIPYANTARAKAS[key]
+
+def transliterate(text: str, source: str, target: str) -> str:
+    """
+    Transliterate text between two schemes.
+
+    Args:
+        text: The source text.
+        source: The source scheme, one of SCHEMES.
+        target: The target scheme, one of SCHEMES.
+
+    Returns:
+        The transliterated text.
+    """
+    return get_lipyantaraka(source, target).transliterate(text)
+
+def to_slp1(text: str, source: str = DEVANAGARI) -> str:
+    """
+    Convert text to SLP1, the one-character-per-phoneme internal encoding.
+
+    Args:
+        text: The source text.
+        source: The source scheme, one of SCHEMES.
+
+    Returns:
+        The text in SLP1.
+    """
+    return get_lipyantaraka(source, "slp1").transliterate(text)
+
+def from_slp1(text: str, target: str = DEVANAGARI) -> str:
+    """
+    Convert SLP1 text back to an external scheme.
+
+    Args:
+        text: The SLP1 text.
+        target: The target scheme, one of SCHEMES.
+
+    Returns:
+        The text in the target scheme.
+    """
+    return get_lipyantaraka("slp1", target).transliterate(text)
+
+# Example usage
+if __name__ == "__main__":
+    verse = "धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः ।"
+    for scheme in ROMAN_SCHEMES:
+        roman = transliterate(verse, DEVANAGARI, scheme)
+        print(f"{scheme}:", roman)
+        assert transliterate(roman, scheme, DEVANAGARI) == verse
+
+    # Bulk throughput
+    import timeit
+    corpus = (verse + "\n") * 20000
+    elapsed = timeit.timeit(lambda: transliterate(corpus, DEVANAGARI, "slp1"), number=1)
+    print(f"devanagari -> slp1: {len(corpus) / elapsed:,.0f} chars/sec")
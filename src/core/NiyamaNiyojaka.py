@@ -1,9 +1,10 @@
-﻿import re
+﻿import os
 from collections import namedtuple
 from modules.kosha.SamyuktaKosha import SamyuktaKosha
 from modules.kosha.DhatuKosha import DhatuKosha
 from modules.kosha.VibhaktiKosha import VibhaktiKosha
-from core.ShabdaSamyojaka import ShabdaSamyojaka
+from modules.vyakarana.SandhiSamyojaka import SandhiSamyojaka
+from core.DhatuAnveshana import build_search_index
 
 # Namedtuples for data representation
 StemInfo = namedtuple("StemInfo", ["root", "pada", "gana", "shai"])
@@ -14,7 +15,8 @@ class NiyamaNiyojaka:
         self.samyukta_kosha = samyukta_kosha
         self.dhatu_kosha = dhatu_kosha
         self.vibhakti_kosha = vibhakti_kosha
-        self.shabda_samyojaka = ShabdaSamyojaka()
+        self.sandhi_samyojaka = SandhiSamyojaka()
+        self.anveshana = None
 
     def is_compatible_stems(self, stem1: StemInfo, stem2: StemInfo) -> bool:
         return stem1.gana == stem2.gana and stem1.shai == stem2.shai
@@ -22,7 +24,7 @@ class NiyamaNiyojaka:
     def form_samyukta(self, stem1: StemInfo, stem2: StemInfo) -> str:
         if not self.is_compatible_stems(stem1, stem2):
             raise ValueError("Incompatible stems for compound formation")
-        return self.shabda_samyojaka.sandhi_sandhi(stem1.root, stem2.root)
+        return self.sandhi_samyojaka.apply_sandhi(stem1.root, stem2.root)
 
     def analyze_samyukta(self, samyukta_word: str) -> list:
         # Implement word decomposition and component analysis
@@ -34,7 +36,7 @@ class NiyamaNiyojaka:
     def form_taddhita(self, stem: StemInfo, taddhita: str) -> str:
         if not self.is_valid_taddhita(stem, taddhita):
             raise ValueError("Invalid taddhita formation for stem")
-        return self.shabda_samyojaka.sandhi_sandhi(stem.root, taddhita)
+        return self.sandhi_samyojaka.apply_sandhi(stem.root, taddhita)
 
     def analyze_taddhita(self, taddhita_word: str) -> list:
         # Implement word decomposition and component analysis
@@ -56,7 +58,8 @@ class NiyamaNiyojaka:
     def inflect_verb(self, verb_info: VerbInfo, tense: str, mood: str, person: int, number: str) -> str:
         if tense not in self.get_valid_lakaras(verb_info, tense, mood):
             raise ValueError("Invalid tense for conjugating verb")
-        return self.shabda_samyojaka.sandhi_sandhi(self.dhatu_kosha.conjugate_verb(verb_info, tense, mood, person, number))
+        # A single conjugated form has no word boundary for sandhi to apply at
+        return self.dhatu_kosha.conjugate_verb(verb_info, tense, mood, person, number)
 
     def analyze_akhyata(self, conjugated_verb: str) -> list:
         # Implement breakdown and analysis of conjugated verb
@@ -75,26 +78,30 @@ class NiyamaNiyojaka:
         return ["possible_compound_1", "possible_compound_2", "possible_compound_3"]
 
     def search_verbs_by_pattern(self, pattern: str, search_fields: list) -> list:
-        pattern = re.compile(pattern)
-        return [verb_info for verb_info in self.dhatu_kosha.get_all_verbs() if any(pattern.search(getattr(verb_info, field)) for field in search_fields)]
+        # The search index over the kosha's entries is rebuilt only when the kosha has changed since it was built
+        dhatus = self.dhatu_kosha.data.get("Dhatus", [])
+        if self.anveshana is None or self.anveshana.version != self.dhatu_kosha.version:
+            self.anveshana = build_search_index(dhatus, self.dhatu_kosha.version)
+        return self.anveshana.search(pattern, search_fields)
 
     def inflect_verb_case(self, verb_info: VerbInfo, case: str) -> str:
         return self.vibhakti_kosha.inflect_case(verb_info, case)
 
 # Example Usage:
-samyukta_kosha_instance = SamyuktaKosha()  # Replace with actual instances
-dhatu_kosha_instance = DhatuKosha()
-vibhakti_kosha_instance = VibhaktiKosha()
-niyama_niyojaka = NiyamaNiyojaka(samyukta_kosha_instance, dhatu_kosha_instance, vibhakti_kosha_instance)
-
-# Test the additional functions
-compound_word = "example_compound"
-if niyama_niyojaka.is_valid_compound(compound_word):
-    print(f"The compound word '{compound_word}' is valid.")
-    meaning_analysis_result = niyama_niyojaka.analyze_meaning(compound_word)
-    print("Meaning Analysis Result:", meaning_analysis_result)
-else:
-    print(f"The compound word '{compound_word}' is not valid.")
-
-possible_compounds = niyama_niyojaka.generate_possible_compounds("example_base_word")
-print("Possible Compound Words:", possible_compounds)
+if __name__ == "__main__":
+    samyukta_kosha_instance = SamyuktaKosha(os.path.join(os.path.dirname(__file__), "..", "modules", "kosha", "SamyuktaKosha.json"))
+    dhatu_kosha_instance = DhatuKosha()
+    vibhakti_kosha_instance = VibhaktiKosha()
+    niyama_niyojaka = NiyamaNiyojaka(samyukta_kosha_instance, dhatu_kosha_instance, vibhakti_kosha_instance)
+
+    # Test the additional functions
+    compound_word = "example_compound"
+    if niyama_niyojaka.is_valid_compound(compound_word):
+        print(f"The compound word '{compound_word}' is valid.")
+        meaning_analysis_result = niyama_niyojaka.analyze_meaning(compound_word)
+        print("Meaning Analysis Result:", meaning_analysis_result)
+    else:
+        print(f"The compound word '{compound_word}' is not valid.")
+
+    possible_compounds = niyama_niyojaka.generate_possible_compounds("example_base_word")
+    print("Possible Compound Words:", possible_compounds)
@@ -0,0 +1,151 @@
+﻿import threading
+from collections import OrderedDict, namedtuple
+
+SmritiInfo = namedtuple("SmritiInfo", ["hits", "misses", "maxsize", "currsize", "hit_rate"])
+
+# Sentinel for "not cached", since None is a valid cached result
+ABHAVA = object()
+
+# Named caches shared across the core modules
+SMRITI_SUCHI = {}
+_SUCHI_LOCK = threading.Lock()
+
+class Smriti:
+    """
+    Bounded, thread-safe LRU cache with version-stamped entries.
+
+    Each entry remembers the version of the data it was computed from, e.g.
+    a kosha's version counter; a lookup with a newer version treats the
+    entry as missing and drops it, so results never outlive the lexicon
+    edit that made them stale. Once the cache holds maxsize entries the
+    least recently used one is evicted.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version=None):
+        """
+        Look up a key, marking it as most recently used.
+
+        Args:
+            key: The cache key; any hashable value.
+            version: (Optional) The current version of the data the result depends on.
+
+        Returns:
+            The cached result, or ABHAVA if the key is not cached or its entry is stale.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return ABHAVA
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, version=None):
+        """
+        Cache a result, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key.
+            value: The result to cache.
+            version: (Optional) The version of the data the result was computed from.
+        """
+        if self.maxsize == 0:
+            return
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        """
+        Change the maximum number of cached entries, evicting as needed.
+
+        Args:
+            maxsize: The new maximum size; 0 disables caching.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Drop all cached entries, keeping the hit/miss counters.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def clear(self):
+        """
+        Drop all cached entries and reset the hit/miss counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> SmritiInfo:
+        """
+        Report cache statistics.
+
+        Returns:
+            A SmritiInfo with hits, misses, maxsize, current size and hit rate.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return SmritiInfo(self.hits, self.misses, self.maxsize, len(self.entries), self.hits / lookups if lookups else 0.0)
+
+def get_smriti(name: str, maxsize: int = 4096) -> Smriti:
+    """
+    Get a named shared cache, creating it on first use.
+
+    Args:
+        name: The cache name, e.g. "lakara_options".
+        maxsize: The maximum size if the cache is created now.
+
+    Returns:
+        The Smriti registered under the name.
+    """
+    with _SUCHI_LOCK:
+        smriti = SMRITI_SUCHI.get(name)
+        if smriti is None:
+            smriti = SMRITI_SUCHI[name] = Smriti(maxsize)
+        return smriti
+
+def smriti_info() -> dict:
+    """
+    Report the statistics of every named cache.
+
+    Returns:
+        A dict from cache name to SmritiInfo.
+    """
+    with _SUCHI_LOCK:
+        caches = list(SMRITI_SUCHI.items())
+    return {name: smriti.info() for name, smriti in caches}
+
+# Example usage
+if __name__ == "__main__":
+    smriti = get_smriti("example", maxsize=2)
+    smriti.put("गम्", {"लट्", "लङ्"}, version=1)
+    print(smriti.get("गम्", version=1))
+    print(smriti.get("गम्", version=2) is ABHAVA)  # stale after the data moved to version 2
+    smriti.put("a", 1)
+    smriti.put("b", 2)
+    smriti.put("c", 3)  # evicts "a"
+    print(smriti.get("a") is ABHAVA, smriti.get("c"))
+    print(smriti_info())
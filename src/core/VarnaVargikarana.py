@@ -0,0 +1,71 @@
+﻿# Code-point classes for the Devanagari block
+ANYA = 0
+SVARA = 1
+VYANJANA = 2
+MATRA = 3
+VIRAMA = 4
+VISARGA = 5
+ANUSVARA = 6
+ANKA = 7
+
+VARGA_NAMES = {ANYA: "anya", SVARA: "svara", VYANJANA: "vyanjana", MATRA: "matra", VIRAMA: "virama", VISARGA: "visarga", ANUSVARA: "anusvara", ANKA: "anka"}
+
+# Devanagari block, U+0900 to U+097F
+DEVANAGARI_START = 0x0900
+DEVANAGARI_END = 0x0980
+
+def _build_varga_table() -> bytes:
+    table = bytearray(DEVANAGARI_END - DEVANAGARI_START)
+    ranges = [
+        (0x0900, 0x0902, ANUSVARA),  # inverted candrabindu, candrabindu, anusvara
+        (0x0903, 0x0903, VISARGA),
+        (0x0904, 0x0914, SVARA),
+        (0x0915, 0x0939, VYANJANA),
+        (0x093A, 0x093B, MATRA),
+        (0x093E, 0x094C, MATRA),
+        (0x094D, 0x094D, VIRAMA),
+        (0x094E, 0x094F, MATRA),
+        (0x0955, 0x0957, MATRA),
+        (0x0958, 0x095F, VYANJANA),  # nukta forms
+        (0x0960, 0x0961, SVARA),
+        (0x0962, 0x0963, MATRA),
+        (0x0966, 0x096F, ANKA),
+        (0x0972, 0x0977, SVARA),
+        (0x0978, 0x097F, VYANJANA),
+    ]
+    for start, end, varga in ranges:
+        for code_point in range(start, end + 1):
+            table[code_point - DEVANAGARI_START] = varga
+    return bytes(table)
+
+# Precomputed class of every code point in the block, indexed by code point - U+0900
+VARNA_VARGA = _build_varga_table()
+
+class _VargaSarani(dict):
+    """
+    The classification table keyed by character, for scalar Python code.
+
+    Every code point of the block is present, so hits are a single dict probe;
+    anything else (other scripts, whitespace, multi-character strings) falls
+    through to ANYA.
+    """
+
+    def __missing__(self, char):
+        return ANYA
+
+VARGA_SARANI = _VargaSarani((chr(DEVANAGARI_START + index), varga) for index, varga in enumerate(VARNA_VARGA))
+
+# get_varga(char) -> SVARA, VYANJANA, MATRA, VIRAMA, VISARGA, ANUSVARA, ANKA or ANYA
+get_varga = VARGA_SARANI.__getitem__
+
+def is_devanagari(text: str) -> bool:
+    """
+    Check whether every character of a (short) string is in the Devanagari block.
+
+    Args:
+        text: The character or short string, e.g. "त्", to check.
+
+    Returns:
+        True if text is non-empty and entirely Devanagari, False otherwise.
+    """
+    return bool(text) and all(DEVANAGARI_START <= ord(char) < DEVANAGARI_END for char in text)
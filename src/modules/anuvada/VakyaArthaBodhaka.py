@@ -1,6 +1,7 @@
 ﻿from collections import namedtuple
-from sanskritnlp import SktTokenizer, SandhiSplitter
+from sanskritnlp import SktTokenizer
 from mimansaparser import SanskritParser
+from modules.vyakarana.SandhiViccheda import get_kosha_viccheda
 
 SemanticUnit = namedtuple("SemanticUnit", ["node", "shabda", "role", "karaka", "modifiers", "presuppositions"])
 
@@ -8,7 +9,8 @@ class VakyaArthaBodhaka:
     def __init__(self):
         # Initialize resources and tools for semantic analysis
         self.tokenizer = SktTokenizer()
-        self.sandhi_splitter = SandhiSplitter()
+        # The kosha splitter is shared and built on first use; assign another SandhiViccheda to override it
+        self.sandhi_splitter = None
         self.parser = SanskritParser()
 
     def analyze_sentence(self, sentence, context=None):
@@ -45,7 +47,9 @@ class VakyaArthaBodhaka:
         return semantic_units
 
     def tokenize_sentence(self, sentence):
-        # Tokenize the sentence into words or phrases
+        # Tokenize the sentence into words, undoing sandhi against the kosha lexicons
+        if self.sandhi_splitter is None:
+            self.sandhi_splitter = get_kosha_viccheda()
         tokens = self.sandhi_splitter.split(sentence)
         return tokens
 
@@ -1,139 +1,95 @@
-﻿import os
-import json
-import logging
-from jsonschema import validate, ValidationError
+﻿import logging
+from modules.kosha.KoshaMula import KoshaMula
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class DhatuKosha:
-    def __init__(self):
-        self.filepath = os.path.join(os.path.dirname(__file__), "DhatuKosha.json")
-        self.schema = {
-            "$schema": "http://json-schema.org/draft-07/schema#",
-            "title": "DhatuKosha",
-            "type": "object",
-            "properties": {
-                "Dhatus": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "dhatu": { "type": "string" },
-                            "gana": { "type": "string" },
-                            "lakshana": { "type": "string" },
-                            "example_usage": { "type": "string" },
-                            "meaning": { "type": "string" },
-                            "tense_usage": {
-                                "type": "object",
-                                "properties": {
-                                    "present": { "type": "string" },
-                                    "past": { "type": "string" },
-                                    "future": { "type": "string" }
-                                },
-                                "required": ["present", "past", "future"]
-                            }
-                        },
-                        "required": ["dhatu", "gana", "lakshana", "example_usage", "meaning", "tense_usage"]
-                    }
+class DhatuKosha(KoshaMula):
+    COLLECTION = "Dhatus"
+    KEY_FIELD = "dhatu"
+    FILENAME = "DhātuKosha.json"
+    REQUIRED_KEYS = ("dhatu", "gana", "lakshana", "example_usage", "meaning", "tense_usage")
+    ENTRY_NAME = "dhatu info"
+    ENTRY_LABEL = "Dhatu"
+    logger = logger
+    schema = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": "DhatuKosha",
+        "type": "object",
+        "properties": {
+            "Dhatus": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "dhatu": { "type": "string" },
+                        "gana": { "type": "string" },
+                        "lakshana": { "type": "string" },
+                        "example_usage": { "type": "string" },
+                        "meaning": { "type": "string" },
+                        "tense_usage": {
+                            "type": "object",
+                            "properties": {
+                                "present": { "type": "string" },
+                                "past": { "type": "string" },
+                                "future": { "type": "string" }
+                            },
+                            "required": ["present", "past", "future"]
+                        }
+                    },
+                    "required": ["dhatu", "gana", "lakshana", "example_usage", "meaning", "tense_usage"]
                 }
-            },
-            "required": ["Dhatus"]
-        }
-        self.data = self.load_data()
-
-    def load_data(self):
-        try:
-            with open(self.filepath, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                validate(instance=data, schema=self.schema)
-                return data
-        except FileNotFoundError:
-            logger.error(f"Error: File not found at {self.filepath}")
-            return {}
-        except json.JSONDecodeError:
-            logger.error(f"Error decoding JSON from {self.filepath}")
-            return {}
-        except ValidationError as e:
-            logger.error(f"JSON validation error: {e.message}")
-            return {}
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            return {}
-
-    def save_data(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as file:
-                json.dump(self.data, file, ensure_ascii=False, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            }
+        },
+        "required": ["Dhatus"]
+    }
+
+    def __init__(self, indexed_fields=("gana", "lakshana"), filepath=None, trusted=False, lazy=True, prefetch=False, compact=False):
+        super().__init__(filepath, indexed_fields, trusted, lazy, prefetch, compact)
 
     def validate_dhatu_info(self, dhatu_info):
-        required_keys = ["dhatu", "gana", "lakshana", "example_usage", "meaning", "tense_usage"]
-        for key in required_keys:
-            if key not in dhatu_info:
-                raise ValueError(f"Missing required key: {key}")
-        return True
+        return self.validate_entry(dhatu_info)
 
     def get_dhatu_info(self, dhatu):
-        for dhatu_info in self.data.get("Dhatus", []):
-            if dhatu_info.get("dhatu") == dhatu:
-                return dhatu_info
-        return None
+        return self.get_entry(dhatu)
 
     def get_all_dhatus(self):
-        return [dhatu_info.get("dhatu") for dhatu_info in self.data.get("Dhatus", [])]
+        return self.list_keys()
 
     def get_dhatus_by_gana(self, gana):
-        return [dhatu_info for dhatu_info in self.data.get("Dhatus", []) if dhatu_info.get("gana") == gana]
+        return self.search_dhatus(gana=gana)
 
     def get_dhatus_by_lakshana(self, lakshana):
-        return [dhatu_info for dhatu_info in self.data.get("Dhatus", []) if dhatu_info.get("lakshana") == lakshana]
+        return self.search_dhatus(lakshana=lakshana)
 
     def add_dhatu(self, dhatu_info):
-        self.validate_dhatu_info(dhatu_info)
-        if self.get_dhatu_info(dhatu_info["dhatu"]):
-            raise ValueError(f"Dhatu '{dhatu_info['dhatu']}' already exists.")
-        self.data.setdefault("Dhatus", []).append(dhatu_info)
-        self.save_data()
+        self.add_entry(dhatu_info)
 
     def update_dhatu(self, dhatu, new_dhatu_info):
-        self.validate_dhatu_info(new_dhatu_info)
-        dhatus = self.data.get("Dhatus", [])
-        for idx, dhatu_info in enumerate(dhatus):
-            if dhatu_info.get("dhatu") == dhatu:
-                dhatus[idx] = new_dhatu_info
-                self.data["Dhatus"] = dhatus
-                self.save_data()
-                return True
-        return False
+        return self.update_entry(dhatu, new_dhatu_info)
 
     def delete_dhatu(self, dhatu):
-        dhatus = self.data.get("Dhatus", [])
-        for idx, dhatu_info in enumerate(dhatus):
-            if dhatu_info.get("dhatu") == dhatu:
-                del dhatus[idx]
-                self.data["Dhatus"] = dhatus
-                self.save_data()
-                return True
-        return False
+        return self.delete_entry(dhatu)
 
     def search_dhatus(self, **criteria):
-        results = self.data.get("Dhatus", [])
-        for key, value in criteria.items():
-            results = [dhatu_info for dhatu_info in results if dhatu_info.get(key) == value]
-        return results
+        return self.search(**criteria)
 
     def count_dhatus(self):
-        return len(self.data.get("Dhatus", []))
+        return self.count()
 
     def list_unique_ganas(self):
-        return list(set(dhatu_info.get("gana") for dhatu_info in self.data.get("Dhatus", [])))
+        return self.unique_values("gana")
 
 # Example usage:
 if __name__ == "__main__":
-    dhatu_kosha = DhatuKosha()
+    import os
+    import tempfile
+    from modules.kosha.KoshaBhandara import open_bhandara
+    from modules.kosha.KoshaMula import working_copy
+
+    working_directory, kosha_path = working_copy("DhātuKosha.json")
+    dhatu_kosha = DhatuKosha(filepath=kosha_path)
 
     # Get information for a specific dhatu
     dhatu_info = dhatu_kosha.get_dhatu_info("कृ")
@@ -197,3 +153,30 @@ if __name__ == "__main__":
 
     # List all unique ganas
     print("Unique Ganas:", dhatu_kosha.list_unique_ganas())
+
+    # Benchmark: point lookups on a 2,000-root Dhatupatha, indexed vs linear scan
+    import timeit
+    dhatu_kosha.data = {"Dhatus": [dict(new_dhatu_info, dhatu=f"धातु{idx}", gana=f"गण{idx % 10}") for idx in range(2000)]}
+    dhatu_kosha.build_indexes()
+    roots = [f"धातु{idx}" for idx in range(0, 2000, 7)]
+    elapsed_indexed = timeit.timeit(lambda: [dhatu_kosha.get_dhatu_info(root) for root in roots], number=100)
+    linear = lambda root: next((info for info in dhatu_kosha.data["Dhatus"] if info.get("dhatu") == root), None)
+    elapsed_linear = timeit.timeit(lambda: [linear(root) for root in roots], number=100)
+    lookups = len(roots) * 100
+    print(f"get_dhatu_info: {elapsed_indexed / lookups * 1e9:,.0f} ns/lookup indexed, {elapsed_linear / lookups * 1e9:,.0f} ns/lookup linear ({elapsed_linear / elapsed_indexed:.0f}x)")
+    elapsed = timeit.timeit(lambda: dhatu_kosha.get_dhatus_by_gana("गण3"), number=1000)
+    print(f"get_dhatus_by_gana: {elapsed / 1000 * 1e6:,.1f} us/query (200 results)")
+
+    # Benchmark: loading a saved 2,000-root kosha with and without validating it
+    with tempfile.TemporaryDirectory() as directory:
+        kosha_path = os.path.join(directory, "DhatuKosha.json")
+        open_bhandara(kosha_path, "Dhatus", "dhatu").save(dhatu_kosha.data)
+        elapsed_validated = timeit.timeit(lambda: DhatuKosha(filepath=kosha_path, lazy=False), number=5) / 5
+        elapsed_trusted = timeit.timeit(lambda: DhatuKosha(filepath=kosha_path, trusted=True, lazy=False), number=5) / 5
+        print(f"load: {elapsed_validated * 1e3:,.1f} ms validated, {elapsed_trusted * 1e3:,.1f} ms trusted ({elapsed_validated / elapsed_trusted:.1f}x)")
+
+    # Benchmark: updates (validated) and deletes on the same kosha, which find the entry's slot through the index instead of scanning the list
+    with dhatu_kosha.bulk():
+        elapsed_update = timeit.timeit(lambda: [dhatu_kosha.update_dhatu(root, dhatu_kosha.get_dhatu_info(root)) for root in roots], number=10)
+        elapsed_delete = timeit.timeit(lambda: [dhatu_kosha.delete_dhatu(root) for root in roots], number=1)
+    print(f"update_dhatu: {elapsed_update / (len(roots) * 10) * 1e6:,.1f} us/update, delete_dhatu: {elapsed_delete / len(roots) * 1e6:,.1f} us/delete")
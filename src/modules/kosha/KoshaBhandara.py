@@ -0,0 +1,469 @@
+﻿import os
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Iterable
+from modules.kosha.KoshaSankshepa import json_default
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+class JsonBhandara:
+    """
+    Storage backend keeping a whole kosha in one JSON document.
+
+    Mutations are not written into the document. Each is appended as one line
+    to a JSON-lines journal next to it (e.g. "DhatuKosha.json.journal"), so
+    a write costs one small append however large the kosha is; load() reads
+    the document and replays the journal over it. Once the journal grows
+    past compact_threshold bytes it is rotated aside and a background
+    thread folds it into the document, replacing the document atomically.
+    Replay is keyed on the key field, so an interrupted compaction that is
+    replayed a second time gives the same result.
+
+    Every full write of the document also writes its SHA-256 checksum to a
+    sidecar file (e.g. "DhatuKosha.json.sha256"), which is_trusted() compares
+    against the document that was loaded.
+    """
+
+    def __init__(self, filepath: str, collection: str, key_field: str, indexed_fields: Iterable[str] = (),
+                 journal: bool = True, compact_threshold: int = 1 << 20):
+        self.filepath = filepath
+        self.collection = collection
+        self.key_field = key_field
+        self.indexed_fields = tuple(indexed_fields)
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.journal_path = filepath + ".journal"
+        self.compacting_path = filepath + ".journal.compacting"
+        self.checksum_path = filepath + ".sha256"
+        self.document_checksum = None
+        self.lock = threading.Lock()
+        # Held for a whole compaction or full save, so the two never interleave
+        self.compaction_lock = threading.Lock()
+        self.journal_file = None
+        self.compactor = None
+
+    def _read_document(self) -> dict:
+        with open(self.filepath, 'r', encoding='utf-8-sig') as file:
+            return json.load(file)
+
+    def _write_temporary(self, data: dict) -> tuple:
+        # The document is written aside and moved into place, so readers never see half of it
+        temporary_path = self.filepath + ".tmp"
+        content = json.dumps(data, ensure_ascii=False, indent=4, default=json_default).encode('utf-8')
+        with open(temporary_path, 'wb') as file:
+            file.write(content)
+        return temporary_path, hashlib.sha256(content).hexdigest()
+
+    def _replace_document(self, temporary_path: str, checksum: str):
+        # A crash between the two replaces leaves a stale checksum, which only costs a validation
+        os.replace(temporary_path, self.filepath)
+        with open(self.checksum_path, 'w', encoding='utf-8') as file:
+            file.write(checksum)
+
+    def _replay(self, data: dict, journal_path: str) -> dict:
+        if not os.path.exists(journal_path):
+            return data
+        entries = data.setdefault(self.collection, [])
+        positions = {}
+        for idx, entry in enumerate(entries):
+            positions.setdefault(entry.get(self.key_field), idx)
+        with open(journal_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    logger.error(f"Skipping unreadable journal line in {journal_path}")
+                    continue
+                operation, key = record["op"], record.get("key")
+                if operation == "delete":
+                    idx = positions.pop(key, None)
+                    if idx is not None:
+                        entries[idx] = None
+                    continue
+                entry = record["entry"]
+                key = entry.get(self.key_field) if operation == "insert" else key
+                idx = positions.get(key)
+                if idx is None:
+                    entries.append(entry)
+                    idx = len(entries) - 1
+                else:
+                    entries[idx] = entry
+                    del positions[key]
+                positions.setdefault(entry.get(self.key_field), idx)
+        data[self.collection] = [entry for entry in entries if entry is not None]
+        return data
+
+    def load(self) -> dict:
+        """
+        Read the whole document and replay the journal over it.
+
+        Returns:
+            The document, e.g. {"Dhatus": [...]}.
+
+        Raises:
+            FileNotFoundError: If neither the file nor a journal exists.
+            json.JSONDecodeError: If the file is not valid JSON.
+        """
+        with self.lock:
+            try:
+                with open(self.filepath, 'rb') as file:
+                    content = file.read()
+                self.document_checksum = hashlib.sha256(content).hexdigest()
+                data = json.loads(content.decode('utf-8-sig'))
+            except FileNotFoundError:
+                if not (os.path.exists(self.compacting_path) or os.path.exists(self.journal_path)):
+                    raise
+                self.document_checksum = None
+                data = {self.collection: []}
+            return self._replay(self._replay(data, self.compacting_path), self.journal_path)
+
+    def save(self, data: dict):
+        """
+        Write the whole document and clear the journal.
+
+        Args:
+            data: The document to store.
+        """
+        with self.compaction_lock, self.lock:
+            self._replace_document(*self._write_temporary(data))
+            self._close_journal()
+            for journal_path in (self.compacting_path, self.journal_path):
+                if os.path.exists(journal_path):
+                    os.remove(journal_path)
+
+    def is_trusted(self) -> bool:
+        """
+        Check whether the last loaded document is byte for byte the one written by a save.
+
+        The checksum only shows that the file has not been edited since this
+        backend last wrote it; a trusted load relies on the kosha having been
+        valid when it saved, and on journal records holding entries that were
+        validated by the mutation that wrote them.
+
+        Returns:
+            True if the document's checksum matches its sidecar file.
+        """
+        if self.document_checksum is None:
+            return False
+        try:
+            with open(self.checksum_path, 'r', encoding='utf-8') as file:
+                return file.read().strip() == self.document_checksum
+        except FileNotFoundError:
+            return False
+
+    def _append(self, record: dict, data: dict):
+        if not self.journal:
+            self.save(data)
+            return
+        with self.lock:
+            if self.journal_file is None:
+                self.journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            self.journal_file.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+            self.journal_file.flush()
+            full = self.journal_file.tell() >= self.compact_threshold
+        if full:
+            self.compact()
+
+    def insert(self, data: dict, entry: dict):
+        self._append({"op": "insert", "entry": entry}, data)
+
+    def replace(self, data: dict, key, entry: dict):
+        self._append({"op": "replace", "key": key, "entry": entry}, data)
+
+    def delete(self, data: dict, key):
+        self._append({"op": "delete", "key": key}, data)
+
+    def apply(self, data: dict, operations: list):
+        """
+        Write a batch of mutations, e.g. a committed bulk transaction, with one full save.
+
+        Args:
+            data: The document after the mutations.
+            operations: The (operation, args) pairs; the document already reflects them.
+        """
+        self.save(data)
+
+    def _close_journal(self):
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
+
+    def compact(self, wait: bool = False):
+        """
+        Fold the journal into the document in a background thread.
+
+        The journal is rotated aside first, so writes carry on into a fresh
+        journal while the compaction runs. Only one compaction runs at a time.
+
+        Args:
+            wait: Block until the compaction has finished.
+        """
+        with self.lock:
+            if self.compactor is None or not self.compactor.is_alive():
+                # A rotated journal left by a failed or interrupted compaction is finished first
+                if not os.path.exists(self.compacting_path) and os.path.exists(self.journal_path):
+                    self._close_journal()
+                    os.replace(self.journal_path, self.compacting_path)
+                if os.path.exists(self.compacting_path):
+                    self.compactor = threading.Thread(target=self._compact, name=f"compact-{os.path.basename(self.filepath)}", daemon=True)
+                    self.compactor.start()
+        if wait:
+            self.wait()
+
+    def _compact(self):
+        with self.compaction_lock:
+            try:
+                if not os.path.exists(self.compacting_path):
+                    return  # a full save got there first
+                try:
+                    data = self._read_document()
+                except FileNotFoundError:
+                    data = {self.collection: []}
+                temporary_path, checksum = self._write_temporary(self._replay(data, self.compacting_path))
+                with self.lock:
+                    self._replace_document(temporary_path, checksum)
+                    os.remove(self.compacting_path)
+            except Exception as e:
+                # The rotated journal is kept and replayed on the next load or compaction
+                logger.error(f"Error compacting {self.filepath}: {e}")
+
+    def wait(self):
+        """
+        Wait for a running compaction to finish.
+        """
+        compactor = self.compactor
+        if compactor is not None:
+            compactor.join()
+
+    def close(self):
+        self.wait()
+        with self.lock:
+            self._close_journal()
+
+class SqliteBhandara:
+    """
+    Storage backend keeping a kosha in an SQLite table, one row per entry.
+
+    The key field and the indexed fields get their own indexed columns next
+    to the JSON-encoded entry; any other top-level fields of the document
+    (e.g. "metadata") are kept in a side table. The database runs in WAL
+    mode, and adding, updating or deleting an entry is a single-row
+    transaction instead of a rewrite of the whole kosha.
+    """
+
+    def __init__(self, filepath: str, collection: str, key_field: str, indexed_fields: Iterable[str] = ()):
+        self.filepath = filepath
+        self.collection = collection
+        self.key_field = key_field
+        self.indexed_fields = tuple(field for field in indexed_fields if field != key_field)
+        self.columns = (key_field,) + self.indexed_fields
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _create_tables(self):
+        table = self._quote(self.collection)
+        columns = "".join(f", {self._quote(column)}" for column in self.columns)
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY{columns}, entry TEXT NOT NULL)")
+            existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            for column in self.columns:
+                if column not in existing:
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {self._quote(column)}")
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {self._quote(self.collection + '_' + column)} ON {table} ({self._quote(column)})")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS kosha_metadata (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _row(self, entry: dict) -> tuple:
+        # Scalars are stored as is so the column indexes are usable; anything else as JSON
+        values = []
+        for column in self.columns:
+            value = entry.get(column)
+            values.append(value if value is None or isinstance(value, (str, int, float)) else json.dumps(value, ensure_ascii=False, default=json_default))
+        values.append(json.dumps(entry, ensure_ascii=False, default=json_default))
+        return tuple(values)
+
+    def _insert_sql(self) -> str:
+        columns = ", ".join(self._quote(column) for column in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        return f"INSERT INTO {self._quote(self.collection)} ({columns}, entry) VALUES ({placeholders}, ?)"
+
+    def load(self) -> dict:
+        """
+        Read every entry, in insertion order, and the other document fields.
+
+        Returns:
+            The document, e.g. {"Dhatus": [...]}.
+        """
+        data = {name: json.loads(value) for name, value in self.connection.execute("SELECT name, value FROM kosha_metadata")}
+        data[self.collection] = [json.loads(entry) for (entry,) in
+                                 self.connection.execute(f"SELECT entry FROM {self._quote(self.collection)} ORDER BY id")]
+        return data
+
+    def save(self, data: dict):
+        """
+        Replace the stored kosha with a whole document, in one transaction.
+
+        Args:
+            data: The document to store.
+        """
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {self._quote(self.collection)}")
+            self.connection.executemany(self._insert_sql(), (self._row(entry) for entry in data.get(self.collection, [])))
+            self.connection.execute("DELETE FROM kosha_metadata")
+            self.connection.executemany("INSERT INTO kosha_metadata (name, value) VALUES (?, ?)",
+                                        ((name, json.dumps(value, ensure_ascii=False, default=json_default)) for name, value in data.items() if name != self.collection))
+
+    def insert(self, data: dict, entry: dict):
+        """
+        Store a new entry.
+
+        Args:
+            data: The in-memory document (unused; only the row is written).
+            entry: The entry added to the kosha.
+        """
+        self.apply(data, [("insert", (entry,))])
+
+    def replace(self, data: dict, key, entry: dict):
+        """
+        Overwrite the first entry with the given key, keeping its position.
+
+        Args:
+            data: The in-memory document (unused; only the row is written).
+            key: The key of the entry being replaced.
+            entry: The new entry.
+        """
+        self.apply(data, [("replace", (key, entry))])
+
+    def delete(self, data: dict, key):
+        """
+        Remove the first entry with the given key.
+
+        Args:
+            data: The in-memory document (unused; only the row is written).
+            key: The key of the entry being deleted.
+        """
+        self.apply(data, [("delete", (key,))])
+
+    def apply(self, data: dict, operations: list):
+        """
+        Write a batch of mutations in a single transaction.
+
+        Args:
+            data: The in-memory document (unused; only the rows are written).
+            operations: (operation, args) pairs, operation being "insert",
+                "replace" or "delete" with the arguments of that method.
+        """
+        table = self._quote(self.collection)
+        first_row = f"SELECT id FROM {table} WHERE {self._quote(self.key_field)} = ? ORDER BY id LIMIT 1"
+        assignments = ", ".join(f"{self._quote(column)} = ?" for column in self.columns)
+        with self.connection:
+            for operation, args in operations:
+                if operation == "insert":
+                    self.connection.execute(self._insert_sql(), self._row(args[0]))
+                elif operation == "replace":
+                    key, entry = args
+                    self.connection.execute(f"UPDATE {table} SET {assignments}, entry = ? WHERE id = ({first_row})", self._row(entry) + (key,))
+                elif operation == "delete":
+                    self.connection.execute(f"DELETE FROM {table} WHERE id = ({first_row})", args)
+                else:
+                    raise ValueError(f"Unknown operation: {operation}")
+
+    def is_trusted(self) -> bool:
+        """
+        A database can be edited outside the kosha without a cheap way to
+        tell, so it is never trusted and is validated on every load.
+
+        Returns:
+            False.
+        """
+        return False
+
+    def query(self, **criteria) -> list:
+        """
+        Look entries up in the database through the indexed columns.
+
+        Args:
+            **criteria: Column/value pairs, each on the key field or an indexed field.
+
+        Returns:
+            The matching entries, in insertion order.
+        """
+        unknown = [column for column in criteria if column not in self.columns]
+        if unknown:
+            logger.error(f"Not an indexed column: {unknown[0]}")
+            raise ValueError(f"Not an indexed column: {unknown[0]}")
+        where = " AND ".join(f"{self._quote(column)} = ?" for column in criteria) or "1"
+        rows = self.connection.execute(f"SELECT entry FROM {self._quote(self.collection)} WHERE {where} ORDER BY id", tuple(criteria.values()))
+        return [json.loads(entry) for (entry,) in rows]
+
+    def close(self):
+        self.connection.close()
+
+def open_bhandara(filepath: str, collection: str, key_field: str, indexed_fields: Iterable[str] = ()):
+    """
+    Open the storage backend for a kosha file, chosen by its extension.
+
+    Args:
+        filepath: Path to a .json file, or to a .sqlite/.sqlite3/.db database.
+        collection: The name of the entry list, e.g. "Dhatus".
+        key_field: The field identifying an entry, e.g. "dhatu".
+        indexed_fields: Fields to give indexed columns in SQLite.
+
+    Returns:
+        A JsonBhandara or SqliteBhandara.
+    """
+    if os.path.splitext(filepath)[1].lower() in SQLITE_EXTENSIONS:
+        return SqliteBhandara(filepath, collection, key_field, indexed_fields)
+    return JsonBhandara(filepath, collection, key_field, indexed_fields)
+
+def migrate(source_path: str, target_path: str, collection: str, key_field: str, indexed_fields: Iterable[str] = ()) -> int:
+    """
+    Copy a kosha from one storage backend to another, e.g. JSON to SQLite.
+
+    Args:
+        source_path: The file to read.
+        target_path: The file to write; its previous contents are replaced.
+        collection: The name of the entry list, e.g. "Dhatus".
+        key_field: The field identifying an entry, e.g. "dhatu".
+        indexed_fields: Fields to give indexed columns in SQLite.
+
+    Returns:
+        The number of entries copied.
+    """
+    source = open_bhandara(source_path, collection, key_field, indexed_fields)
+    target = open_bhandara(target_path, collection, key_field, indexed_fields)
+    try:
+        data = source.load()
+        target.save(data)
+        count = len(data.get(collection, []))
+        logger.info(f"Migrated {count} entries from {source_path} to {target_path}")
+        return count
+    finally:
+        source.close()
+        target.close()
+
+# Migration command, e.g.:
+#   python -m modules.kosha.KoshaBhandara modules/kosha/DhātuKosha.json dhatu.sqlite --collection Dhatus --key dhatu --index gana --index lakshana
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Move a kosha between the JSON and SQLite storage backends.")
+    parser.add_argument("source", help="The kosha file to read (.json, .sqlite, .sqlite3 or .db)")
+    parser.add_argument("target", help="The kosha file to write (.json, .sqlite, .sqlite3 or .db)")
+    parser.add_argument("--collection", required=True, help='The name of the entry list, e.g. "Dhatus"')
+    parser.add_argument("--key", required=True, help='The field identifying an entry, e.g. "dhatu"')
+    parser.add_argument("--index", action="append", default=[], help="A field to give an indexed column (repeatable)")
+    args = parser.parse_args()
+    migrate(args.source, args.target, args.collection, args.key, args.index)
@@ -0,0 +1,252 @@
+﻿import os
+import json
+import shutil
+import logging
+import tempfile
+from jsonschema import ValidationError
+from modules.kosha.KoshaSuchi import KoshaSuchi
+from modules.kosha.KoshaBhandara import open_bhandara
+from modules.kosha.KoshaSankramana import KoshaSankramana, iter_jsonl, iter_csv
+from modules.kosha.KoshaPratibimba import export_snapshot
+from modules.kosha.KoshaVilamba import KoshaVilamba, VilambitaGuna
+from modules.kosha.KoshaSankshepa import compact_entry, compact_document
+from modules.kosha.KoshaPariksha import get_validator, get_entry_validator, nested_fields
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The shipped kosha files
+KOSHA_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def working_copy(filename: str) -> tuple:
+    """
+    Copy a shipped kosha file into a new temporary directory.
+
+    Examples and tests run on the copy, so their edits, and the journal and
+    checksum files written next to it, stay out of the package.
+
+    Args:
+        filename: The kosha file, e.g. "DhātuKosha.json".
+
+    Returns:
+        (TemporaryDirectory, str): The directory, removed when it is cleaned up
+        or garbage collected, and the path of the copy.
+    """
+    directory = tempfile.TemporaryDirectory()
+    return directory, shutil.copy(os.path.join(KOSHA_DIRECTORY, filename), directory.name)
+
+class KoshaMula:
+    """
+    Storage, indexing and search shared by the kosha classes.
+
+    A kosha is a JSON document holding one list of entries (its collection,
+    e.g. "Dhatus"), each identified by a key field (e.g. "dhatu"). This base
+    class loads the document lazily, validates it against the subclass's
+    schema, keeps the KoshaSuchi indexes, writes each mutation through the
+    storage backend, and provides bulk transactions, snapshots, imports and
+    headword search. A subclass sets the class attributes below and wraps
+    add_entry, update_entry and delete_entry under its own names.
+    """
+
+    # The entry list and the field identifying an entry
+    COLLECTION = None
+    KEY_FIELD = None
+    # The default file, in KOSHA_DIRECTORY
+    FILENAME = None
+    # JSON schema of the document, or None to check only REQUIRED_KEYS
+    schema = None
+    REQUIRED_KEYS = ()
+    # CSV columns holding JSON, for koshas without a schema to derive them from
+    JSON_COLUMNS = ()
+    # How entries are named in error messages, e.g. "dhatu info" and "Dhatu"
+    ENTRY_NAME = "entry"
+    ENTRY_LABEL = "Entry"
+    logger = logger
+
+    # Loaded from the file on first access; see KoshaVilamba
+    data = VilambitaGuna()
+    suchi = VilambitaGuna()
+
+    def __init__(self, filepath=None, indexed_fields=(), trusted=False, lazy=True, prefetch=False, compact=False):
+        self.filepath = filepath or os.path.join(KOSHA_DIRECTORY, self.FILENAME)
+        self.indexed_fields = tuple(indexed_fields)
+        self.compact = compact
+        self.validator = get_validator(self.schema) if self.schema else None
+        self.entry_validator = get_entry_validator(self.schema, self.COLLECTION) if self.schema else None
+        self.trusted = trusted
+        # Bumped on every mutation and reindex, so caches can tell stale results apart
+        self.version = 0
+        self.sankramana = None
+        self.bhandara = open_bhandara(self.filepath, self.COLLECTION, self.KEY_FIELD, self.indexed_fields)
+        self.vilamba = KoshaVilamba(self, prefetch)
+        if not lazy:
+            self.vilamba.load()
+
+    def entries(self) -> list:
+        return self.data.get(self.COLLECTION, [])
+
+    def build_indexes(self):
+        self.version += 1
+        self.suchi = KoshaSuchi(self.KEY_FIELD, self.indexed_fields, self.entries())
+
+    def add_index(self, field):
+        if field not in self.indexed_fields:
+            self.indexed_fields += (field,)
+        self.suchi.add_field(field, self.entries())
+
+    def empty_document(self) -> dict:
+        return {self.COLLECTION: []}
+
+    def load_data(self):
+        try:
+            data = self.bhandara.load()
+            # A trusted load skips validation if the document is unchanged since a validated save
+            if self.validator is not None and not (self.trusted and self.bhandara.is_trusted()):
+                self.validator.validate(data)
+            return compact_document(data, self.COLLECTION) if self.compact else data
+        except FileNotFoundError:
+            self.logger.error(f"Error: File not found at {self.filepath}")
+        except json.JSONDecodeError:
+            self.logger.error(f"Error decoding JSON from {self.filepath}")
+        except ValidationError as e:
+            self.logger.error(f"JSON validation error: {e.message}")
+        except Exception as e:
+            self.logger.error(f"Error loading data: {e}")
+        return self.empty_document()
+
+    def save_data(self):
+        try:
+            self.bhandara.save(self.data)
+        except Exception as e:
+            self.logger.error(f"Error saving data: {e}")
+
+    def write_data(self, operation, *args):
+        # Write one mutation through the storage backend: "insert", "replace" or "delete"
+        self.version += 1
+        if self.sankramana is not None:
+            self.sankramana.record(operation, *args)
+            return
+        try:
+            getattr(self.bhandara, operation)(self.data, *args)
+        except Exception as e:
+            self.logger.error(f"Error saving data: {e}")
+
+    def bulk(self):
+        # Hold writes back until the block exits, then flush once; roll everything back if it raises
+        return self.sankramana or KoshaSankramana(self, self.COLLECTION, self.KEY_FIELD, self.validate_entry)
+
+    def export_snapshot(self, filepath):
+        # Write a memory-mapped snapshot for read-only serving; open it with KoshaPratibimba
+        return export_snapshot(self.data, filepath, self.COLLECTION, self.KEY_FIELD, self.indexed_fields)
+
+    def import_from_jsonl(self, filepath):
+        with self.bulk() as sankramana:
+            return sankramana.load(iter_jsonl(filepath))
+
+    def import_from_csv(self, filepath):
+        json_columns = nested_fields(self.schema, self.COLLECTION) if self.schema else self.JSON_COLUMNS
+        with self.bulk() as sankramana:
+            return sankramana.load(iter_csv(filepath, json_columns))
+
+    def validate_entry(self, entry):
+        for key in self.REQUIRED_KEYS:
+            if key not in entry:
+                raise ValueError(f"Missing required key: {key}")
+        if self.entry_validator is not None:
+            try:
+                self.entry_validator.validate(entry)
+            except ValidationError as e:
+                raise ValueError(f"Invalid {self.ENTRY_NAME}: {e.message}")
+        return True
+
+    def get_entry(self, key):
+        return self.suchi.get(key)
+
+    def add_entry(self, entry):
+        self.validate_entry(entry)
+        if self.suchi.get(entry[self.KEY_FIELD]):
+            raise ValueError(f"{self.ENTRY_LABEL} '{entry[self.KEY_FIELD]}' already exists.")
+        entry = self.prepare_add(entry)
+        entry = compact_entry(entry) if self.compact else entry
+        self.data.setdefault(self.COLLECTION, []).append(entry)
+        self.index_entry(entry)
+        self.write_data("insert", entry)
+
+    def update_entry(self, key, new_entry):
+        self.validate_entry(new_entry)
+        entry = self.suchi.get(key)
+        if entry is None:
+            return False
+        if new_entry[self.KEY_FIELD] != key and self.suchi.get(new_entry[self.KEY_FIELD]):
+            raise ValueError(f"{self.ENTRY_LABEL} '{new_entry[self.KEY_FIELD]}' already exists.")
+        new_entry = self.prepare_update(entry, new_entry)
+        new_entry = compact_entry(new_entry) if self.compact else new_entry
+        self.data[self.COLLECTION][self.suchi.position(entry)] = new_entry
+        self.reindex_entry(entry, new_entry)
+        self.write_data("replace", key, new_entry)
+        return True
+
+    def delete_entry(self, key):
+        entry = self.suchi.get(key)
+        if entry is None:
+            return False
+        # The last entry takes the deleted one's slot, so a delete does not shift the entries after it
+        entries = self.data[self.COLLECTION]
+        position = self.suchi.position(entry)
+        last = entries.pop()
+        if last is not entry:
+            entries[position] = last
+            self.suchi.move(last, position)
+        self.unindex_entry(entry)
+        self.write_data("delete", key)
+        return True
+
+    # Hooks for koshas that stamp entries, such as SamyuktaKosha's metadata, or keep indexes of their own,
+    # such as VibhaktiKosha's paradigm tables
+    def prepare_add(self, entry):
+        return entry
+
+    def prepare_update(self, entry, new_entry):
+        return new_entry
+
+    def index_entry(self, entry):
+        self.suchi.add(entry)
+
+    def reindex_entry(self, entry, new_entry):
+        self.suchi.replace(entry, new_entry)
+
+    def unindex_entry(self, entry):
+        self.suchi.remove(entry)
+
+    def search(self, **criteria):
+        return self.suchi.search(self.entries(), **criteria)
+
+    def list_keys(self):
+        return [entry.get(self.KEY_FIELD) for entry in self.entries()]
+
+    def count(self):
+        return len(self.entries())
+
+    def unique_values(self, field):
+        if field in self.suchi.indexes:
+            return self.suchi.values(field)
+        values = set()
+        for entry in self.entries():
+            value = entry.get(field)
+            if isinstance(value, list):
+                values.update(value)
+            elif value is not None:
+                values.add(value)
+        return list(values)
+
+    def autocomplete(self, prefix, limit=10):
+        return self.suchi.headwords().complete(prefix, limit)
+
+    def wildcard_search(self, pattern, limit=None):
+        # "?" matches one character and "*" any run of characters
+        return self.suchi.headwords().wildcard(pattern, limit)
+
+    def fuzzy_search(self, word, max_distance=1, limit=None):
+        # Headwords within max_distance edits of the word, as (headword, distance) pairs, nearest first
+        return self.suchi.headwords().fuzzy(word, max_distance, limit)
@@ -0,0 +1,56 @@
+﻿import json
+from jsonschema import validators
+
+# Compiled validators, shared by every instance of every kosha class with the same schema
+_VALIDATORS = {}
+
+def get_validator(schema: dict):
+    """
+    Get the compiled validator for a schema, checking and compiling it only once.
+
+    Args:
+        schema: The JSON schema.
+
+    Returns:
+        A jsonschema validator instance; call .validate(instance) on it.
+    """
+    key = json.dumps(schema, sort_keys=True)
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        validator_class = validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = _VALIDATORS[key] = validator_class(schema)
+    return validator
+
+def get_entry_validator(schema: dict, collection: str):
+    """
+    Get the compiled validator for a single entry of a kosha's collection.
+
+    Mutations validate only the entry they add or replace with this, instead
+    of the whole document.
+
+    Args:
+        schema: The kosha's document schema.
+        collection: The name of the entry list, e.g. "Dhatus".
+
+    Returns:
+        A jsonschema validator for one entry.
+    """
+    entry_schema = dict(schema["properties"][collection]["items"])
+    if "$schema" in schema:
+        entry_schema["$schema"] = schema["$schema"]
+    return get_validator(entry_schema)
+
+def nested_fields(schema: dict, collection: str) -> tuple:
+    """
+    List the fields of a collection's entries that hold lists or objects.
+
+    Args:
+        schema: The kosha's document schema.
+        collection: The name of the entry list, e.g. "Dhatus".
+
+    Returns:
+        The names of the entry properties of type "array" or "object".
+    """
+    properties = schema["properties"][collection]["items"].get("properties", {})
+    return tuple(name for name, spec in properties.items() if spec.get("type") in ("array", "object"))
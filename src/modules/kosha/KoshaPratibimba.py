@@ -0,0 +1,353 @@
+﻿import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import logging
+from array import array
+from collections.abc import Sequence
+from typing import Iterable
+from modules.kosha.KoshaSuchi import matches
+from modules.kosha.KoshaSankshepa import json_default
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KOSHAPB1"
+ALIGNMENT = 8
+
+# Snapshot layout, every section aligned to 8 bytes:
+#   MAGIC, u32 header length, JSON header (collection, key field, fields,
+#   counts, section offsets and the document's other fields)
+#   string table:  u32 offsets[S + 1], UTF-8 bytes
+#   records:       u64 offsets[N + 1], one compact JSON document per entry
+#   per field:     u32 string ids[V] sorted by their UTF-8 bytes,
+#                  u32 posting starts[V + 1], u32 record ids (ascending),
+#                  u32 hash slots[H], H a power of two >= 2V, holding a
+#                  position in the sorted values + 1 (0 = empty), placed by
+#                  CRC-32 of the value with linear probing
+# Arrays are in the byte order of the machine that wrote the snapshot, which
+# the header records.
+
+def _index_strings(value) -> tuple:
+    # Only string values (and string items of list fields) are indexed
+    if isinstance(value, list):
+        return tuple(item for item in value if isinstance(item, str))
+    return (value,) if isinstance(value, str) else ()
+
+def _write_section(file, content: bytes) -> int:
+    padding = -file.tell() % ALIGNMENT
+    file.write(b"\0" * padding)
+    offset = file.tell()
+    file.write(content)
+    return offset
+
+def _hash_slots(encoded_values: list) -> array:
+    size = 1
+    while size < 2 * len(encoded_values):
+        size <<= 1
+    slots = array('I', bytes(4 * size))
+    for idx, encoded in enumerate(encoded_values):
+        slot = zlib.crc32(encoded) & (size - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = idx + 1
+    return slots
+
+def export_snapshot(data: dict, filepath: str, collection: str, key_field: str, indexed_fields: Iterable[str] = ()) -> int:
+    """
+    Write a kosha document as a read-only binary snapshot.
+
+    Args:
+        data: The kosha document, e.g. {"Dhatus": [...]}.
+        filepath: Path of the snapshot to write; it is replaced atomically.
+        collection: The name of the entry list, e.g. "Dhatus".
+        key_field: The field identifying an entry, e.g. "dhatu".
+        indexed_fields: Further fields to build index sections for.
+
+    Returns:
+        The number of entries written.
+    """
+    entries = data.get(collection, [])
+    fields = (key_field,) + tuple(field for field in indexed_fields if field != key_field)
+
+    strings = {}
+    postings = {field: {} for field in fields}
+    for record_id, entry in enumerate(entries):
+        for field in fields:
+            for value in _index_strings(entry.get(field)):
+                string_id = strings.setdefault(value, len(strings))
+                posting = postings[field].setdefault(string_id, array('I'))
+                if not posting or posting[-1] != record_id:
+                    posting.append(record_id)
+
+    encoded_strings = [string.encode('utf-8') for string in strings]
+    string_offsets = array('I', [0])
+    for encoded in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+
+    encoded_records = [json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8') for entry in entries]
+    record_offsets = array('Q', [0])
+    for encoded in encoded_records:
+        record_offsets.append(record_offsets[-1] + len(encoded))
+
+    temporary_path = filepath + ".tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(MAGIC)
+        # The header is written last, once the section offsets are known; reserve room for it
+        header = {
+            "collection": collection,
+            "key_field": key_field,
+            "fields": {},
+            "count": len(entries),
+            "strings": len(encoded_strings),
+            "byteorder": sys.byteorder,
+            "metadata": {name: value for name, value in data.items() if name != collection},
+        }
+        sections = {}
+        header_room = len(json.dumps(header, ensure_ascii=False).encode('utf-8')) + 256 * (len(fields) + 2)
+        file.write(b"\0" * (4 + header_room))
+        sections["string_offsets"] = _write_section(file, string_offsets.tobytes())
+        sections["strings"] = _write_section(file, b"".join(encoded_strings))
+        sections["record_offsets"] = _write_section(file, record_offsets.tobytes())
+        sections["records"] = _write_section(file, b"".join(encoded_records))
+        for field in fields:
+            string_ids = sorted(postings[field], key=lambda string_id: encoded_strings[string_id])
+            starts = array('I', [0])
+            for string_id in string_ids:
+                starts.append(starts[-1] + len(postings[field][string_id]))
+            slots = _hash_slots([encoded_strings[string_id] for string_id in string_ids])
+            header["fields"][field] = {
+                "values": len(string_ids),
+                "slots": len(slots),
+                "hash": _write_section(file, slots.tobytes()),
+                "string_ids": _write_section(file, array('I', string_ids).tobytes()),
+                "starts": _write_section(file, starts.tobytes()),
+                "postings": _write_section(file, b"".join(postings[field][string_id].tobytes() for string_id in string_ids)),
+            }
+        header["sections"] = sections
+        encoded_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        if len(encoded_header) > header_room:
+            raise ValueError("Snapshot header does not fit in its reserved space")
+        file.seek(len(MAGIC))
+        file.write(struct.pack("<I", len(encoded_header)) + encoded_header)
+    os.replace(temporary_path, filepath)
+    logger.info(f"Wrote snapshot of {len(entries)} entries to {filepath}")
+    return len(entries)
+
+class PratibimbaParinama(Sequence):
+    """
+    The entries matching a snapshot query, decoded only when accessed.
+    """
+
+    def __init__(self, pratibimba: "KoshaPratibimba", record_ids):
+        self.pratibimba = pratibimba
+        self.record_ids = record_ids
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return PratibimbaParinama(self.pratibimba, self.record_ids[idx])
+        return self.pratibimba[self.record_ids[idx]]
+
+    def __repr__(self) -> str:
+        return f"PratibimbaParinama({len(self)} entries)"
+
+class KoshaPratibimba:
+    """
+    A read-only kosha served from a memory-mapped snapshot.
+
+    Opening a snapshot reads only its header; the string table, records and
+    index sections stay in the page cache, shared by every process mapping
+    the same file. Lookups probe the hash section of a field and
+    return PratibimbaParinama sequences, which decode an entry from its
+    compact JSON only when it is accessed.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.file = open(filepath, 'rb')
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            logger.error(f"Empty snapshot file: {filepath}")
+            raise ValueError(f"Empty snapshot file: {filepath}")
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            logger.error(f"Not a kosha snapshot: {filepath}")
+            raise ValueError(f"Not a kosha snapshot: {filepath}")
+        (header_length,) = struct.unpack_from("<I", self.buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self.buffer[start:start + header_length].decode('utf-8'))
+        if header["byteorder"] != sys.byteorder:
+            self.close()
+            logger.error(f"Snapshot was written on a {header['byteorder']}-endian machine: {filepath}")
+            raise ValueError(f"Snapshot was written on a {header['byteorder']}-endian machine: {filepath}")
+        self.collection = header["collection"]
+        self.key_field = header["key_field"]
+        self.metadata = header["metadata"]
+        self.count = header["count"]
+        sections = header["sections"]
+
+        self.views = []
+        self.string_offsets = self._array(sections["string_offsets"], header["strings"] + 1, 'I')
+        self.strings = self._view(sections["strings"], self.string_offsets[-1])
+        self.record_offsets = self._array(sections["record_offsets"], self.count + 1, 'Q')
+        self.records = self._view(sections["records"], self.record_offsets[-1])
+        self.indexes = {}
+        for field, section in header["fields"].items():
+            starts = self._array(section["starts"], section["values"] + 1, 'I')
+            self.indexes[field] = (
+                self._array(section["string_ids"], section["values"], 'I'),
+                starts,
+                self._array(section["postings"], starts[-1], 'I'),
+                self._array(section["hash"], section["slots"], 'I'),
+            )
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        view = memoryview(self.buffer)[offset:offset + length]
+        self.views.append(view)
+        return view
+
+    def _array(self, offset: int, count: int, typecode: str) -> memoryview:
+        view = self._view(offset, count * array(typecode).itemsize).cast(typecode)
+        self.views.append(view)
+        return view
+
+    def __enter__(self) -> "KoshaPratibimba":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, record_id: int) -> dict:
+        """
+        Decode one entry.
+
+        Args:
+            record_id: The entry's position in the kosha.
+
+        Returns:
+            The entry.
+        """
+        return json.loads(bytes(self.records[self.record_offsets[record_id]:self.record_offsets[record_id + 1]]))
+
+    def string(self, string_id: int) -> str:
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        return bytes(self.strings[self.string_offsets[string_id]:self.string_offsets[string_id + 1]])
+
+    def _posting(self, field: str, value: str) -> list:
+        string_ids, starts, postings, slots = self.indexes[field]
+        target = value.encode('utf-8')
+        mask = len(slots) - 1
+        slot = zlib.crc32(target) & mask
+        while idx := slots[slot]:
+            idx -= 1
+            if self._string_bytes(string_ids[idx]) == target:
+                # Copied out of the mapping so results stay valid after close()
+                return postings[starts[idx]:starts[idx + 1]].tolist()
+            slot = (slot + 1) & mask
+        return []
+
+    def get(self, key):
+        """
+        Look up an entry by its key field.
+
+        Args:
+            key: The key, e.g. the dhatu or the noun.
+
+        Returns:
+            The first entry with that key, or None if there is none.
+        """
+        if not isinstance(key, str):
+            return None
+        posting = self._posting(self.key_field, key)
+        return self[posting[0]] if posting else None
+
+    def values(self, field: str) -> list:
+        """
+        List the distinct values of an indexed field.
+
+        Args:
+            field: The indexed field.
+
+        Returns:
+            The distinct values, in UTF-8 byte order.
+        """
+        return [self.string(string_id) for string_id in self.indexes[field][0]]
+
+    def search(self, **criteria) -> PratibimbaParinama:
+        """
+        Find the entries matching every criterion.
+
+        String criteria on indexed fields are answered from the index
+        sections, intersecting their posting lists; any other criterion is
+        checked on the decoded entries.
+
+        Args:
+            **criteria: Field/value pairs to match.
+
+        Returns:
+            The matching entries, decoded lazily.
+        """
+        indexed = [self._posting(field, value) for field, value in criteria.items() if field in self.indexes and isinstance(value, str)]
+        remaining = {field: value for field, value in criteria.items() if not (field in self.indexes and isinstance(value, str))}
+        if indexed:
+            indexed.sort(key=len)
+            record_ids = indexed[0]
+            for posting in indexed[1:]:
+                record_ids = sorted(set(record_ids).intersection(posting))
+        else:
+            record_ids = range(self.count)
+        if remaining:
+            record_ids = [record_id for record_id in record_ids
+                          if all(matches(self[record_id], field, value) for field, value in remaining.items())]
+        return PratibimbaParinama(self, record_ids)
+
+    def close(self):
+        for view in reversed(getattr(self, "views", [])):
+            view.release()
+        self.views = []
+        self.buffer.close()
+        self.file.close()
+
+# Export command, e.g.:
+#   python -m modules.kosha.KoshaPratibimba modules/kosha/DhātuKosha.json dhatu.snapshot --collection Dhatus --key dhatu --index gana --index lakshana
+if __name__ == "__main__":
+    import argparse
+    import time
+    from modules.kosha.KoshaBhandara import open_bhandara
+    parser = argparse.ArgumentParser(description="Export a kosha to a memory-mapped snapshot for read-only serving.")
+    parser.add_argument("source", help="The kosha file to read (.json, .sqlite, .sqlite3 or .db)")
+    parser.add_argument("target", help="The snapshot file to write")
+    parser.add_argument("--collection", required=True, help='The name of the entry list, e.g. "Dhatus"')
+    parser.add_argument("--key", required=True, help='The field identifying an entry, e.g. "dhatu"')
+    parser.add_argument("--index", action="append", default=[], help="A field to build an index section for (repeatable)")
+    args = parser.parse_args()
+
+    bhandara = open_bhandara(args.source, args.collection, args.key, args.index)
+    try:
+        started = time.perf_counter()
+        data = bhandara.load()
+        loaded = time.perf_counter()
+    finally:
+        bhandara.close()
+    export_snapshot(data, args.target, args.collection, args.key, args.index)
+
+    # Compare opening the snapshot with parsing the source
+    started_snapshot = time.perf_counter()
+    with KoshaPratibimba(args.target) as pratibimba:
+        opened = time.perf_counter()
+        print(f"{len(pratibimba)} entries: parsing {args.source} took {(loaded - started) * 1e3:,.1f} ms, "
+              f"opening the snapshot {(opened - started_snapshot) * 1e3:,.2f} ms")
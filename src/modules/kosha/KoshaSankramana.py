@@ -0,0 +1,173 @@
+﻿import csv
+import json
+import logging
+from collections.abc import Mapping
+from typing import Callable, Iterable, Iterator
+from modules.kosha.KoshaSankshepa import compact_entry, json_default
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def iter_jsonl(filepath: str) -> Iterator[dict]:
+    """
+    Stream entries from a JSON-lines file, one entry per line.
+
+    Args:
+        filepath: Path to the file.
+
+    Yields:
+        The entries; blank lines are skipped.
+    """
+    with open(filepath, 'r', encoding='utf-8-sig') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_csv(filepath: str, json_columns: Iterable[str] = ()) -> Iterator[dict]:
+    """
+    Stream entries from a CSV file with a header row.
+
+    CSV cells are flat strings, so the columns holding lists or objects are
+    expected to be JSON-encoded, as csv_cell() writes them; they are decoded
+    here, and a blank cell in one of them leaves the field out.
+
+    Args:
+        filepath: Path to the file.
+        json_columns: The columns with JSON-encoded values, e.g. from nested_fields().
+
+    Yields:
+        One dict per row, keyed by the header.
+
+    Raises:
+        ValueError: If a JSON column holds invalid JSON.
+    """
+    json_columns = tuple(json_columns)
+    with open(filepath, 'r', newline='', encoding='utf-8-sig') as file:
+        for row_number, row in enumerate(csv.DictReader(file), 1):
+            for column in json_columns:
+                cell = row.get(column)
+                if cell is None:
+                    continue
+                if not cell.strip():
+                    del row[column]
+                    continue
+                try:
+                    row[column] = json.loads(cell)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Invalid JSON in {filepath}, row {row_number}, column '{column}': {e}")
+                    raise ValueError(f"Row {row_number}, column '{column}': invalid JSON: {e}")
+            yield row
+
+def csv_cell(value):
+    """
+    Encode a field value for a CSV cell, writing lists and objects as JSON so iter_csv() can read them back.
+
+    Args:
+        value: The field value.
+
+    Returns:
+        The value, or its JSON text if it is a list or an object.
+    """
+    if isinstance(value, (list, Mapping)):
+        return json.dumps(value, ensure_ascii=False, default=json_default)
+    return value
+
+class KoshaSankramana:
+    """
+    A bulk transaction over a kosha, used through the kosha's bulk() method.
+
+    Inside the transaction mutations update the in-memory kosha and its
+    indexes as usual, but their writes are held back; on commit they reach
+    the storage backend in one flush, and if the block raises, the kosha's
+    data and indexes are restored and nothing is written. Nested bulk()
+    blocks join the outer transaction.
+    """
+
+    def __init__(self, kosha, collection: str, key_field: str, validate: Callable[[dict], bool]):
+        self.kosha = kosha
+        self.collection = collection
+        self.key_field = key_field
+        self.validate = validate
+        self.operations = []
+        self.depth = 0
+
+    def __enter__(self) -> "KoshaSankramana":
+        if self.depth == 0:
+            # Entries are replaced rather than modified in place, so copying the list is enough to roll back
+            self.snapshot = dict(self.kosha.data)
+            self.snapshot[self.collection] = list(self.kosha.data.get(self.collection, []))
+            self.operations = []
+            self.kosha.sankramana = self
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.depth -= 1
+        if self.depth:
+            return False
+        self.kosha.sankramana = None
+        if exc_type is not None:
+            self.rollback()
+        else:
+            self.commit()
+        return False
+
+    def record(self, operation: str, *args):
+        """
+        Hold back one write until the transaction commits.
+
+        Args:
+            operation: "insert", "replace" or "delete".
+            *args: The operation's arguments, as for the storage backend.
+        """
+        self.operations.append((operation, args))
+
+    def commit(self):
+        operations, self.operations = self.operations, []
+        if operations:
+            self.kosha.bhandara.apply(self.kosha.data, operations)
+
+    def rollback(self):
+        self.operations = []
+        self.kosha.data = self.snapshot
+        self.kosha.build_indexes()
+        logger.error(f"Bulk transaction on {self.collection} rolled back")
+
+    def load(self, entries: Iterable[dict]) -> int:
+        """
+        Add many new entries, streaming them from any iterable.
+
+        Each entry is validated and checked for a duplicate key as it
+        arrives; the indexes are rebuilt once at the end instead of per entry.
+
+        Args:
+            entries: The entries, e.g. from iter_jsonl() or iter_csv().
+
+        Returns:
+            The number of entries added.
+
+        Raises:
+            ValueError: If an entry is invalid or its key already exists; the
+            whole transaction is then rolled back.
+        """
+        target = self.kosha.data.setdefault(self.collection, [])
+        seen = set()
+        count = 0
+        try:
+            for count, entry in enumerate(entries, 1):
+                try:
+                    self.validate(entry)
+                except ValueError as e:
+                    raise ValueError(f"Entry {count}: {e}")
+                key = entry[self.key_field]
+                if key in seen or self.kosha.suchi.get(key) is not None:
+                    raise ValueError(f"Entry {count}: '{key}' already exists.")
+                seen.add(key)
+                if self.kosha.compact:
+                    entry = compact_entry(entry)
+                target.append(entry)
+                self.record("insert", entry)
+        finally:
+            self.kosha.build_indexes()
+        return count
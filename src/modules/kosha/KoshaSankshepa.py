@@ -0,0 +1,215 @@
+﻿import sys
+import threading
+from collections.abc import Mapping
+from operator import attrgetter
+
+# Strings up to this length are interned, so a value repeated across entries (a gana, a pada, a category name)
+# is stored once; longer ones, such as meanings and examples, are mostly unique and are left alone
+INTERN_MAX_LENGTH = 64
+
+# One record class per distinct tuple of keys
+_AKARA = {}
+_AKARA_LOCK = threading.Lock()
+
+class LaghuPravishti(Mapping):
+    """
+    A compact, read-only kosha entry.
+
+    The values are kept in __slots__ of a class shared by every entry with
+    the same keys in the same order, so an entry costs one small object
+    instead of a dict with its own hash table. It is a Mapping, so get(),
+    [], in, keys(), items() and equality with dicts work as they do for the
+    plain entries; kosha entries are replaced rather than modified, and
+    to_dict() gives a plain, modifiable copy.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    # Key -> getter of the slot holding its value
+    _getters = {}
+
+    def __getitem__(self, key):
+        getter = self._getters.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def get(self, key, default=None):
+        getter = self._getters.get(key)
+        return default if getter is None else getter(self)
+
+    def __contains__(self, key) -> bool:
+        return key in self._getters
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        # The record classes are created at run time, so pickle (e.g. to worker processes) by value
+        return compact_entry, (self.to_dict(),)
+
+    def to_dict(self) -> dict:
+        """
+        Copy the entry, and any compact entries nested in it, into plain dicts.
+
+        Returns:
+            The entry as a dict.
+        """
+        return {key: to_plain(getter(self)) for key, getter in self._getters.items()}
+
+def _akara(fields: tuple) -> type:
+    cls = _AKARA.get(fields)
+    if cls is None:
+        with _AKARA_LOCK:
+            cls = _AKARA.get(fields)
+            if cls is None:
+                slot_names = tuple(f"_{idx}" for idx in range(len(fields)))
+                cls = type(LaghuPravishti)("LaghuPravishti", (LaghuPravishti,), {"__slots__": slot_names, "_fields": fields})
+                cls._getters = {field: attrgetter(slot_name) for field, slot_name in zip(fields, slot_names)}
+                _AKARA[fields] = cls
+    return cls
+
+def intern_value(value):
+    """
+    Intern the short strings in a value, compacting any dicts in it.
+
+    Args:
+        value: A field value: a string, a list, a dict or a scalar.
+
+    Returns:
+        The value, with equal short strings shared.
+    """
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, list):
+        return [intern_value(item) for item in value]
+    if isinstance(value, Mapping):
+        return compact_entry(value)
+    return value
+
+def compact_entry(entry: Mapping) -> LaghuPravishti:
+    """
+    Convert an entry into a compact record.
+
+    Args:
+        entry: The entry, e.g. a dict read from a kosha file.
+
+    Returns:
+        A LaghuPravishti with the same keys and values.
+    """
+    if isinstance(entry, LaghuPravishti):
+        return entry
+    cls = _akara(tuple(entry))
+    record = object.__new__(cls)
+    for slot_name, value in zip(cls.__slots__, entry.values()):
+        setattr(record, slot_name, intern_value(value))
+    return record
+
+def compact_document(data: dict, collection: str) -> dict:
+    """
+    Convert the entries of a kosha document into compact records, in place.
+
+    Each dict is dropped as soon as its record is made, so converting does
+    not hold two copies of the kosha at once.
+
+    Args:
+        data: The kosha document, e.g. {"Dhatus": [...]}.
+        collection: The name of the entry list, e.g. "Dhatus".
+
+    Returns:
+        The document.
+    """
+    entries = data.get(collection)
+    if entries:
+        for idx, entry in enumerate(entries):
+            entries[idx] = compact_entry(entry)
+    return data
+
+def to_plain(value):
+    """
+    Copy a value, turning any compact records in it into dicts.
+
+    Args:
+        value: A field value or an entry.
+
+    Returns:
+        The value built from dicts, lists and scalars only.
+    """
+    if isinstance(value, LaghuPravishti):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+def json_default(value):
+    """
+    Let json.dump and json.dumps write compact records, as their default= hook.
+
+    Args:
+        value: An object the json module cannot serialize by itself.
+
+    Returns:
+        A dict for a compact record.
+
+    Raises:
+        TypeError: For anything else, as json does without the hook.
+    """
+    if isinstance(value, LaghuPravishti):
+        return dict(value.items())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Example usage
+if __name__ == "__main__":
+    import gc
+    import json
+    import random
+    import timeit
+    import tracemalloc
+    from core.DhatuSmritiKosha import DhātuInfo
+
+    entry = compact_entry({"dhatu": "गम्", "gana": "भ्वादि", "tense_usage": {"present": "गच्छति", "past": "जगाम", "future": "गमिष्यति"}})
+    print(entry["gana"], entry.get("tense_usage").get("present"), "meaning" in entry, entry == entry.to_dict())
+    print(json.dumps(entry, ensure_ascii=False, default=json_default))
+
+    # Benchmark: resident size of 300k dhatu entries, as decoded dicts vs compact records
+    random.seed(0)
+    consonants = [chr(code) for code in range(0x915, 0x939)]
+    ganas = ["भ्वादि", "अदादि", "जुहोत्यादि", "दिवादि", "स्वादि", "तुदादि", "रुधादि", "तनादि", "क्र्यादि", "चुरादि"]
+    document = json.dumps({"Dhatus": [{
+        "dhatu": "".join(random.choice(consonants) for _ in range(3)) + f"{idx}",
+        "gana": random.choice(ganas),
+        "lakshana": random.choice(["सकर्मक", "अकर्मक"]),
+        "example_usage": "".join(random.choice(consonants) for _ in range(12)),
+        "meaning": f"meaning {idx}",
+        "tense_usage": {"present": random.choice(consonants) + "ति", "past": random.choice(consonants) + "त्", "future": random.choice(consonants) + "ष्यति"},
+    } for idx in range(300000)]}, ensure_ascii=False)
+
+    def resident_size(build) -> tuple:
+        gc.collect()
+        tracemalloc.start()
+        value = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return value, size
+
+    plain, plain_size = resident_size(lambda: json.loads(document))
+    compact, compact_size = resident_size(lambda: compact_document(json.loads(document), "Dhatus"))
+    print(f"300,000 entries: {plain_size / 1e6:,.0f} MB as dicts, {compact_size / 1e6:,.0f} MB compact ({plain_size / compact_size:.1f}x smaller)")
+
+    plain_entries, compact_entries = plain["Dhatus"], compact["Dhatus"]
+    elapsed_plain = timeit.timeit(lambda: [entry.get("gana") for entry in plain_entries], number=5) / (5 * len(plain_entries))
+    elapsed_compact = timeit.timeit(lambda: [entry.get("gana") for entry in compact_entries], number=5) / (5 * len(compact_entries))
+    print(f"entry.get: {elapsed_plain * 1e9:,.0f} ns on a dict, {elapsed_compact * 1e9:,.0f} ns on a compact record")
+
+    # DhātuInfo namedtuples: the repeated gana and pada strings are shared once interned
+    rows = [(f"root{idx}", random.choice(ganas), "", "", "", random.choice(["परस्मैपद", "आत्मनेपद", "उभयपद"]), "") for idx in range(300000)]
+    _, tuple_size = resident_size(lambda: [DhātuInfo(*("".join(list(field)) for field in row)) for row in rows])
+    _, interned_size = resident_size(lambda: [DhātuInfo(*(intern_value("".join(list(field))) for field in row)) for row in rows])
+    print(f"300,000 DhātuInfo: {tuple_size / 1e6:,.0f} MB, {interned_size / 1e6:,.0f} MB with interned fields")
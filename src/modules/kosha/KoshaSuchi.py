@@ -0,0 +1,242 @@
+﻿from typing import Iterable
+from modules.kosha.KoshaVriksha import KoshaVriksha
+
+def _index_values(value) -> tuple:
+    # List-valued fields are indexed under each of their items; other unhashable values are not indexed
+    if isinstance(value, list):
+        return tuple(item for item in value if item.__hash__ is not None)
+    if value.__hash__ is None:
+        return ()
+    return (value,)
+
+def matches(entry: dict, key: str, value) -> bool:
+    """
+    Check one search criterion against an entry.
+
+    Args:
+        entry: The kosha entry.
+        key: The field name.
+        value: The wanted value; for list-valued fields, an item the list must contain.
+
+    Returns:
+        True if the field equals the value, or is a list containing it.
+    """
+    field = entry.get(key)
+    if field == value:
+        return True
+    return isinstance(field, list) and not isinstance(value, list) and value in field
+
+class KoshaSuchi:
+    """
+    Primary and inverted indexes over the entries of a kosha.
+
+    The primary index maps the key field (e.g. "dhatu") to its entry. The key
+    field and every configured field also have an inverted index mapping a
+    value to a posting list of the entries having it; list-valued fields such
+    as "subcategories" post the entry under each item. Posting lists are dicts keyed by entry identity, so
+    adding and removing an entry is O(number of indexed values) and a search
+    intersects posting lists starting from the smallest one, costing roughly
+    the size of the result rather than the size of the kosha.
+
+    Every entry's position in the entry list is kept as well, so the kosha can
+    replace an entry in place, or delete it by moving the last entry into its
+    slot, without scanning the list.
+    """
+
+    def __init__(self, key_field: str, fields: Iterable[str] = (), entries: Iterable[dict] = ()):
+        self.key_field = key_field
+        self.fields = (key_field,) + tuple(field for field in fields if field != key_field)
+        self.build(entries)
+
+    def build(self, entries: Iterable[dict]):
+        """
+        Rebuild every index from an entry list.
+
+        Args:
+            entries: The kosha's entries.
+        """
+        self.primary = {}
+        self.positions = {}
+        self.indexes = {field: {} for field in self.fields}
+        self.vriksha = None
+        for position, entry in enumerate(entries):
+            self.add(entry, position)
+
+    def add_field(self, field: str, entries: Iterable[dict]):
+        """
+        Start indexing another field.
+
+        Args:
+            field: The field to index.
+            entries: The kosha's entries.
+        """
+        if field in self.indexes:
+            return
+        self.fields += (field,)
+        self.indexes[field] = {}
+        for entry in entries:
+            self._post(field, entry)
+
+    def _post(self, field: str, entry: dict):
+        index = self.indexes[field]
+        for value in _index_values(entry.get(field)):
+            index.setdefault(value, {})[id(entry)] = entry
+
+    def add(self, entry: dict, position: int = None):
+        """
+        Index a new entry. The first entry with a given key stays the primary one.
+
+        Args:
+            entry: The entry added to the kosha.
+            position: (Optional) Its position in the entry list; defaults to the end.
+        """
+        key = entry.get(self.key_field)
+        self.primary.setdefault(key, entry)
+        self.positions[id(entry)] = len(self.positions) if position is None else position
+        for field in self.fields:
+            self._post(field, entry)
+        if self.vriksha is not None and isinstance(key, str):
+            self.vriksha.add(key)
+
+    def remove(self, entry: dict):
+        """
+        Drop an entry from every index.
+
+        Args:
+            entry: The entry removed from the kosha.
+        """
+        key = entry.get(self.key_field)
+        if self.primary.get(key) is entry:
+            del self.primary[key]
+        self.positions.pop(id(entry), None)
+        for field, index in self.indexes.items():
+            for value in _index_values(entry.get(field)):
+                posting = index.get(value)
+                if posting is not None:
+                    posting.pop(id(entry), None)
+                    if not posting:
+                        del index[value]
+        if self.vriksha is not None and isinstance(key, str) and key not in self.indexes[self.key_field]:
+            self.vriksha.remove(key)
+
+    def replace(self, entry: dict, new_entry: dict):
+        """
+        Re-index an entry that was replaced by a new one.
+
+        Args:
+            entry: The old entry.
+            new_entry: The entry that took its place, at the same position.
+        """
+        position = self.positions.get(id(entry))
+        self.remove(entry)
+        self.add(new_entry, position)
+
+    def position(self, entry: dict) -> int:
+        """
+        Find the position of an entry object in the entry list.
+
+        Args:
+            entry: The entry object (compared by identity).
+
+        Returns:
+            The index of the entry.
+        """
+        return self.positions[id(entry)]
+
+    def move(self, entry: dict, position: int):
+        """
+        Record that an entry was moved to another position in the entry list.
+
+        Args:
+            entry: The entry object.
+            position: Its new index.
+        """
+        self.positions[id(entry)] = position
+
+    def get(self, key):
+        """
+        Look up an entry by its key field.
+
+        Args:
+            key: The key, e.g. the dhatu or the noun.
+
+        Returns:
+            The entry, or None if there is none.
+        """
+        return self.primary.get(key)
+
+    def headwords(self) -> KoshaVriksha:
+        """
+        Get the prefix tree over the key field, building it on first use.
+
+        Once built, it is kept current as entries are added and removed.
+
+        Returns:
+            A KoshaVriksha over the string keys.
+        """
+        if self.vriksha is None:
+            self.vriksha = KoshaVriksha(key for key in self.indexes[self.key_field] if isinstance(key, str))
+        return self.vriksha
+
+    def values(self, field: str) -> list:
+        """
+        List the distinct values of an indexed field.
+
+        Args:
+            field: The indexed field.
+
+        Returns:
+            The distinct values (list items for list-valued fields).
+        """
+        return list(self.indexes[field])
+
+    def search(self, entries: list, **criteria) -> list:
+        """
+        Find the entries matching every criterion.
+
+        Indexed criteria are answered by intersecting posting lists, smallest
+        first; the remaining criteria filter the intersection. A criterion on
+        a list-valued field matches entries whose list contains the value.
+
+        Args:
+            entries: The kosha's entries, scanned only if no criterion is indexed.
+            **criteria: Field/value pairs to match.
+
+        Returns:
+            The matching entries.
+        """
+        criteria = dict(criteria)
+        postings = []
+        for key in [key for key, value in criteria.items() if key in self.indexes and value.__hash__ is not None]:
+            postings.append(self.indexes[key].get(criteria.pop(key), {}))
+
+        if postings:
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = {entry_id: entry for entry_id, entry in candidates.items() if entry_id in posting}
+            candidates = candidates.values()
+        else:
+            candidates = entries
+        if not criteria:
+            return list(candidates)
+        return [entry for entry in candidates if all(matches(entry, key, value) for key, value in criteria.items())]
+
+# Example usage
+if __name__ == "__main__":
+    import timeit
+    entries = [{"name": f"alankara{idx}", "category": f"category{idx % 10}", "subcategories": [f"sub{idx % 100}"], "references": [f"ref{idx % 1000}"]}
+               for idx in range(100000)]
+    suchi = KoshaSuchi("name", ("category", "subcategories", "references"), entries)
+    print(suchi.search(entries, category="category3", subcategories="sub13"))
+
+    # Multi-criteria search over 100k entries, indexed vs filtering the whole list per criterion
+    criteria = {"category": "category3", "subcategories": "sub13", "references": "ref13"}
+    elapsed_indexed = timeit.timeit(lambda: suchi.search(entries, **criteria), number=100) / 100
+    def scan():
+        results = entries
+        for key, value in criteria.items():
+            results = [entry for entry in results if matches(entry, key, value)]
+        return results
+    elapsed_scan = timeit.timeit(scan, number=5) / 5
+    print(f"search: {elapsed_indexed * 1e6:,.0f} us indexed, {elapsed_scan * 1e6:,.0f} us scanning ({elapsed_scan / elapsed_indexed:.0f}x)")
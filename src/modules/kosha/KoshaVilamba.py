@@ -0,0 +1,93 @@
+﻿import os
+import time
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class VilambitaGuna:
+    """
+    A kosha attribute filled in by loading the kosha the first time it is read.
+
+    This is a non-data descriptor: loading stores the value in the instance
+    dict, which shadows the descriptor, so once a kosha is loaded reading
+    the attribute costs nothing extra.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, kosha, owner=None):
+        if kosha is None:
+            return self
+        kosha.vilamba.load()
+        try:
+            return kosha.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(f"{type(kosha).__name__} has no loaded {self.name}") from None
+
+class KoshaVilamba:
+    """
+    Deferred loading of a kosha's file.
+
+    The file is parsed, and the indexes built, the first time the kosha's
+    data or indexes are read, or ahead of time in a background thread with
+    prefetch(). Loading happens once, under a lock, so readers racing a
+    prefetch wait for it instead of parsing the file again.
+    """
+
+    def __init__(self, kosha, prefetch: bool = False):
+        self.kosha = kosha
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.prefetcher = None
+        if prefetch:
+            self.prefetch()
+
+    def load(self):
+        """
+        Parse the kosha's file and build its indexes, unless that already happened.
+
+        Data or indexes assigned to the kosha before it was loaded are kept.
+        """
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            started = time.perf_counter()
+            kosha = self.kosha
+            if "data" not in kosha.__dict__:
+                kosha.data = kosha.load_data()
+            if "suchi" not in kosha.__dict__:
+                kosha.build_indexes()
+            self.loaded = True
+            logger.debug(f"Loaded {kosha.filepath} in {(time.perf_counter() - started) * 1e3:,.1f} ms")
+
+    def _prefetch(self):
+        try:
+            self.load()
+        except Exception as e:
+            # Loading is retried, and the error raised, on first access
+            logger.error(f"Error prefetching {self.kosha.filepath}: {e}")
+
+    def prefetch(self):
+        """
+        Start loading the kosha in a background thread.
+        """
+        with self.lock:
+            if self.loaded or (self.prefetcher is not None and self.prefetcher.is_alive()):
+                return
+            self.prefetcher = threading.Thread(target=self._prefetch, name=f"prefetch-{os.path.basename(self.kosha.filepath)}", daemon=True)
+            self.prefetcher.start()
+
+    def wait(self):
+        """
+        Block until the kosha is loaded, loading it now if no prefetch is running.
+        """
+        prefetcher = self.prefetcher
+        if prefetcher is not None:
+            prefetcher.join()
+        self.load()
@@ -0,0 +1,193 @@
+﻿import re
+import logging
+from bisect import bisect_left, insort
+from typing import Iterable, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Wildcards accepted by KoshaVriksha.wildcard()
+WILDCARD_ONE = "?"
+WILDCARD_ANY = "*"
+
+def _successor(prefix: str) -> str:
+    # The smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class KoshaVriksha:
+    """
+    A prefix tree over the headwords of a kosha, for completion and approximate lookup.
+
+    The tree is kept implicitly as the sorted list of headwords: the words
+    under a node (a prefix) are a contiguous range of the list, found by
+    binary search, and the children of a node are found by jumping from one
+    next-character range to the following one. This answers the same
+    queries as a node-per-character trie at the memory cost of the word
+    list alone.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.words = sorted(set(words))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        idx = bisect_left(self.words, word)
+        return idx < len(self.words) and self.words[idx] == word
+
+    def add(self, word: str):
+        """
+        Add a headword, keeping the list sorted.
+
+        Args:
+            word: The headword.
+        """
+        if word not in self:
+            insort(self.words, word)
+
+    def remove(self, word: str):
+        """
+        Remove a headword if present.
+
+        Args:
+            word: The headword.
+        """
+        idx = bisect_left(self.words, word)
+        if idx < len(self.words) and self.words[idx] == word:
+            del self.words[idx]
+
+    def _range(self, prefix: str, lo: int = 0, hi: Optional[int] = None) -> tuple:
+        hi = len(self.words) if hi is None else hi
+        if not prefix:
+            return lo, hi
+        return bisect_left(self.words, prefix, lo, hi), bisect_left(self.words, _successor(prefix), lo, hi)
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> list:
+        """
+        List the headwords starting with a prefix.
+
+        Args:
+            prefix: The typed prefix.
+            limit: (Optional) The maximum number of completions.
+
+        Returns:
+            The completions, in sorted order.
+        """
+        lo, hi = self._range(prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self.words[lo:hi]
+
+    def wildcard(self, pattern: str, limit: Optional[int] = None) -> list:
+        """
+        List the headwords matching a wildcard pattern.
+
+        Args:
+            pattern: The pattern; "?" stands for one character and "*" for any run of characters.
+            limit: (Optional) The maximum number of matches.
+
+        Returns:
+            The matching headwords, in sorted order.
+        """
+        literal = re.split(r"[?*]", pattern, maxsplit=1)[0]
+        regex = re.compile("".join(".*" if char == WILDCARD_ANY else "." if char == WILDCARD_ONE else re.escape(char)
+                                   for char in pattern[len(literal):]), re.DOTALL)
+        # Only the range of words sharing the literal prefix is scanned
+        lo, hi = self._range(literal)
+        start = len(literal)
+        matches = []
+        for word in self.words[lo:hi]:
+            if regex.fullmatch(word, start):
+                matches.append(word)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    def fuzzy(self, word: str, max_distance: int = 1, limit: Optional[int] = None) -> list:
+        """
+        List the headwords within an edit distance of a word.
+
+        The tree is walked depth first while running the Levenshtein automaton
+        of the word: each node's state is the row of edit distances from its
+        prefix to every prefix of the word, and a branch is pruned as soon as
+        no entry in its row is within max_distance, so only a thin band of the
+        tree around the word is visited.
+
+        Args:
+            word: The (possibly misspelt) word.
+            max_distance: The largest number of insertions, deletions and substitutions allowed.
+            limit: (Optional) The maximum number of matches.
+
+        Returns:
+            (headword, distance) pairs, nearest first.
+        """
+        def step(row: list, char) -> list:
+            # The automaton's transition on one character; char=None mismatches every position
+            child_row = [row[0] + 1]
+            for col, word_char in enumerate(word, 1):
+                child_row.append(min(child_row[-1] + 1, row[col] + 1, row[col - 1] + (word_char != char)))
+            return child_row
+
+        words = self.words
+        word_chars = sorted(set(word))
+        matches = []
+        stack = [(0, 0, len(words), list(range(len(word) + 1)))]
+        while stack:
+            depth, lo, hi, row = stack.pop()
+            if lo < hi and len(words[lo]) == depth:
+                # The prefix itself is a headword; it sorts first in its range
+                if row[-1] <= max_distance:
+                    matches.append((words[lo], row[-1]))
+                lo += 1
+            if lo == hi:
+                continue
+            prefix = words[lo][:depth]
+            # Every character not in the word makes the same transition
+            other_row = step(row, None)
+            if min(other_row) <= max_distance:
+                while lo < hi:
+                    char = words[lo][depth]
+                    child_hi = bisect_left(words, prefix + chr(ord(char) + 1), lo, hi)
+                    child_row = step(row, char) if char in word_chars else other_row
+                    if min(child_row) <= max_distance:
+                        stack.append((depth + 1, lo, child_hi, child_row))
+                    lo = child_hi
+            else:
+                # Only a character matching the word where the row is still within bounds can
+                # keep the distance in bounds; jump straight to those children
+                for char in sorted({word[col] for col in range(len(word)) if row[col] <= max_distance}):
+                    child_lo = bisect_left(words, prefix + char, lo, hi)
+                    child_hi = bisect_left(words, prefix + chr(ord(char) + 1), child_lo, hi)
+                    if child_lo < child_hi:
+                        child_row = step(row, char)
+                        if min(child_row) <= max_distance:
+                            stack.append((depth + 1, child_lo, child_hi, child_row))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches if limit is None else matches[:limit]
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    import timeit
+    vriksha = KoshaVriksha(["राम", "रामायण", "रमा", "रमेश", "राघव", "कृष्ण", "कृष्णा"])
+    print("Complete 'रा':", vriksha.complete("रा"))
+    print("Wildcard 'र?म*':", vriksha.wildcard("र?म*"))
+    print("Fuzzy 'रम':", vriksha.fuzzy("रम", 1))
+
+    # Benchmark on 300k synthetic headwords
+    random.seed(0)
+    consonants = [chr(code) for code in range(0x915, 0x939)]
+    matras = ["", "ा", "ि", "ी", "ु", "ू", "े", "ो", "्"]
+    headwords = {"".join(random.choice(consonants) + random.choice(matras) for _ in range(random.randint(2, 5))) for _ in range(330000)}
+    vriksha = KoshaVriksha(list(headwords)[:300000])
+    sample = random.sample(vriksha.words, 100)
+    for name, query, number in (
+        ("complete", lambda: [vriksha.complete(headword[:2], 10) for headword in sample], 10),
+        ("wildcard", lambda: [vriksha.wildcard(headword[:2] + "?" + headword[3:4] + "*", 10) for headword in sample], 10),
+        ("fuzzy (distance 1)", lambda: [vriksha.fuzzy(headword, 1) for headword in sample], 1),
+        ("fuzzy (distance 2)", lambda: [vriksha.fuzzy(headword, 2) for headword in sample], 1),
+    ):
+        elapsed = timeit.timeit(query, number=number) / (number * len(sample))
+        print(f"{name}: {elapsed * 1e6:,.1f} us/query over {len(vriksha):,} headwords")
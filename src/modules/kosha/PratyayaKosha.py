@@ -1,90 +1,62 @@
-﻿import os
-import json
+﻿import logging
+from modules.kosha.KoshaMula import KoshaMula
+from modules.kosha.KoshaSankramana import csv_cell
 
-class PratyayaKosha:
-    def __init__(self):
-        self.filepath = os.path.join(os.path.dirname(__file__), "pratyaya_kosha.json")
-        self.data = self.load_data()
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
-    def load_data(self):
-        try:
-            with open(self.filepath, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print(f"Error: File not found at {self.filepath}")
-            return {"metadata": {}, "Pratyayas": []}
-        except json.JSONDecodeError:
-            print(f"Error decoding JSON from {self.filepath}")
-            return {"metadata": {}, "Pratyayas": []}
-
-    def save_data(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as file:
-                json.dump(self.data, file, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+class PratyayaKosha(KoshaMula):
+    COLLECTION = "Pratyayas"
+    KEY_FIELD = "pratyaya"
+    FILENAME = "PratyayaKosha.json"
+    REQUIRED_KEYS = ("pratyaya", "gana", "vibhakti", "meaning", "example_usage")
+    JSON_COLUMNS = ("example_usage", "related_pratyayas", "metadata")
+    ENTRY_LABEL = "Pratyaya"
+    logger = logger
+
+    def __init__(self, indexed_fields=("gana", "vibhakti", "category"), filepath=None, lazy=True, prefetch=False, compact=False):
+        super().__init__(filepath, indexed_fields, lazy=lazy, prefetch=prefetch, compact=compact)
+
+    def empty_document(self):
+        return {"metadata": {}, "Pratyayas": []}
 
     def validate_pratyaya_info(self, pratyaya_info):
-        required_keys = ["pratyaya", "gana", "vibhakti", "meaning", "example_usage"]
-        for key in required_keys:
-            if key not in pratyaya_info:
-                raise ValueError(f"Missing required key: {key}")
-        return True
+        return self.validate_entry(pratyaya_info)
 
     def get_pratyaya_info(self, pratyaya):
-        for pratyaya_info in self.data.get("Pratyayas", []):
-            if pratyaya_info.get("pratyaya") == pratyaya:
-                return pratyaya_info
-        return None
+        return self.get_entry(pratyaya)
 
     def get_all_pratyayas(self):
-        return [pratyaya_info.get("pratyaya") for pratyaya_info in self.data.get("Pratyayas", [])]
+        return self.list_keys()
 
     def get_pratyayas_by_vibhakti(self, vibhakti):
-        return [pratyaya_info for pratyaya_info in self.data.get("Pratyayas", []) if pratyaya_info.get("vibhakti") == vibhakti]
+        return self.search_pratyayas(vibhakti=vibhakti)
 
     def get_pratyayas_by_gana(self, gana):
-        return [pratyaya_info for pratyaya_info in self.data.get("Pratyayas", []) if pratyaya_info.get("gana") == gana]
+        return self.search_pratyayas(gana=gana)
 
     def add_pratyaya(self, pratyaya_info):
-        self.validate_pratyaya_info(pratyaya_info)
-        if self.get_pratyaya_info(pratyaya_info["pratyaya"]):
-            raise ValueError(f"Pratyaya '{pratyaya_info['pratyaya']}' already exists.")
-        self.data.setdefault("Pratyayas", []).append(pratyaya_info)
-        self.save_data()
+        self.add_entry(pratyaya_info)
 
     def update_pratyaya(self, pratyaya, new_pratyaya_info):
-        self.validate_pratyaya_info(new_pratyaya_info)
-        pratyayas = self.data.get("Pratyayas", [])
-        for idx, pratyaya_info in enumerate(pratyayas):
-            if pratyaya_info.get("pratyaya") == pratyaya:
-                pratyayas[idx] = new_pratyaya_info
-                self.data["Pratyayas"] = pratyayas
-                self.save_data()
-                return True
-        raise ValueError(f"Pratyaya '{pratyaya}' not found.")
+        if not self.update_entry(pratyaya, new_pratyaya_info):
+            raise ValueError(f"Pratyaya '{pratyaya}' not found.")
+        return True
 
     def delete_pratyaya(self, pratyaya):
-        pratyayas = self.data.get("Pratyayas", [])
-        for idx, pratyaya_info in enumerate(pratyayas):
-            if pratyaya_info.get("pratyaya") == pratyaya:
-                del pratyayas[idx]
-                self.data["Pratyayas"] = pratyayas
-                self.save_data()
-                return True
-        raise ValueError(f"Pratyaya '{pratyaya}' not found.")
+        if not self.delete_entry(pratyaya):
+            raise ValueError(f"Pratyaya '{pratyaya}' not found.")
+        return True
 
     def search_pratyayas(self, **criteria):
-        results = self.data.get("Pratyayas", [])
-        for key, value in criteria.items():
-            results = [pratyaya_info for pratyaya_info in results if pratyaya_info.get(key) == value]
-        return results
+        return self.search(**criteria)
 
     def count_pratyayas(self):
-        return len(self.data.get("Pratyayas", []))
+        return self.count()
 
     def list_unique_vibhaktis(self):
-        return list(set(pratyaya_info.get("vibhakti") for pratyaya_info in self.data.get("Pratyayas", [])))
+        return self.unique_values("vibhakti")
 
     def check_for_duplicates(self):
         pratyayas = self.data.get("Pratyayas", [])
@@ -105,23 +77,23 @@ class PratyayaKosha:
                 writer = csv.writer(file)
                 writer.writerow(["pratyaya", "gana", "vibhakti", "meaning", "example_usage"])
                 for pratyaya_info in self.data.get("Pratyayas", []):
-                    writer.writerow([pratyaya_info.get("pratyaya"), pratyaya_info.get("gana"), pratyaya_info.get("vibhakti"), pratyaya_info.get("meaning"), pratyaya_info.get("example_usage")])
+                    writer.writerow([pratyaya_info.get("pratyaya"), pratyaya_info.get("gana"), pratyaya_info.get("vibhakti"), pratyaya_info.get("meaning"), csv_cell(pratyaya_info.get("example_usage"))])
         except Exception as e:
-            print(f"Error exporting to CSV: {e}")
+            logger.error(f"Error exporting to CSV: {e}")
 
     def import_from_csv(self, filepath):
         try:
-            import csv
-            with open(filepath, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    self.add_pratyaya(row)
+            return super().import_from_csv(filepath)
         except Exception as e:
-            print(f"Error importing from CSV: {e}")
+            logger.error(f"Error importing from CSV: {e}")
 
 # Example usage:
 if __name__ == "__main__":
-    pratyaya_kosha = PratyayaKosha()
+    import os
+    from modules.kosha.KoshaMula import working_copy
+
+    working_directory, kosha_path = working_copy("PratyayaKosha.json")
+    pratyaya_kosha = PratyayaKosha(filepath=kosha_path)
 
     # Get information for a specific pratyaya
     pratyaya_info = pratyaya_kosha.get_pratyaya_info("ण्")
@@ -182,7 +154,8 @@ if __name__ == "__main__":
     print("Duplicate Pratyayas:", duplicates)
 
     # Export pratyayas to CSV
-    pratyaya_kosha.export_to_csv("pratyayas.csv")
+    csv_path = os.path.join(working_directory.name, "pratyayas.csv")
+    pratyaya_kosha.export_to_csv(csv_path)
 
     # Import pratyayas from CSV
-    pratyaya_kosha.import_from_csv("pratyayas.csv")
+    pratyaya_kosha.import_from_csv(csv_path)
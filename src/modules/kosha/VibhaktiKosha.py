@@ -1,94 +1,87 @@
-﻿import os
-import json
-
-class VibhaktiKosha:
-    def __init__(self):
-        self.filepath = os.path.join(os.path.dirname(__file__), "VibhaktiKosha.json")
-        self.data = self.load_data()
-
-    def load_data(self):
-        try:
-            with open(self.filepath, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print(f"Error: File not found at {self.filepath}")
-            return {}
-        except json.JSONDecodeError:
-            print(f"Error decoding JSON from {self.filepath}")
-            return {}
-
-    def save_data(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as file:
-                json.dump(self.data, file, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+﻿import logging
+from modules.kosha.KoshaMula import KoshaMula
+from modules.kosha.KoshaVilamba import VilambitaGuna
+from modules.kosha.VibhaktiSarani import VibhaktiSarani, EKAVACHANA
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class VibhaktiKosha(KoshaMula):
+    COLLECTION = "Nouns"
+    KEY_FIELD = "noun"
+    FILENAME = "VibhaktiKosha.json"
+    REQUIRED_KEYS = ("noun", "vibhaktis")
+    JSON_COLUMNS = ("vibhaktis",)
+    ENTRY_LABEL = "Noun"
+    logger = logger
+
+    # Built with the other indexes on first access; see KoshaVilamba
+    sarani = VilambitaGuna()
+
+    def __init__(self, indexed_fields=(), filepath=None, lazy=True, prefetch=False, compact=False):
+        super().__init__(filepath, indexed_fields, lazy=lazy, prefetch=prefetch, compact=compact)
+
+    def build_indexes(self):
+        super().build_indexes()
+        # Paradigm tables: (noun, case, number) -> form, form -> analyses, case -> nouns
+        self.sarani = VibhaktiSarani(self.entries())
+
+    def index_entry(self, entry):
+        super().index_entry(entry)
+        self.sarani.add(entry)
+
+    def reindex_entry(self, entry, new_entry):
+        super().reindex_entry(entry, new_entry)
+        self.sarani.replace(entry, new_entry)
+
+    def unindex_entry(self, entry):
+        super().unindex_entry(entry)
+        self.sarani.remove(entry)
 
     def validate_vibhakti_info(self, vibhakti_info):
-        required_keys = ["noun", "vibhaktis"]
-        for key in required_keys:
-            if key not in vibhakti_info:
-                raise ValueError(f"Missing required key: {key}")
-        return True
+        return self.validate_entry(vibhakti_info)
 
     def get_vibhakti_info(self, noun):
-        for vibhakti_info in self.data.get("Nouns", []):
-            if vibhakti_info.get("noun") == noun:
-                return vibhakti_info
-        return None
+        return self.get_entry(noun)
 
     def get_all_nouns(self):
-        return [vibhakti_info.get("noun") for vibhakti_info in self.data.get("Nouns", [])]
+        return self.list_keys()
 
     def get_vibhaktis_by_case(self, case):
-        return [vibhakti_info for vibhakti_info in self.data.get("Nouns", []) if case in vibhakti_info.get("vibhaktis", {})]
+        return self.sarani.nouns_with_case(case)
+
+    def get_form(self, noun, case, number=EKAVACHANA):
+        return self.sarani.form(noun, case, number)
+
+    def analyze_form(self, form):
+        # Every (noun, case, number) producing the surface form
+        return self.sarani.analyze(form)
 
     def add_vibhakti(self, vibhakti_info):
-        self.validate_vibhakti_info(vibhakti_info)
-        if self.get_vibhakti_info(vibhakti_info["noun"]):
-            raise ValueError(f"Noun '{vibhakti_info['noun']}' already exists.")
-        self.data.setdefault("Nouns", []).append(vibhakti_info)
-        self.save_data()
+        self.add_entry(vibhakti_info)
 
     def update_vibhakti(self, noun, new_vibhakti_info):
-        self.validate_vibhakti_info(new_vibhakti_info)
-        nouns = self.data.get("Nouns", [])
-        for idx, vibhakti_info in enumerate(nouns):
-            if vibhakti_info.get("noun") == noun:
-                nouns[idx] = new_vibhakti_info
-                self.data["Nouns"] = nouns
-                self.save_data()
-                return True
-        return False
+        return self.update_entry(noun, new_vibhakti_info)
 
     def delete_vibhakti(self, noun):
-        nouns = self.data.get("Nouns", [])
-        for idx, vibhakti_info in enumerate(nouns):
-            if vibhakti_info.get("noun") == noun:
-                del nouns[idx]
-                self.data["Nouns"] = nouns
-                self.save_data()
-                return True
-        return False
+        return self.delete_entry(noun)
 
     def search_vibhaktis(self, **criteria):
-        results = self.data.get("Nouns", [])
-        for key, value in criteria.items():
-            results = [vibhakti_info for vibhakti_info in results if vibhakti_info.get(key) == value]
-        return results
+        return self.search(**criteria)
 
     def count_nouns(self):
-        return len(self.data.get("Nouns", []))
+        return self.count()
 
     def list_unique_vibhaktis(self):
-        unique_vibhaktis = set()
-        for vibhakti_info in self.data.get("Nouns", []):
-            unique_vibhaktis.update(vibhakti_info.get("vibhaktis", {}).keys())
-        return list(unique_vibhaktis)
+        return list(self.sarani.cases)
 
 # Example usage:
 if __name__ == "__main__":
-    vibhakti_kosha = VibhaktiKosha()
+    from modules.kosha.KoshaMula import working_copy
+
+    working_directory, kosha_path = working_copy("VibhaktiKosha.json")
+    vibhakti_kosha = VibhaktiKosha(filepath=kosha_path)
 
     # Get information for a specific noun
     vibhakti_info = vibhakti_kosha.get_vibhakti_info("राम")
@@ -152,3 +145,7 @@ if __name__ == "__main__":
 
     # List all unique vibhaktis
     print("Unique Vibhaktis:", vibhakti_kosha.list_unique_vibhaktis())
+
+    # Paradigm lookups, forward and reverse
+    print("राम, षष्ठी:", vibhakti_kosha.get_form("राम", "षष्ठी"))
+    print("Analyses of 'रामस्य':", vibhakti_kosha.analyze_form("रामस्य"))
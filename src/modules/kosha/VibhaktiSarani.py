@@ -0,0 +1,141 @@
+﻿from collections import namedtuple
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+# Grammatical numbers, in the order used by list-valued paradigm cells
+EKAVACHANA = "एकवचन"
+DVIVACHANA = "द्विवचन"
+BAHUVACHANA = "बहुवचन"
+VACHANA = (EKAVACHANA, DVIVACHANA, BAHUVACHANA)
+
+# One analysis of a surface form
+VibhaktiVishleshana = namedtuple("VibhaktiVishleshana", ["noun", "case", "number"])
+
+def iter_paradigm(vibhakti_info: dict) -> Iterator[tuple]:
+    """
+    Enumerate the cells of a noun's paradigm.
+
+    A case in "vibhaktis" maps to a form (the singular), to a list of forms
+    in VACHANA order, or to a dict from number to form.
+
+    Args:
+        vibhakti_info: The kosha entry.
+
+    Yields:
+        (case, number, form) tuples.
+    """
+    for case, value in vibhakti_info.get("vibhaktis", {}).items():
+        if isinstance(value, str):
+            yield case, EKAVACHANA, value
+        elif isinstance(value, list):
+            for number, form in zip(VACHANA, value):
+                if form:
+                    yield case, number, form
+        elif isinstance(value, Mapping):
+            for number, form in value.items():
+                if form:
+                    yield case, number, form
+
+class VibhaktiSarani:
+    """
+    Precomputed paradigm tables over the nouns of a VibhaktiKosha.
+
+    The forward table maps (noun, case, number) to its form, the reverse
+    index maps a surface form to every analysis producing it, and a case
+    index lists the nouns declined in each case, so each of these questions
+    is a single dict probe. Like the kosha's other indexes, the first entry
+    for a noun wins and the tables are updated entry by entry on mutation.
+    """
+
+    def __init__(self, entries: Iterable[dict] = ()):
+        self.forms = {}
+        self.analyses = {}
+        self.cases = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: dict):
+        """
+        Add a noun's paradigm to the tables.
+
+        Args:
+            entry: The entry added to the kosha.
+        """
+        noun = entry.get("noun")
+        for case, number, form in iter_paradigm(entry):
+            self.forms.setdefault((noun, case, number), form)
+            self.analyses.setdefault(form, []).append(VibhaktiVishleshana(noun, case, number))
+            self.cases.setdefault(case, {})[id(entry)] = entry
+
+    def remove(self, entry: dict):
+        """
+        Drop a noun's paradigm from the tables.
+
+        Args:
+            entry: The entry removed from the kosha.
+        """
+        noun = entry.get("noun")
+        for case, number, form in iter_paradigm(entry):
+            if self.forms.get((noun, case, number)) == form:
+                del self.forms[(noun, case, number)]
+            analyses = self.analyses.get(form)
+            if analyses is not None:
+                analysis = VibhaktiVishleshana(noun, case, number)
+                if analysis in analyses:
+                    analyses.remove(analysis)
+                if not analyses:
+                    del self.analyses[form]
+            entries = self.cases.get(case)
+            if entries is not None:
+                entries.pop(id(entry), None)
+                if not entries:
+                    del self.cases[case]
+
+    def replace(self, entry: dict, new_entry: dict):
+        """
+        Update the tables for an entry that was replaced by a new one.
+
+        Args:
+            entry: The old entry.
+            new_entry: The entry that took its place.
+        """
+        self.remove(entry)
+        self.add(new_entry)
+
+    def form(self, noun: str, case: str, number: str = EKAVACHANA):
+        """
+        Look up one cell of a paradigm.
+
+        Args:
+            noun: The stem, e.g. "राम".
+            case: The case, e.g. "प्रथमा".
+            number: The number, one of VACHANA.
+
+        Returns:
+            The form, or None if the kosha does not have it.
+        """
+        return self.forms.get((noun, case, number))
+
+    def analyze(self, form: str) -> list:
+        """
+        Find every noun, case and number producing a surface form.
+
+        Args:
+            form: The inflected word, e.g. "रामस्य".
+
+        Returns:
+            A list of VibhaktiVishleshana; empty if the form is unknown.
+        """
+        return list(self.analyses.get(form, ()))
+
+    def nouns_with_case(self, case: str) -> list:
+        """
+        List the entries declined in a case.
+
+        Args:
+            case: The case, e.g. "प्रथमा".
+
+        Returns:
+            The entries.
+        """
+        return list(self.cases.get(case, {}).values())
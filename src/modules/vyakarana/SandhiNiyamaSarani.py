@@ -0,0 +1,334 @@
+﻿import os
+import json
+import logging
+from core.VarnaVargikarana import get_varga, ANYA, SVARA, VYANJANA, VIRAMA
+from core.Lipyantarana import SLP1_SVARA, SLP1_VYANJANA, to_slp1
+from core.Smriti import Smriti, get_smriti, ABHAVA
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Code-point classes used to key the compiled rule tables
+VARGA_NAMES = {"svara": SVARA, "vyanjana": VYANJANA}
+
+DEFAULT_FILEPATH = os.path.join(os.path.dirname(__file__), "SandhiNiyama.json")
+
+class SandhiNiyamaSarani:
+    """
+    Compiled sandhi rule table.
+
+    The rules are read once from a data file and compiled into flat lookup
+    tables keyed on the (left class, right class) of the boundary, so that a
+    join is one classification-table lookup per side plus a single dict probe.
+
+    The same file carries the consonant-cluster (samyoga) rules used by
+    ShabdaSamyojaka, so both modules share one rule set.
+    """
+
+    def __init__(self, sandhi: dict, samyoga: list = (), smriti_size: int = 4096, smriti: Smriti = None):
+        self.niyama = {}
+        for boundary, sandhi_map in sandhi.items():
+            left_name, right_name = boundary.split("+")
+            table = {}
+            for left, right_map in sandhi_map.items():
+                for right, combined in right_map.items():
+                    table[(left, right)] = combined
+            self.niyama[(VARGA_NAMES[left_name], VARGA_NAMES[right_name])] = table
+
+        # Consonant-cluster rules, first match wins as in the original branch order
+        self.samyoga = {}
+        self.prakara = {}
+        for rule in samyoga:
+            pair = (rule["purva"], rule["para"])
+            self.samyoga.setdefault(pair, (rule["rupa"], rule["yukta"]))
+            self.prakara.setdefault(rule["prakara"], set()).add(pair)
+
+        # Merged boundary table: valid clusters first, explicit sandhi rules override them
+        self.sandhi = {pair: rupa for pair, (rupa, yukta) in self.samyoga.items() if yukta}
+        for table in self.niyama.values():
+            self.sandhi.update(table)
+        self.max_right = max((len(right) for _, right in self.sandhi), default=1)
+        # Some cluster rules end the first word in a bare consonant ("त्" + "र" -> "त्र"), so the left side is
+        # matched longest-first too; the classes of their last characters bypass the boundary-class check
+        self.max_left = max((len(left) for left, _ in self.sandhi), default=1)
+        self.purva_varga = {get_varga(left[-1]) for left, _ in self.sandhi if len(left) > 1}
+
+        # The same rules over SLP1, keyed on the transliterated Devanagari units
+        # (e.g. "क" -> "ka", "त्" -> "t")
+        self.slp1 = {(to_slp1(left), to_slp1(right)): to_slp1(combined)
+                     for (left, right), combined in self.sandhi.items()}
+
+        # Resolved boundaries, keyed on (final segment, initial segment); a rule table of its own gets its own cache
+        self.smriti = smriti if smriti is not None else Smriti(smriti_size)
+
+    @classmethod
+    def load(cls, filepath: str = DEFAULT_FILEPATH, smriti: Smriti = None) -> "SandhiNiyamaSarani":
+        """
+        Load and compile a sandhi rule table from a JSON data file.
+
+        Args:
+            filepath: Path to the rule file.
+            smriti: (Optional) The boundary cache; a new one is created if omitted.
+
+        Returns:
+            The compiled rule table.
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8-sig') as file:
+                data = json.load(file)
+            return cls(data["sandhi"], data.get("samyoga", []), smriti=smriti)
+        except FileNotFoundError:
+            logger.error(f"Error: File not found at {filepath}")
+            raise
+        except json.JSONDecodeError:
+            logger.error(f"Error decoding JSON from {filepath}")
+            raise
+
+    def get_table(self, left: str, right: str) -> dict:
+        """
+        Get the compiled rule table for the boundary between two characters.
+
+        Args:
+            left: The final character of the first word.
+            right: The initial character of the second word.
+
+        Returns:
+            The table mapping (left, right) to the combined form, or None if no
+            sandhi applies across this boundary class.
+        """
+        return self.niyama.get((get_varga(left), get_varga(right)))
+
+    def resolve(self, word1: str, word2: str) -> tuple:
+        """
+        Resolve the sandhi at a boundary, matching the longest rule on each side.
+
+        Longer finals are tried first, e.g. "त्" before "्". The result depends
+        only on the last max_left characters of word1 and the first max_right
+        characters of word2, so it is memoized on that boundary.
+
+        Args:
+            word1: The first word, or at least its last max_left characters (non-empty).
+            word2: The second word (non-empty).
+
+        Returns:
+            (int, str, int): How many characters of word1 the rule replaces, the
+            combined form and how many characters of word2 it consumed, or None
+            if no sandhi applies across this boundary.
+        """
+        key = (word1[-self.max_left:], word2[:self.max_right])
+        rule = self.smriti.get(key)
+        if rule is ABHAVA:
+            rule = self._resolve(*key)
+            self.smriti.put(key, rule)
+        return rule
+
+    def _resolve(self, tail: str, head: str) -> tuple:
+        for left_length in range(len(tail), 1, -1):
+            rule = self._match(tail[-left_length:], head)
+            if rule is not None:
+                return rule
+        left = tail[-1]
+        if (get_varga(left), get_varga(head[0])) not in self.niyama:
+            return None
+        return self._match(left, head) or (1, left + head[0], 1)
+
+    def _match(self, left: str, head: str) -> tuple:
+        for length in range(len(head), 0, -1):
+            combined = self.sandhi.get((left, head[:length]))
+            if combined is not None:
+                return len(left), combined, length
+        return None
+
+    def join(self, word1: str, word2: str) -> str:
+        """
+        Join two non-empty words using the compiled rules.
+
+        Args:
+            word1: The first word.
+            word2: The second word.
+
+        Returns:
+            The combined word, or both words separated by a space if no sandhi
+            applies across the boundary.
+        """
+        rule = self.resolve(word1, word2)
+        if rule is None:
+            return word1 + " " + word2
+        replaced, combined, consumed = rule
+        return word1[:len(word1) - replaced] + combined + word2[consumed:]
+
+    def join_batch(self, pairs) -> list:
+        """
+        Join many word pairs at once, applying each boundary-class table in bulk.
+
+        Pairs are first grouped by the code-point classes of their boundary, then
+        every group is resolved against its own rule table in one tight loop,
+        looking up each distinct boundary only once. Groups with no rule table
+        are joined with a space, unless a longer final such as "त्" may match.
+
+        Args:
+            pairs: A sequence of (word1, word2) tuples of non-empty words.
+
+        Returns:
+            The combined words, in the same order as the pairs.
+        """
+        groups = {}
+        for idx, (word1, word2) in enumerate(pairs):
+            groups.setdefault((get_varga(word1[-1]), get_varga(word2[0])), []).append(idx)
+
+        results = [None] * len(pairs)
+        max_left, max_right = self.max_left, self.max_right
+        for boundary, indices in groups.items():
+            if boundary not in self.niyama and boundary[0] not in self.purva_varga:
+                for idx in indices:
+                    word1, word2 = pairs[idx]
+                    results[idx] = word1 + " " + word2
+                continue
+            # Each distinct (final segment, initial segment) is resolved once per group
+            resolved = {}
+            for idx in indices:
+                word1, word2 = pairs[idx]
+                key = (word1[-max_left:], word2[:max_right])
+                rule = resolved.get(key, ABHAVA)
+                if rule is ABHAVA:
+                    rule = resolved[key] = self.resolve(word1, word2)
+                if rule is None:
+                    results[idx] = word1 + " " + word2
+                else:
+                    replaced, combined, consumed = rule
+                    results[idx] = word1[:len(word1) - replaced] + combined + word2[consumed:]
+        return results
+
+    def resolve_slp1(self, word1: str, word2: str) -> tuple:
+        """
+        Resolve the sandhi at the boundary of two SLP1 words.
+
+        The Devanagari rules are keyed on characters, so the boundary units are
+        the SLP1 spellings of the Devanagari characters at the boundary: the
+        final consonant with its inherent a ("ka"), a final independent vowel
+        or a bare final consonant ("t" for "त्") on the left; an initial vowel,
+        a consonant with its inherent a, or a bare consonant before another
+        consonant on the right. Every unit is found by indexing at most two
+        characters.
+
+        Args:
+            word1: The first SLP1 word (non-empty).
+            word2: The second SLP1 word (non-empty).
+
+        Returns:
+            (int, str, int): How many characters of word1 the rule replaces, the
+            combined form and how many characters of word2 it consumed, or None
+            if no sandhi applies across this boundary class.
+        """
+        last = word1[-1]
+        before = word1[-2] if len(word1) > 1 else ""
+        if last == "a" and before in SLP1_VYANJANA:
+            left, left_varga = before + last, VYANJANA
+        elif last in SLP1_SVARA and before not in SLP1_VYANJANA:
+            left, left_varga = last, SVARA
+        elif last in SLP1_VYANJANA:
+            # A bare final consonant, which only the longer Devanagari finals such as "त्" match
+            left, left_varga = last, VIRAMA
+        else:
+            return None
+
+        # Each candidate is (right unit, characters of word2 consumed, whether the rest of word2 cancels
+        # the inherent a of the rule's output, as a vowel sign or virama left in place does in Devanagari)
+        first = word2[0]
+        following = word2[1] if len(word2) > 1 else ""
+        if first in SLP1_SVARA:
+            right_varga, candidates = SVARA, ((first, 1, False),)
+        elif first not in SLP1_VYANJANA:
+            return None
+        elif following == "a":
+            right_varga, candidates = VYANJANA, ((first + "a", 2, False),)
+        elif following in SLP1_SVARA:
+            # A Devanagari rule replaces the consonant and keeps its vowel sign
+            right_varga, candidates = VYANJANA, ((first + "a", 1, True),)
+        else:
+            # A bare consonant: "t" for "त्", or the "त" of a conjunct such as "त्र", whose virama stays
+            right_varga, candidates = VYANJANA, ((first, 1, False), (first + "a", 1, True))
+
+        if left_varga != VIRAMA and (left_varga, right_varga) not in self.niyama:
+            return None
+        for right, consumed, bare in candidates:
+            combined = self.slp1.get((left, right))
+            if combined is not None:
+                if bare and combined[-1:] == "a" and combined[-2:-1] in SLP1_VYANJANA:
+                    combined = combined[:-1]
+                return len(left), combined, consumed
+        return None if left_varga == VIRAMA else (0, "", 0)
+
+    def join_slp1(self, word1: str, word2: str) -> str:
+        """
+        Join two non-empty SLP1 words using the compiled rules.
+
+        Args:
+            word1: The first SLP1 word.
+            word2: The second SLP1 word.
+
+        Returns:
+            The combined SLP1 word, or both words separated by a space if no
+            sandhi applies across the boundary.
+        """
+        rule = self.resolve_slp1(word1, word2)
+        if rule is None:
+            return word1 + " " + word2
+        replaced, combined, consumed = rule
+        return word1[:len(word1) - replaced] + combined + word2[consumed:]
+
+    def join_batch_slp1(self, pairs) -> list:
+        """
+        Join many SLP1 word pairs at once, resolving each distinct boundary only once.
+
+        Args:
+            pairs: A sequence of (word1, word2) tuples of non-empty SLP1 words.
+
+        Returns:
+            The combined SLP1 words, in the same order as the pairs.
+        """
+        resolved = {}
+        results = []
+        for word1, word2 in pairs:
+            key = (word1[-2:], word2[:2])
+            rule = resolved.get(key, ABHAVA)
+            if rule is ABHAVA:
+                rule = resolved[key] = self.resolve_slp1(word1, word2)
+            if rule is None:
+                results.append(word1 + " " + word2)
+            else:
+                replaced, combined, consumed = rule
+                results.append(word1[:len(word1) - replaced] + combined + word2[consumed:])
+        return results
+
+    def get_samyoga(self, char1: str, char2: str) -> tuple:
+        """
+        Look up the consonant-cluster rule for two characters.
+
+        Args:
+            char1: The first character.
+            char2: The second character.
+
+        Returns:
+            (str, bool): The cluster string and whether it is a valid cluster,
+            or ("", False) if no rule applies.
+        """
+        return self.samyoga.get((char1, char2), ("", False))
+
+    def is_prakara(self, prakara: str, char1: str, char2: str) -> bool:
+        """
+        Check whether a pair of characters is covered by a given kind of cluster rule.
+
+        Args:
+            prakara: The rule kind, e.g. "anunasika" or "lopa".
+            char1: The first character.
+            char2: The second character.
+
+        Returns:
+            True if any rule of that kind covers the pair, False otherwise.
+        """
+        return (char1, char2) in self.prakara.get(prakara, ())
+
+# Compiled once at import time and shared by all callers; its boundary cache is reported by smriti_info()
+SANDHI_SARANI = SandhiNiyamaSarani.load(smriti=get_smriti("sandhi"))
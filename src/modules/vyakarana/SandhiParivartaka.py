@@ -0,0 +1,77 @@
+﻿import logging
+from typing import Iterable
+from modules.vyakarana.SandhiNiyamaSarani import SANDHI_SARANI, SandhiNiyamaSarani
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SandhiParivartaka:
+    """
+    Finite-state sandhi transducer.
+
+    The transducer holds back the last characters it has read, as many as the
+    longest final in the rule table (e.g. "त्"), since a word boundary may
+    rewrite them. At each boundary the held characters and the start of the
+    next word select a transition from the compiled rule table; the rewritten
+    form is emitted and its last characters become the new held state. Every character is read once, so a whole sentence is joined in time
+    linear in its length instead of re-copying the growing result pair by pair.
+    """
+
+    def __init__(self, sarani: SandhiNiyamaSarani = SANDHI_SARANI):
+        self.sarani = sarani
+
+    def transduce(self, words: Iterable[str]) -> str:
+        """
+        Join a sequence of words, applying sandhi at every boundary.
+
+        Args:
+            words: An iterable of Sanskrit words; empty words are skipped.
+
+        Returns:
+            The joined text. Boundaries where no sandhi applies keep a space.
+        """
+        resolve = self.sarani.resolve
+        max_left = self.sarani.max_left
+        output = []
+        held = None
+        for word in words:
+            if not word:
+                continue
+            if held is None:
+                rest = word
+            else:
+                rule = resolve(held, word)
+                if rule is None:
+                    output.append(held)
+                    output.append(" ")
+                    rest = word
+                else:
+                    replaced, combined, consumed = rule
+                    rest = held[:len(held) - replaced] + combined + word[consumed:]
+            output.append(rest[:-max_left])
+            held = rest[-max_left:]
+        if held is not None:
+            output.append(held)
+        return "".join(output)
+
+    def apply(self, sentence: str) -> str:
+        """
+        Apply sandhi across a whitespace-separated sentence in one pass.
+
+        Args:
+            sentence: The Sanskrit sentence or verse line.
+
+        Returns:
+            The sentence with sandhi applied at every word boundary.
+        """
+        return self.transduce(sentence.split())
+
+# Shared transducer over the default rule table
+SANDHI_PARIVARTAKA = SandhiParivartaka()
+
+# Example usage
+if __name__ == "__main__":
+    parivartaka = SandhiParivartaka()
+    print("Joined:", parivartaka.apply("कृष्ण बलरामः देव इन्द्रः"))
+    print("Joined:", parivartaka.transduce(["वाक", "पतिः"]))
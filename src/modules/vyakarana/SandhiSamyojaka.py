@@ -1,4 +1,8 @@
 ﻿import logging
+from core.VarnaVargikarana import get_varga, SVARA, VYANJANA
+from core.Lipyantarana import DEVANAGARI, get_lipyantaraka
+from modules.vyakarana.SandhiNiyamaSarani import SANDHI_SARANI
+from modules.vyakarana.SandhiParivartaka import SANDHI_PARIVARTAKA
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -21,13 +25,111 @@ class SandhiSamyojaka:
             logger.error("Both words must be provided")
             raise ValueError("Both words must be provided")
 
-        if SandhiSamyojaka.is_vowel(word1[-1]) and SandhiSamyojaka.is_consonant(word2[0]):
-            return SandhiSamyojaka.apply_vowel_consonant_sandhi(word1, word2)
-        elif SandhiSamyojaka.is_consonant(word1[-1]) and SandhiSamyojaka.is_consonant(word2[0]):
-            return SandhiSamyojaka.apply_consonant_consonant_sandhi(word1, word2)
-        elif SandhiSamyojaka.is_vowel(word1[-1]) and SandhiSamyojaka.is_vowel(word2[0]):
-            return SandhiSamyojaka.apply_vowel_vowel_sandhi(word1, word2)
-        return word1 + " " + word2
+        return SANDHI_SARANI.join(word1, word2)
+
+    @staticmethod
+    def apply_sandhi_batch(pairs, scheme: str = DEVANAGARI) -> list:
+        """
+        Apply sandhi rules to many word pairs in one call.
+
+        Words in any other scheme are converted to SLP1 once on the way in, joined
+        by the SLP1 engine, and converted back once on the way out.
+
+        Args:
+            pairs: A list or iterator of (word1, word2) tuples.
+            scheme: The script of the words: "devanagari", "slp1", "iast", "hk" or "itrans".
+
+        Returns:
+            The combined words, in the same order as the pairs.
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        try:
+            if scheme == DEVANAGARI:
+                return SANDHI_SARANI.join_batch(pairs)
+            if scheme == "slp1":
+                return SANDHI_SARANI.join_batch_slp1(pairs)
+            to_slp1 = get_lipyantaraka(scheme, "slp1").transliterate
+            from_slp1 = get_lipyantaraka("slp1", scheme).transliterate
+            combined = SANDHI_SARANI.join_batch_slp1([(to_slp1(word1), to_slp1(word2)) for word1, word2 in pairs])
+            return [from_slp1(word) for word in combined]
+        except IndexError:
+            # An empty word; validate only on failure so the fast path stays a single pass
+            idx = next((idx for idx, (word1, word2) in enumerate(pairs) if not word1 or not word2), None)
+            if idx is None:
+                # Not an empty word: a bug in the engine, which should surface as it is
+                raise
+            logger.error(f"Both words must be provided (pair {idx})")
+            raise ValueError(f"Both words must be provided (pair {idx})")
+
+    @staticmethod
+    def apply_sandhi_slp1(word1: str, word2: str) -> str:
+        """
+        Apply sandhi rules between two words in the SLP1 internal encoding.
+
+        Args:
+            word1: The first word, in SLP1.
+            word2: The second word, in SLP1.
+
+        Returns:
+            The combined word in SLP1.
+        """
+        if not word1 or not word2:
+            logger.error("Both words must be provided")
+            raise ValueError("Both words must be provided")
+
+        return SANDHI_SARANI.join_slp1(word1, word2)
+
+    @staticmethod
+    def apply_sandhi_sequence(tokens, scheme: str = DEVANAGARI) -> list:
+        """
+        Apply sandhi rules at every boundary of a token sequence.
+
+        Args:
+            tokens: A list or iterator of Sanskrit words.
+            scheme: The script of the words, as for apply_sandhi_batch.
+
+        Returns:
+            The combined form of each adjacent pair (tokens[i], tokens[i + 1]).
+        """
+        tokens = tokens if isinstance(tokens, list) else list(tokens)
+        return SandhiSamyojaka.apply_sandhi_batch(list(zip(tokens, tokens[1:])), scheme)
+
+    @staticmethod
+    def apply_sandhi_to_sentence(sentence: str) -> str:
+        """
+        Apply sandhi rules across every word boundary of a sentence in one pass.
+
+        Args:
+            sentence: The whitespace-separated Sanskrit sentence.
+
+        Returns:
+            The sentence after applying sandhi rules.
+        """
+        if not sentence or not sentence.strip():
+            logger.error("Sentence must be provided")
+            raise ValueError("Sentence must be provided")
+
+        return SANDHI_PARIVARTAKA.apply(sentence)
+
+    @staticmethod
+    def set_cache_size(maxsize: int):
+        """
+        Set how many sandhi boundaries are memoized.
+
+        Args:
+            maxsize: The maximum number of cached boundaries; 0 disables the cache.
+        """
+        SANDHI_SARANI.smriti.resize(maxsize)
+
+    @staticmethod
+    def cache_info():
+        """
+        Report the boundary cache statistics.
+
+        Returns:
+            A SmritiInfo with hits, misses, maxsize, current size and hit rate.
+        """
+        return SANDHI_SARANI.smriti.info()
 
     @staticmethod
     def is_vowel(char: str) -> bool:
@@ -40,8 +142,7 @@ class SandhiSamyojaka:
         Returns:
             True if the character is a vowel, False otherwise.
         """
-        vowels = set(["अ", "आ", "इ", "ई", "उ", "ऊ", "ऋ", "ॠ", "ऌ", "ॡ", "ए", "ऐ", "ओ", "औ"])
-        return char in vowels
+        return get_varga(char) == SVARA
 
     @staticmethod
     def is_consonant(char: str) -> bool:
@@ -54,8 +155,7 @@ class SandhiSamyojaka:
         Returns:
             True if the character is a consonant, False otherwise.
         """
-        consonants = set(["क", "ख", "ग", "घ", "ङ", "च", "छ", "ज", "झ", "ञ", "ट", "ठ", "ड", "ढ", "ण", "त", "थ", "द", "ध", "न", "प", "फ", "ब", "भ", "म", "य", "र", "ल", "व", "श", "ष", "स", "ह"])
-        return char in consonants
+        return get_varga(char) == VYANJANA
 
     @staticmethod
     def apply_vowel_consonant_sandhi(word1: str, word2: str) -> str:
@@ -71,10 +171,7 @@ class SandhiSamyojaka:
         """
         vowel = word1[-1]
         consonant = word2[0]
-        sandhi_map = {
-            "अ": {"क": "अच्", "ख": "अग्", "ग": "अज्", "घ": "अज्", "ङ": "अञ्", "च": "च्", "छ": "च्", "ज": "ज्", "झ": "ज्", "ञ": "ञ्", "ट": "ट्", "ठ": "ट्", "ड": "ट्", "ढ": "ट्", "ण": "ण्", "त": "त्", "थ": "त्", "द": "त्", "ध": "त्", "न": "न्", "प": "प्", "फ": "प्", "ब": "प्", "भ": "प्", "म": "म्", "य": "य्", "र": "र्", "ल": "ल्", "व": "व्", "श": "श्", "ष": "ष्", "स": "स्", "ह": "ह्"}
-        }
-        combined = sandhi_map.get(vowel, {}).get(consonant, vowel + consonant)
+        combined = SANDHI_SARANI.niyama[(SVARA, VYANJANA)].get((vowel, consonant), vowel + consonant)
         return word1[:-1] + combined + word2[1:]
 
     @staticmethod
@@ -91,41 +188,7 @@ class SandhiSamyojaka:
         """
         consonant1 = word1[-1]
         consonant2 = word2[0]
-        sandhi_map = {
-            "क": {"त": "च्", "त्": "च्", "प": "प्"},
-            "ख": {"त": "च्", "त्": "च्", "प": "प्"},
-            "ग": {"त": "ज्", "त्": "ज्", "प": "ङ्"},
-            "घ": {"त": "ज्", "त्": "ज्", "प": "ङ्"},
-            "ङ": {"त": "ञ्", "त्": "ञ्", "प": "ञ्"},
-            "च": {"त": "च्", "त्": "च्", "प": "प्"},
-            "छ": {"त": "च्", "त्": "च्", "प": "प्"},
-            "ज": {"त": "ज्", "त्": "ज्", "प": "ञ्"},
-            "झ": {"त": "ज्", "त्": "ज्", "प": "ञ्"},
-            "ट": {"त": "ट्", "त्": "ट्", "प": "प्"},
-            "ठ": {"त": "ट्", "त्": "ट्", "प": "प्"},
-            "ड": {"त": "ट्", "त्": "ट्", "प": "प्"},
-            "ढ": {"त": "ट्", "त्": "ट्", "प": "प्"},
-            "ण": {"त": "ण्", "त्": "ण्", "प": "न्"},
-            "त": {"त": "त्", "त्": "त्", "प": "त्"},
-            "थ": {"त": "त्", "त्": "त्", "प": "त्"},
-            "द": {"त": "त्", "त्": "त्", "प": "त्"},
-            "ध": {"त": "त्", "त्": "त्", "प": "त्"},
-            "न": {"त": "न्", "त्": "न्", "प": "न्"},
-            "प": {"त": "प्", "त्": "प्", "प": "प्"},
-            "फ": {"त": "प्", "त्": "प्", "प": "प्"},
-            "ब": {"त": "प्", "त्": "प्", "प": "प्"},
-            "भ": {"त": "प्", "त्": "प्", "प": "प्"},
-            "म": {"त": "म्", "त्": "म्", "प": "म्"},
-            "य": {"त": "य्", "त्": "य्", "प": "य्"},
-            "र": {"त": "र्", "त्": "र्", "प": "र्"},
-            "ल": {"त": "ल्", "त्": "ल्", "प": "ल्"},
-            "व": {"त": "व्", "त्": "व्", "प": "व्"},
-            "श": {"त": "श्", "त्": "श्", "प": "श्"},
-            "ष": {"त": "श्", "त्": "श्", "प": "ष्"},
-            "स": {"त": "स्", "त्": "स्", "प": "स्"},
-            "ह": {"त": "ह्", "त्": "ह्", "प": "ह्"}
-        }
-        combined = sandhi_map.get(consonant1, {}).get(consonant2, consonant1 + consonant2)
+        combined = SANDHI_SARANI.niyama[(VYANJANA, VYANJANA)].get((consonant1, consonant2), consonant1 + consonant2)
         return word1[:-1] + combined + word2[1:]
 
     @staticmethod
@@ -142,11 +205,7 @@ class SandhiSamyojaka:
         """
         vowel1 = word1[-1]
         vowel2 = word2[0]
-        sandhi_map = {
-            "अ": {"अ": "आ", "इ": "ए", "उ": "ओ", "ऋ": "अर्", "ॠ": "अर्", "ऌ": "अल्", "ॡ": "अल्", "ए": "ऐ", "ऐ": "आ", "ओ": "औ", "औ": "आ"},
-            "आ": {"अ": "आ", "इ": "ए", "उ": "ओ", "ऋ": "आर्", "ॠ": "आर्", "ऌ": "आल्", "ॡ": "आल्", "ए": "ऐ", "ऐ": "आ", "ओ": "औ", "औ": "आ"}
-        }
-        combined = sandhi_map.get(vowel1, {}).get(vowel2, vowel1 + vowel2)
+        combined = SANDHI_SARANI.niyama[(SVARA, SVARA)].get((vowel1, vowel2), vowel1 + vowel2)
         return word1[:-1] + combined + word2[1:]
 
 # Example usage
@@ -163,3 +222,21 @@ if __name__ == "__main__":
 
     combined_word = sandhi.apply_sandhi("कृष्ण", "बलरामः")
     print("Combined Word:", combined_word)
+
+    # Micro-benchmark: pairs joined per second
+    import timeit
+    pairs = [("देव", "इन्द्रः"), ("गङ्गा", "उदकः"), ("वाक", "पतिः"), ("महा", "ईशः")] * 250000
+    elapsed = timeit.timeit(lambda: [sandhi.apply_sandhi(word1, word2) for word1, word2 in pairs], number=1)
+    print(f"apply_sandhi: {len(pairs) / elapsed:,.0f} pairs/sec ({elapsed / len(pairs) * 1e9:,.0f} ns/pair)")
+    elapsed = timeit.timeit(lambda: sandhi.apply_sandhi_batch(pairs), number=1)
+    print(f"apply_sandhi_batch: {len(pairs) / elapsed:,.0f} pairs/sec ({elapsed / len(pairs) * 1e9:,.0f} ns/pair)")
+    print("Boundary cache:", sandhi.cache_info())
+
+    # The same pairs in the SLP1 internal encoding
+    from core.Lipyantarana import to_slp1
+    slp1_pairs = [(to_slp1(word1), to_slp1(word2)) for word1, word2 in pairs[:4]] * 250000
+    print("SLP1:", sandhi.apply_sandhi_batch(slp1_pairs[:4], scheme="slp1"))
+    elapsed = timeit.timeit(lambda: [sandhi.apply_sandhi_slp1(word1, word2) for word1, word2 in slp1_pairs], number=1)
+    print(f"apply_sandhi_slp1: {len(slp1_pairs) / elapsed:,.0f} pairs/sec ({elapsed / len(slp1_pairs) * 1e9:,.0f} ns/pair)")
+    elapsed = timeit.timeit(lambda: sandhi.apply_sandhi_batch(slp1_pairs, scheme="slp1"), number=1)
+    print(f"apply_sandhi_batch (slp1): {len(slp1_pairs) / elapsed:,.0f} pairs/sec ({elapsed / len(slp1_pairs) * 1e9:,.0f} ns/pair)")
@@ -0,0 +1,201 @@
+﻿import math
+import logging
+import threading
+from modules.vyakarana.SandhiNiyamaSarani import SANDHI_SARANI, SandhiNiyamaSarani
+from modules.kosha.DhatuKosha import DhatuKosha
+from modules.kosha.VibhaktiKosha import VibhaktiKosha
+from modules.kosha.VibhaktiSarani import iter_paradigm
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Trie key marking the end of a lexicon word; its value is the word's log-probability
+SHABDA_ANTA = None
+
+# The splitter over the shipped kosha lexicons, built on first use and shared by every sentence pipeline
+_KOSHA_VICCHEDA = None
+_KOSHA_VICCHEDA_LOCK = threading.Lock()
+
+class SandhiViccheda:
+    """
+    Native sandhi splitter.
+
+    The compiled sandhi rules are inverted into a table from each joined form
+    back to the (final, initial) pair it came from. A joined token is then read
+    as a lattice: every lexicon word that matches the surface text, either
+    directly or by undoing a sandhi rule at its right edge, is an edge between
+    two lattice nodes. A node is a surface position together with the initial
+    segment the next word must restore. Viterbi-style DP keeps the best-scoring
+    path into each node and prunes each position to a fixed beam, so long,
+    heavily joined verse lines are split in time linear in their length.
+    """
+
+    def __init__(self, lexicon, sarani: SandhiNiyamaSarani = SANDHI_SARANI, beam_width: int = 8):
+        """
+        Args:
+            lexicon: A dict of word -> frequency, or an iterable of words (each counted once).
+            sarani: The compiled sandhi rule table to invert.
+            beam_width: The number of lattice nodes kept per surface position.
+        """
+        if not isinstance(lexicon, dict):
+            counts = {}
+            for word in lexicon:
+                if word:
+                    counts[word] = counts.get(word, 0) + 1
+            lexicon = counts
+        self.beam_width = beam_width
+        self.trie = {}
+        total = sum(lexicon.values()) or 1
+        for word, count in lexicon.items():
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[SHABDA_ANTA] = math.log(count / total)
+
+        # Inverse rules: first character of the joined form -> [(joined, final, initial)]
+        self.viparita = {}
+        for (left, right), combined in sarani.sandhi.items():
+            if combined and combined != left + right:
+                self.viparita.setdefault(combined[0], []).append((combined, left, right))
+
+    @classmethod
+    def from_kosha(cls, vibhakti_kosha=None, dhatu_kosha=None, samyukta_kosha=None, **kwargs) -> "SandhiViccheda":
+        """
+        Build a splitter from the headwords and inflected forms in the kosha lexicons.
+
+        Args:
+            vibhakti_kosha: (Optional) A VibhaktiKosha; its nouns and case forms are used.
+            dhatu_kosha: (Optional) A DhatuKosha; its roots and tense forms are used.
+            samyukta_kosha: (Optional) A SamyuktaKosha; its words are used.
+
+        Returns:
+            The splitter.
+        """
+        words = []
+        if vibhakti_kosha is not None:
+            for vibhakti_info in vibhakti_kosha.data.get("Nouns", []):
+                words.append(vibhakti_info.get("noun"))
+                words.extend(form for _, _, form in iter_paradigm(vibhakti_info))
+        if dhatu_kosha is not None:
+            for dhatu_info in dhatu_kosha.data.get("Dhatus", []):
+                words.append(dhatu_info.get("dhatu"))
+                words.extend(dhatu_info.get("tense_usage", {}).values())
+        if samyukta_kosha is not None:
+            words.extend(samyukta_kosha.list_all_words())
+        return cls([word for word in words if isinstance(word, str)], **kwargs)
+
+    def split_word(self, token: str) -> list:
+        """
+        Split one joined token into its most likely sequence of lexicon words.
+
+        Args:
+            token: A token without whitespace.
+
+        Returns:
+            The list of words, or [token] if no segmentation into known words exists.
+        """
+        n = len(token)
+        # best[position][initial] = (score, previous node, word)
+        best = [dict() for _ in range(n + 1)]
+        best[0][""] = (0.0, None, None)
+
+        for i in range(n + 1):
+            nodes = best[i]
+            if len(nodes) > self.beam_width:
+                kept = sorted(nodes.items(), key=lambda item: item[1][0], reverse=True)[:self.beam_width]
+                nodes = best[i] = dict(kept)
+            # Nodes with a pending initial can reach the "" node at the same position; expand them first
+            for initial in [initial for initial in nodes if initial] + [""]:
+                if initial not in nodes:
+                    continue
+                score = nodes[initial][0]
+                trie = self.trie
+                for char in initial:
+                    trie = trie.get(char)
+                    if trie is None:
+                        break
+                if trie is None:
+                    continue
+                j = i
+                while True:
+                    # Sandhi edge: the word ends in `final`, and surface[j:] starts with the joined form
+                    for combined, final, next_initial in self.viparita.get(token[j], ()) if j < n else ():
+                        if token.startswith(combined, j):
+                            end = trie.get(final)
+                            if end is not None and SHABDA_ANTA in end:
+                                word = initial + token[i:j] + final
+                                self._relax(best[j + len(combined)], next_initial, score + end[SHABDA_ANTA], (i, initial), word)
+                    # Plain edge: the word ends exactly at j
+                    if SHABDA_ANTA in trie and (j > i or initial):
+                        self._relax(best[j], "", score + trie[SHABDA_ANTA], (i, initial), initial + token[i:j])
+                    if j == n:
+                        break
+                    trie = trie.get(token[j])
+                    if trie is None:
+                        break
+                    j += 1
+
+        if "" not in best[n]:
+            return [token]
+        words = []
+        position, initial = n, ""
+        while True:
+            _, previous, word = best[position][initial]
+            if previous is None:
+                break
+            words.append(word)
+            position, initial = previous
+        words.reverse()
+        return words
+
+    def split(self, sentence: str) -> list:
+        """
+        Split a sentence into words, undoing sandhi inside each whitespace-separated token.
+
+        Args:
+            sentence: The Sanskrit sentence or verse line.
+
+        Returns:
+            The list of words.
+        """
+        words = []
+        for token in sentence.split():
+            words.extend(self.split_word(token))
+        return words
+
+    @staticmethod
+    def _relax(nodes: dict, initial: str, score: float, previous: tuple, word: str):
+        current = nodes.get(initial)
+        if current is None or score > current[0]:
+            nodes[initial] = (score, previous, word)
+
+def get_kosha_viccheda() -> SandhiViccheda:
+    """
+    Get the splitter over the nouns and roots of the shipped kosha lexicons.
+
+    Loading the koshas and building the trie is the costly part of setting
+    up a sentence pipeline, so it is done once, on the first call, and the
+    splitter is shared from then on.
+
+    Returns:
+        The shared splitter.
+    """
+    global _KOSHA_VICCHEDA
+    if _KOSHA_VICCHEDA is None:
+        with _KOSHA_VICCHEDA_LOCK:
+            if _KOSHA_VICCHEDA is None:
+                _KOSHA_VICCHEDA = SandhiViccheda.from_kosha(vibhakti_kosha=VibhaktiKosha(), dhatu_kosha=DhatuKosha())
+                logger.info("Built the kosha sandhi splitter")
+    return _KOSHA_VICCHEDA
+
+# Example usage
+if __name__ == "__main__":
+    from modules.vyakarana.SandhiParivartaka import SANDHI_PARIVARTAKA
+
+    lexicon = ["कृष्ण", "बलरामः", "वाक", "पतिः", "देव", "इन्द्रः", "अ", "इति"]
+    viccheda = SandhiViccheda(lexicon)
+
+    joined = SANDHI_PARIVARTAKA.apply("वाक पतिः कृष्ण बलरामः")
+    print("Joined:", joined)
+    print("Split:", viccheda.split(joined))
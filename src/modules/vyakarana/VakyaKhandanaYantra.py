@@ -1,5 +1,7 @@
-﻿from sanskritnlp import SktTokenizer, SandhiSplitter
+﻿from sanskritnlp import SktTokenizer
 from mimansaparser import SanskritParser
+from modules.kosha.VibhaktiKosha import VibhaktiKosha
+from modules.vyakarana.SandhiViccheda import get_kosha_viccheda
 
 class Shabda:
     def __init__(self, word, **properties):
@@ -29,11 +31,15 @@ class DependencyTree:
 class VakyaKhandanaYantra:
     def __init__(self):
         self.tokenizer = SktTokenizer()
-        self.sandhi_splitter = SandhiSplitter()
+        self.vibhakti_kosha = VibhaktiKosha()
+        # The kosha splitter is shared and built on first use; assign another SandhiViccheda to override it
+        self.sandhi_splitter = None
         self.parser = SanskritParser()
 
     def tokenize_sentence(self, sentence):
-        # Tokenize the sentence into words or phrases
+        # Tokenize the sentence into words, undoing sandhi against the kosha lexicons
+        if self.sandhi_splitter is None:
+            self.sandhi_splitter = get_kosha_viccheda()
         tokens = self.sandhi_splitter.split(sentence)
         return tokens
 
@@ -41,7 +47,12 @@ class VakyaKhandanaYantra:
         # Parse the dependency structure of the sentence
         tree = DependencyTree()
         for token in tokens:
-            shabda = Shabda(token, **self.parser.analyze(token))
+            properties = self.parser.analyze(token)
+            # Nominal forms in the kosha get their stem and case from one probe of its reverse form index
+            analyses = self.vibhakti_kosha.analyze_form(token)
+            if analyses and not properties.get("case"):
+                properties = dict(properties, lemma=properties.get("lemma") or analyses[0].noun, case=analyses[0].case)
+            shabda = Shabda(token, **properties)
             node = Node(shabda)
             tree.add_node(node)
             head, dependency_type = self.analyze_syntactic_role(shabda, tokens, tree)
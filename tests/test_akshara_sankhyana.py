@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from core.AksharaSankhyana import compute_metrics
+
+class ComputeMetricsTest(unittest.TestCase):
+    def assertMetricsEqual(self, first, second):
+        for field, left, right in zip(first._fields, first, second):
+            np.testing.assert_array_equal(left, right, err_msg=field)
+
+    def test_counts(self):
+        metrics = compute_metrics(["राम", "कृष्ण", "क"])
+        self.assertEqual(metrics.syllables.tolist(), [2, 2, 1])
+        self.assertEqual(metrics.guru.tolist(), [1, 1, 0])
+        self.assertEqual(metrics.samyoga.tolist(), [0, 1, 0])
+
+    def test_line_terminators_are_ignored(self):
+        self.assertMetricsEqual(compute_metrics(["राम\n", "कृष्ण\r\n", "क\n"]), compute_metrics(["राम", "कृष्ण", "क"]))
+
+    def test_lines_from_a_file(self):
+        lines = ["धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः", "", "मामकाः पाण्डवाश्चैव किमकुर्वत सञ्जय"]
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "corpus.txt")
+            with open(filepath, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            with open(filepath, encoding="utf-8") as file:
+                self.assertMetricsEqual(compute_metrics(file), compute_metrics(lines))
+
+    def test_characters_outside_the_basic_plane(self):
+        metrics = compute_metrics(["राम😀", "क"])
+        self.assertEqual(metrics.syllables.tolist(), [2, 1])
+
+    def test_no_lines(self):
+        self.assertEqual(len(compute_metrics([]).syllables), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from core.DhatuRupaJanaka import generate_paradigms, UdaharanaVyakarana
+from core.DhatuSmritiKosha import LAKARA_VIDHI, DhātuInfo
+
+LAKARAS = {lakara: ("present", "indicative") for lakara in LAKARA_VIDHI}
+
+def make_roots(count: int) -> list:
+    consonants = [chr(code) for code in range(0x915, 0x939)]
+    return [DhātuInfo(consonants[idx % 36] + consonants[idx // 36 % 36] + "्", "1", "", "", "", "ubhayapada", "") for idx in range(count)]
+
+class GenerateParadigmsTest(unittest.TestCase):
+
+    def test_pool_matches_one_process(self):
+        roots = make_roots(50)
+        expected = list(generate_paradigms(roots, UdaharanaVyakarana, 1, LAKARAS))
+        self.assertEqual(list(generate_paradigms(roots, UdaharanaVyakarana, 2, LAKARAS, chunksize=4)), expected)
+
+    def test_roots_are_read_lazily(self):
+        read = []
+        def roots():
+            for verb_info in make_roots(1000):
+                read.append(verb_info)
+                yield verb_info
+
+        rows = generate_paradigms(roots(), UdaharanaVyakarana, 2, LAKARAS, chunksize=4)
+        self.assertEqual(next(rows)[0], "कक्")
+        # Two chunks per worker in flight, plus the one read before waiting on the first
+        self.assertLessEqual(len(read), (2 * 2 + 1) * 4)
+        rows.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import os
+import unittest
+from modules.kosha.DhatuKosha import DhatuKosha
+from modules.kosha.VibhaktiKosha import VibhaktiKosha
+from modules.kosha.KoshaBhandara import migrate
+from modules.kosha.KoshaMula import working_copy
+
+NEW_DHATU = {
+    "dhatu": "धा",
+    "gana": "आदि",
+    "lakshana": "धारणम्",
+    "example_usage": "धातवः",
+    "meaning": "to hold, to support",
+    "tense_usage": {"present": "धारयति", "past": "अधारयत्", "future": "धारयिष्यति"}
+}
+
+NEW_NOUN = {
+    "noun": "गणेश",
+    "vibhaktis": {"प्रथमा": "गणेशः", "द्वितीया": "गणेशम्", "षष्ठी": "गणेशस्य"}
+}
+
+def by_key(kosha) -> dict:
+    # Storage backends may order entries differently, so koshas are compared by headword
+    return {entry[kosha.KEY_FIELD]: entry for entry in kosha.entries()}
+
+def working_copy_path(test, filename: str) -> str:
+    # A second shipped file for the same test, cleaned up with it
+    directory, path = working_copy(filename)
+    test.addCleanup(directory.cleanup)
+    return path
+
+class KoshaTestCase(unittest.TestCase):
+    """
+    Runs every test on a fresh copy of a shipped kosha file.
+    """
+
+    FILENAME = "DhātuKosha.json"
+
+    def setUp(self):
+        self.working_directory, self.kosha_path = working_copy(self.FILENAME)
+        self.koshas = []
+
+    def tearDown(self):
+        for kosha in self.koshas:
+            kosha.bhandara.close()
+        self.working_directory.cleanup()
+
+    def open(self, cls=DhatuKosha, **kwargs):
+        kwargs.setdefault("filepath", self.kosha_path)
+        kosha = cls(**kwargs)
+        self.koshas.append(kosha)
+        return kosha
+
+    def mutate(self, kosha):
+        # One of each journal record: insert, replace (with a rename) and delete
+        kosha.add_dhatu(NEW_DHATU)
+        updated = dict(kosha.get_dhatu_info("कृ"), dhatu="कृञ्", meaning="to do")
+        self.assertTrue(kosha.update_dhatu("कृ", updated))
+        deleted = kosha.get_all_dhatus()[1]
+        self.assertTrue(kosha.delete_dhatu(deleted))
+        return deleted
+
+class JournalTest(KoshaTestCase):
+
+    def test_replay_after_add_update_delete(self):
+        kosha = self.open()
+        with open(self.kosha_path, 'rb') as file:
+            document = file.read()
+        deleted = self.mutate(kosha)
+        expected = by_key(kosha)
+
+        # The mutations went to the journal, not the document
+        self.assertTrue(os.path.exists(self.kosha_path + ".journal"))
+        with open(self.kosha_path, 'rb') as file:
+            self.assertEqual(file.read(), document)
+
+        reloaded = self.open()
+        self.assertEqual(by_key(reloaded), expected)
+        self.assertEqual(reloaded.get_dhatu_info("धा"), NEW_DHATU)
+        self.assertIsNone(reloaded.get_dhatu_info("कृ"))
+        self.assertEqual(reloaded.get_dhatu_info("कृञ्")["meaning"], "to do")
+        self.assertIsNone(reloaded.get_dhatu_info(deleted))
+
+    def test_replay_keeps_derived_indexes(self):
+        kosha = self.open(VibhaktiKosha, filepath=working_copy_path(self, "VibhaktiKosha.json"))
+        kosha.add_vibhakti(NEW_NOUN)
+        kosha.delete_vibhakti("राम")
+
+        reloaded = self.open(VibhaktiKosha, filepath=kosha.filepath)
+        self.assertEqual(reloaded.get_form("गणेश", "षष्ठी"), "गणेशस्य")
+        self.assertEqual(reloaded.analyze_form("रामस्य"), [])
+
+class PositionTest(KoshaTestCase):
+
+    def test_positions_follow_updates_and_deletes(self):
+        kosha = self.open()
+        kosha.add_dhatu(NEW_DHATU)
+        for dhatu in kosha.get_all_dhatus()[::3]:
+            kosha.delete_dhatu(dhatu)
+        for dhatu in kosha.get_all_dhatus()[::2]:
+            kosha.update_dhatu(dhatu, dict(kosha.get_dhatu_info(dhatu), meaning="updated"))
+        kosha.delete_dhatu(kosha.get_all_dhatus()[-1])
+
+        entries = kosha.entries()
+        self.assertEqual([kosha.suchi.position(entry) for entry in entries], list(range(len(entries))))
+        self.assertEqual({dhatu: kosha.get_dhatu_info(dhatu) for dhatu in kosha.get_all_dhatus()}, by_key(kosha))
+        # Deleting moves the last entry into the freed slot; the journal replays to the same entries
+        self.assertEqual(by_key(self.open()), by_key(kosha))
+
+class CompactionTest(KoshaTestCase):
+
+    def test_compaction_then_trusted_reload(self):
+        kosha = self.open()
+        self.mutate(kosha)
+        expected = by_key(kosha)
+        kosha.bhandara.compact(wait=True)
+
+        # The journal is folded into the document, which is checksummed
+        self.assertFalse(os.path.exists(self.kosha_path + ".journal"))
+        self.assertFalse(os.path.exists(self.kosha_path + ".journal.compacting"))
+        with open(self.kosha_path, 'r', encoding='utf-8') as file:
+            document = json.load(file)
+        self.assertEqual({entry["dhatu"]: entry for entry in document["Dhatus"]}, expected)
+
+        reloaded = self.open(trusted=True)
+        self.assertEqual(by_key(reloaded), expected)
+        self.assertTrue(reloaded.bhandara.is_trusted())
+
+    def test_edited_document_is_validated(self):
+        kosha = self.open()
+        kosha.save_data()
+        with open(self.kosha_path, 'r', encoding='utf-8') as file:
+            document = json.load(file)
+        del document["Dhatus"][0]["gana"]
+        with open(self.kosha_path, 'w', encoding='utf-8') as file:
+            json.dump(document, file, ensure_ascii=False)
+
+        # The checksum no longer matches, so a trusted load validates and rejects the document
+        with self.assertLogs("modules.kosha.DhatuKosha", level="ERROR"):
+            reloaded = self.open(trusted=True)
+            self.assertEqual(reloaded.count_dhatus(), 0)
+        self.assertFalse(reloaded.bhandara.is_trusted())
+
+class MigrateTest(KoshaTestCase):
+
+    def test_json_to_sqlite_and_back(self):
+        kosha = self.open()
+        self.mutate(kosha)
+        expected = by_key(kosha)
+
+        sqlite_path = os.path.join(self.working_directory.name, "DhatuKosha.sqlite")
+        self.assertEqual(migrate(self.kosha_path, sqlite_path, "Dhatus", "dhatu", ("gana",)), len(expected))
+        sqlite_kosha = self.open(filepath=sqlite_path)
+        self.assertEqual(by_key(sqlite_kosha), expected)
+        self.assertEqual(sqlite_kosha.bhandara.query(dhatu="धा"), [NEW_DHATU])
+
+        # Edits made through SQLite survive the way back to JSON
+        sqlite_kosha.delete_dhatu("धा")
+        del expected["धा"]
+        json_path = os.path.join(self.working_directory.name, "DhatuKosha.json")
+        self.assertEqual(migrate(sqlite_path, json_path, "Dhatus", "dhatu"), len(expected))
+        self.assertEqual(by_key(self.open(filepath=json_path)), expected)
+
+class BulkTest(KoshaTestCase):
+
+    def test_rollback_restores_data_indexes_and_file(self):
+        kosha = self.open()
+        before = by_key(kosha)
+        version = kosha.version
+        with self.assertRaises(ValueError):
+            with kosha.bulk():
+                kosha.add_dhatu(NEW_DHATU)
+                kosha.delete_dhatu("कृ")
+                kosha.add_dhatu(NEW_DHATU)
+
+        self.assertEqual(by_key(kosha), before)
+        self.assertIsNone(kosha.get_dhatu_info("धा"))
+        self.assertIsNotNone(kosha.get_dhatu_info("कृ"))
+        self.assertEqual(kosha.autocomplete("धा"), [])
+        self.assertGreater(kosha.version, version)
+        # Nothing reached the storage backend
+        self.assertFalse(os.path.exists(self.kosha_path + ".journal"))
+        self.assertEqual(by_key(self.open()), before)
+
+    def test_commit_writes_once(self):
+        kosha = self.open()
+        with kosha.bulk():
+            kosha.add_dhatu(NEW_DHATU)
+            kosha.delete_dhatu("कृ")
+        # A committed transaction is one full save, leaving no journal behind
+        self.assertFalse(os.path.exists(self.kosha_path + ".journal"))
+        self.assertEqual(by_key(self.open(trusted=True)), by_key(kosha))
+
+    def test_import_rolls_back_on_duplicate(self):
+        kosha = self.open()
+        count = kosha.count_dhatus()
+        jsonl_path = os.path.join(self.working_directory.name, "dhatus.jsonl")
+        with open(jsonl_path, 'w', encoding='utf-8') as file:
+            for entry in (NEW_DHATU, dict(NEW_DHATU, dhatu="भू")):
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        with self.assertRaises(ValueError):
+            kosha.import_from_jsonl(jsonl_path)
+        self.assertEqual(kosha.count_dhatus(), count)
+        self.assertIsNone(kosha.get_dhatu_info("धा"))
+
+if __name__ == "__main__":
+    unittest.main()
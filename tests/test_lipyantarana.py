@@ -0,0 +1,43 @@
+import random
+import unittest
+from core.Lipyantarana import (DEVANAGARI, DEVANAGARI_ANYA, DEVANAGARI_SVARA, DEVANAGARI_VYANJANA, ROMAN_SCHEMES, SCHEMES,
+                               VIRAMA, get_lipyantaraka)
+
+def source_characters(scheme: str) -> list:
+    # Every spelling of the scheme, plus characters outside it
+    if scheme == DEVANAGARI:
+        pieces = list(DEVANAGARI_VYANJANA.values()) + list(DEVANAGARI_ANYA.values()) + [VIRAMA]
+        pieces += [form for pair in DEVANAGARI_SVARA.values() for form in pair if form]
+    else:
+        pieces = [form for forms in ROMAN_SCHEMES[scheme].values() for form in forms]
+    return pieces + [" ", "\n", ",", "-"]
+
+def split_randomly(text: str, generator: random.Random) -> list:
+    cuts = sorted(generator.sample(range(1, len(text)), min(len(text) - 1, len(text) // 5)))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+class IterTransliterateTest(unittest.TestCase):
+
+    def test_chunked_matches_whole_text(self):
+        generator = random.Random(7)
+        for source in SCHEMES:
+            pieces = source_characters(source)
+            texts = ["".join(generator.choice(pieces) for _ in range(300)) for _ in range(20)]
+            for target in SCHEMES:
+                lipyantaraka = get_lipyantaraka(source, target)
+                for text in texts:
+                    chunks = split_randomly(text, generator)
+                    self.assertEqual("".join(lipyantaraka.iter_transliterate(chunks)), lipyantaraka.transliterate(text),
+                                     (source, target, chunks))
+
+    def test_carry_stays_short_without_whitespace(self):
+        lipyantaraka = get_lipyantaraka(DEVANAGARI, "iast")
+        text = "धर्मक्षेत्रेकुरुक्षेत्रेसमवेतायुयुत्सवः" * 200
+        chunks = [text[start:start + 16] for start in range(0, len(text), 16)]
+        outputs = list(lipyantaraka.iter_transliterate(chunks))
+        self.assertEqual("".join(outputs), lipyantaraka.transliterate(text))
+        # Every chunk is transliterated as it arrives, not held back until the end of the text
+        self.assertEqual(len(outputs), len(chunks))
+
+if __name__ == "__main__":
+    unittest.main()
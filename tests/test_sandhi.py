@@ -0,0 +1,79 @@
+import unittest
+from core.Lipyantarana import DEVANAGARI_SVARA, DEVANAGARI_VYANJANA, VIRAMA, to_slp1
+from core.VarnaVargikarana import get_varga, MATRA, VIRAMA as VIRAMA_VARGA
+from modules.vyakarana.SandhiNiyamaSarani import SANDHI_SARANI
+from modules.vyakarana.SandhiParivartaka import SANDHI_PARIVARTAKA
+from modules.vyakarana.SandhiSamyojaka import SandhiSamyojaka
+
+VYANJANA = list(DEVANAGARI_VYANJANA.values())
+SVARA = [independent for independent, _ in DEVANAGARI_SVARA.values()]
+MATRAS = [sign for _, sign in DEVANAGARI_SVARA.values() if sign]
+
+def is_well_formed(text: str) -> bool:
+    # A virama followed by a vowel sign or another virama has no reading, so there is no SLP1 spelling to compare
+    return not any(get_varga(char) == VIRAMA_VARGA and get_varga(next_char) in (MATRA, VIRAMA_VARGA) for char, next_char in zip(text, text[1:]))
+
+class SandhiSLP1Test(unittest.TestCase):
+    """
+    The SLP1 engine against the Devanagari one, over every consonant and vowel at the boundary.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Every consonant and every vowel, independent or as a sign, on each side of the boundary
+        lefts = ["क" + consonant for consonant in VYANJANA]
+        lefts += ["क" + consonant + "ा" for consonant in VYANJANA] + ["कक" + sign for sign in MATRAS]
+        lefts += SVARA
+        # Bare finals, e.g. महत्, which the cluster rules such as त् + र -> त्र match
+        lefts += ["क" + consonant + VIRAMA for consonant in VYANJANA]
+        rights = [vowel + "क" for vowel in SVARA]
+        rights += [consonant + "क" for consonant in VYANJANA]
+        rights += [consonant + "ि" + "क" for consonant in VYANJANA] + ["त" + sign + "क" for sign in MATRAS]
+        # Conjunct-initial words, e.g. ग्राम, ब्राह्मण, ज्ञान
+        rights += [consonant + VIRAMA + second + "म्" for consonant in VYANJANA for second in VYANJANA]
+        cls.pairs = [(word1, word2) for word1 in lefts for word2 in rights]
+
+    def test_join_slp1_matches_devanagari(self):
+        mismatches = []
+        for word1, word2 in self.pairs:
+            joined = SANDHI_SARANI.join(word1, word2)
+            if not is_well_formed(joined):
+                continue
+            joined_slp1 = SANDHI_SARANI.join_slp1(to_slp1(word1), to_slp1(word2))
+            if joined_slp1 != to_slp1(joined):
+                mismatches.append((word1, word2, joined, joined_slp1))
+        self.assertEqual(mismatches[:10], [])
+
+    def test_batch_slp1_matches_join_slp1(self):
+        pairs_slp1 = [(to_slp1(word1), to_slp1(word2)) for word1, word2 in self.pairs]
+        self.assertEqual(SANDHI_SARANI.join_batch_slp1(pairs_slp1), [SANDHI_SARANI.join_slp1(word1, word2) for word1, word2 in pairs_slp1])
+
+    def test_conjunct_initial_words(self):
+        self.assertEqual(SandhiSamyojaka.apply_sandhi_slp1("tama", "brAhmaRam"), to_slp1(SandhiSamyojaka.apply_sandhi("तम", "ब्राह्मणम्")))
+        self.assertEqual(SandhiSamyojaka.apply_sandhi_slp1("rAma", "grAmam"), "rANgrAmam")
+        self.assertEqual(SandhiSamyojaka.apply_sandhi_batch([("rāma", "grāmam")], "iast"), ["rāṅgrāmam"])
+
+class SandhiSamyogaTest(unittest.TestCase):
+    """
+    Cluster rules whose left side is a bare consonant, in every Devanagari engine.
+    """
+
+    PAIRS = [("महत्", "रम"), ("वाक्", "वादी"), ("महत्", "तम"), ("धनुष्", "ठम"), ("महत्", "थम")]
+    JOINED = ["महत्रम", "वाक्वादी", "महत्त्म", "धनुष्टम", "महत् थम"]
+
+    def test_join(self):
+        self.assertEqual([SANDHI_SARANI.join(word1, word2) for word1, word2 in self.PAIRS], self.JOINED)
+
+    def test_join_batch(self):
+        self.assertEqual(SANDHI_SARANI.join_batch(self.PAIRS), self.JOINED)
+
+    def test_transducer(self):
+        self.assertEqual([SANDHI_PARIVARTAKA.transduce(pair) for pair in self.PAIRS], self.JOINED)
+        self.assertEqual(SANDHI_PARIVARTAKA.apply("महत् रम देव"), "महत्रमदेव")
+
+    def test_slp1(self):
+        self.assertEqual([SANDHI_SARANI.join_slp1(to_slp1(word1), to_slp1(word2)) for word1, word2 in self.PAIRS],
+                         [to_slp1(joined) for joined in self.JOINED])
+
+if __name__ == "__main__":
+    unittest.main()